@@ -17,6 +17,11 @@ python manage.py migrate
 echo "Creating superuser (if managed)"
 python /scripts/create_superuser.py
 
+if [[ -n "$SCHEDULER_STANDALONE" ]]; then
+    echo "Starting Scheduler"
+    python manage.py run_scheduler &
+fi
+
 echo "Starting Gunicorn"
 exec gunicorn sensor.wsgi -c ../gunicorn/config.py &
 wait
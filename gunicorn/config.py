@@ -4,10 +4,16 @@ from multiprocessing import cpu_count
 
 
 bind = ':8000'
-workers = 1
+workers = int(os.environ.get('GUNICORN_WORKERS') or 1)
 worker_class = 'gthread'
 threads = cpu_count()
 
+# Each worker would start its own scheduler thread
+scheduler_standalone = bool(os.environ.get('SCHEDULER_STANDALONE'))
+if workers > 1 and not scheduler_standalone:
+    raise RuntimeError(
+        "GUNICORN_WORKERS > 1 requires SCHEDULER_STANDALONE to be set")
+
 loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
 
 
@@ -22,6 +28,9 @@ def _modify_path():
 
 def post_worker_init(worker):
     """Start scheduler in worker."""
+    if scheduler_standalone:
+        return
+
     _modify_path()
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sensor.settings')
 
@@ -34,6 +43,9 @@ def post_worker_init(worker):
 
 def worker_exit(server, worker):
     """Notify worker process's scheduler thread that it needs to shut down."""
+    if scheduler_standalone:
+        return
+
     _modify_path()
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sensor.settings')
 
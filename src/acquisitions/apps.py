@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class AcquisitionsConfig(AppConfig):
     name = 'acquisitions'
+
+    def ready(self):
+        # Register the system check for acquisition storage
+        from . import checks  # noqa
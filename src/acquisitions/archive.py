@@ -0,0 +1,175 @@
+"""Stream SigMF archives without writing temporary files.
+
+Example usage:
+    >>> stream = SigMFArchiveStream('capture', metadata, data, sha512)
+    >>> response = StreamingHttpResponse(stream)
+    >>> response['Content-Length'] = len(stream)
+    >>> archives = (SigMFArchiveStream(*args) for args in recordings)
+    >>> response = StreamingHttpResponse(iter_archives(archives))
+
+"""
+
+from __future__ import absolute_import
+
+import hashlib
+import json
+import tarfile
+import time
+
+from .storage import StoredData, as_bytes, iter_slices
+
+
+SIGMF_METADATA_EXT = ".sigmf-meta"
+SIGMF_DATASET_EXT = ".sigmf-data"
+SHA512_KEY = "core:sha512"
+
+# Largest chunk of sample data yielded at once
+CHUNK_SIZE = 2**20
+
+
+def padding(size, multiple):
+    return -size % multiple
+
+
+def iter_archives(archives):
+    """Yield the bytes of one tar file containing each SigMFArchiveStream.
+
+    `archives` can be a generator, so only one archive needs to exist at a
+    time.
+
+    """
+    nbytes = 0
+    for archive in archives:
+        for chunk in archive.iter_members():
+            nbytes += len(chunk)
+            yield chunk
+
+    end_of_archive = 2 * tarfile.BLOCKSIZE
+    end_of_archive += padding(nbytes + end_of_archive, tarfile.RECORDSIZE)
+    yield b'\0' * end_of_archive
+
+
+class SigMFArchiveStream(object):
+    """Iterate over the bytes of a SigMF archive as a PAX format tar file.
+
+    The archive has the same layout as one written by `sigmf.SigMFArchive`:
+
+        name/
+        name/name.sigmf-meta
+        name/name.sigmf-data
+
+    Only one chunk of sample data is held in memory at a time, and the
+    length of the archive is known up front.
+
+    :param name: name of the archive without the `.sigmf` extension
+    :param metadata: SigMF metadata dict, which is not modified
+    :param data: sample data as a bytes-like object, NumPy array or
+                 `StoredData`, which is read a chunk at a time
+    :param sha512: hex sha512 of the data, if known. If not, the data is
+                   hashed while it is streamed and the metadata member
+                   follows the data member instead of preceding it.
+
+    """
+    def __init__(self, name, metadata, data, sha512=None, mtime=None):
+        self.name = name
+        self.metadata = metadata
+        if not isinstance(data, StoredData):
+            data = as_bytes(data)
+
+        self.data = data
+        self.sha512 = sha512
+        self.mtime = time.time() if mtime is None else mtime
+
+        # The sha512 is always 128 hex digits, so this is the final size
+        self.metadata_size = len(self._dump_metadata('0' * 128))
+
+    def __len__(self):
+        size = self.members_size() + 2 * tarfile.BLOCKSIZE
+        return size + padding(size, tarfile.RECORDSIZE)
+
+    def __iter__(self):
+        return iter_archives([self])
+
+    def members_size(self):
+        """Return the size of the members without the end of archive."""
+        size = len(self._dir_header())
+        size += len(self._metadata_header())
+        size += self.metadata_size
+        size += padding(self.metadata_size, tarfile.BLOCKSIZE)
+        size += len(self._data_header())
+        size += self.data.nbytes
+        size += padding(self.data.nbytes, tarfile.BLOCKSIZE)
+
+        return size
+
+    def iter_members(self):
+        """Yield the tar headers and contents of this archive's members."""
+        yield self._dir_header()
+
+        if self.sha512 is not None:
+            for chunk in self._iter_metadata_member(self.sha512):
+                yield chunk
+
+            for chunk in self._iter_data_member():
+                yield chunk
+        else:
+            hasher = hashlib.sha512()
+            for chunk in self._iter_data_member(hasher):
+                yield chunk
+
+            for chunk in self._iter_metadata_member(hasher.hexdigest()):
+                yield chunk
+
+    def _iter_metadata_member(self, sha512):
+        metadata = self._dump_metadata(sha512)
+        yield self._metadata_header()
+        yield metadata + b'\0' * padding(len(metadata), tarfile.BLOCKSIZE)
+
+    def _iter_data_member(self, hasher=None):
+        yield self._data_header()
+
+        if isinstance(self.data, StoredData):
+            chunks = self.data.iter_chunks(CHUNK_SIZE)
+        else:
+            chunks = iter_slices(self.data, CHUNK_SIZE)
+
+        nbytes = 0
+        for chunk in chunks:
+            nbytes += len(chunk)
+            if hasher is not None:
+                hasher.update(chunk)
+
+            yield chunk
+
+        if nbytes != self.data.nbytes:
+            # The tar header already promised nbytes
+            msg = "read {} bytes of sample data, expected {}"
+            raise IOError(msg.format(nbytes, self.data.nbytes))
+
+        yield b'\0' * padding(self.data.nbytes, tarfile.BLOCKSIZE)
+
+    def _dump_metadata(self, sha512):
+        metadata = dict(self.metadata)
+        metadata['global'] = dict(metadata['global'], **{SHA512_KEY: sha512})
+        # Match SigMFFile.dump(pretty=True)
+        return json.dumps(
+            metadata, indent=4, separators=(',', ': ')).encode('utf-8')
+
+    def _dir_header(self):
+        return self._header(self.name, 0, tarfile.DIRTYPE, 0o755)
+
+    def _metadata_header(self):
+        name = self.name + '/' + self.name + SIGMF_METADATA_EXT
+        return self._header(name, self.metadata_size, tarfile.REGTYPE, 0o644)
+
+    def _data_header(self):
+        name = self.name + '/' + self.name + SIGMF_DATASET_EXT
+        return self._header(name, self.data.nbytes, tarfile.REGTYPE, 0o644)
+
+    def _header(self, name, size, type, mode):
+        tarinfo = tarfile.TarInfo(name)
+        tarinfo.size = size
+        tarinfo.type = type
+        tarinfo.mode = mode
+        tarinfo.mtime = self.mtime
+        return tarinfo.tobuf(tarfile.PAX_FORMAT)
@@ -0,0 +1,18 @@
+"""System checks for the acquisitions app.
+
+Checks run before `manage.py migrate` and `manage.py run_scheduler`, so a
+sensor whose acquisition storage isn't writable fails at startup instead of
+on its first acquisition.
+
+"""
+
+from __future__ import absolute_import
+
+from django.core.checks import register
+
+from .storage import get_storage
+
+
+@register()
+def check_acquisition_storage(app_configs, **kwargs):
+    return get_storage().check()
@@ -0,0 +1,190 @@
+"""Compact encodings and compression codecs for acquisition sample data.
+
+I/Q samples can be stored as `cf32_le` (complex64) or `ci16_le`
+(interleaved int16 scaled to the capture's peak, half the size). The scale
+is recorded in the SigMF metadata so the samples can be recovered.
+
+Stored data can also be compressed with a codec from `CODECS`. zlib is
+always available, and zstd and lz4 are available if the `zstandard` and
+`lz4` packages are installed. Data is compressed as it's written and
+decompressed a chunk at a time as it's read.
+
+Example usage:
+    >>> encoded, scale = encode_iq(samples, 'ci16_le')
+    >>> codec = get_codec('zlib')
+    >>> compressor = codec.compressobj()
+    >>> compressed = compressor.compress(encoded) + compressor.flush()
+    >>> for chunk in codec.iter_decompress(io.BytesIO(compressed), 2**20):
+    ...     pass
+
+"""
+
+from __future__ import absolute_import
+
+import zlib
+
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+
+IQ_DATATYPES = ('cf32_le', 'ci16_le')
+
+# Global SigMF field holding the factor ci16 samples were divided by
+SCALE_FACTOR_KEY = "scos:scale_factor"
+
+CI16_MAX = np.iinfo(np.int16).max
+
+
+def encode_iq(samples, datatype):
+    """Return complex samples encoded as a SigMF datatype and their scale.
+
+    The scale is None for `cf32_le`. For `ci16_le`, multiply the decoded
+    int16 values by the scale to recover the samples.
+
+    """
+    samples = np.ascontiguousarray(samples, dtype=np.complex64)
+
+    if datatype == 'cf32_le':
+        return samples.astype('<c8', copy=False), None
+
+    if datatype == 'ci16_le':
+        interleaved = samples.reshape(-1).view(np.float32)
+        peak = np.abs(interleaved).max() if interleaved.size else 0
+        scale = float(peak) / CI16_MAX if peak else 1.0
+        scaled = interleaved / np.float32(scale)
+        np.rint(scaled, out=scaled)
+        return scaled.astype('<i2'), scale
+
+    msg = "datatype must be one of {}, not {!r}"
+    raise ValueError(msg.format(IQ_DATATYPES, datatype))
+
+
+def decode_iq(data, datatype, scale=None):
+    """Return complex64 samples from data encoded by `encode_iq`."""
+    if datatype == 'cf32_le':
+        return np.frombuffer(data, dtype='<c8').astype(np.complex64)
+
+    if datatype == 'ci16_le':
+        interleaved = np.frombuffer(data, dtype='<i2').astype(np.float32)
+        interleaved *= np.float32(1.0 if scale is None else scale)
+        return interleaved.view(np.complex64)
+
+    msg = "datatype must be one of {}, not {!r}"
+    raise ValueError(msg.format(IQ_DATATYPES, datatype))
+
+
+class Codec(object):
+    """Base class for compression codecs.
+
+    :param level: compression level, or None for the codec's default
+
+    """
+    name = None
+
+    def __init__(self, level=None):
+        self.level = level
+
+    @property
+    def extension(self):
+        """The file extension of data compressed with this codec."""
+        return '.' + self.name
+
+    def compressobj(self):
+        """Return an object with `compress(data)` and `flush()` methods."""
+        raise NotImplementedError
+
+    def iter_decompress(self, fileobj, chunk_size):
+        """Yield decompressed chunks of at most chunk_size bytes."""
+        raise NotImplementedError
+
+
+class ZlibCodec(Codec):
+    name = 'zlib'
+
+    def compressobj(self):
+        # Favor speed, sample data doesn't compress much better at level 9
+        return zlib.compressobj(1 if self.level is None else self.level)
+
+    def iter_decompress(self, fileobj, chunk_size):
+        decompressor = zlib.decompressobj()
+        for compressed in iter(lambda: fileobj.read(chunk_size), b''):
+            chunk = decompressor.decompress(compressed, chunk_size)
+            while chunk:
+                yield chunk
+                chunk = decompressor.decompress(
+                    decompressor.unconsumed_tail, chunk_size)
+
+        chunk = decompressor.flush()
+        if chunk:
+            yield chunk
+
+
+class ZstdCodec(Codec):
+    name = 'zstd'
+
+    def compressobj(self):
+        level = 3 if self.level is None else self.level
+        return zstandard.ZstdCompressor(level=level).compressobj()
+
+    def iter_decompress(self, fileobj, chunk_size):
+        decompressor = zstandard.ZstdDecompressor()
+        return decompressor.read_to_iter(
+            fileobj, read_size=chunk_size, write_size=chunk_size)
+
+
+class LZ4Codec(Codec):
+    name = 'lz4'
+
+    def compressobj(self):
+        level = 0 if self.level is None else self.level
+        return _LZ4CompressObj(level)
+
+    def iter_decompress(self, fileobj, chunk_size):
+        reader = lz4.frame.LZ4FrameFile(fileobj, mode='rb')
+        try:
+            for chunk in iter(lambda: reader.read(chunk_size), b''):
+                yield chunk
+        finally:
+            reader.close()  # doesn't close fileobj
+
+
+class _LZ4CompressObj(object):
+    """Give an lz4 frame compressor the interface of `zlib.compressobj`."""
+    def __init__(self, level):
+        self._compressor = lz4.frame.LZ4FrameCompressor(
+            compression_level=level)
+        self._header = self._compressor.begin()
+
+    def compress(self, data):
+        compressed = self._header + self._compressor.compress(data)
+        self._header = b''
+        return compressed
+
+    def flush(self):
+        return self._header + self._compressor.flush()
+
+
+CODECS = {ZlibCodec.name: ZlibCodec}
+if zstandard is not None:
+    CODECS[ZstdCodec.name] = ZstdCodec
+
+if lz4 is not None:
+    CODECS[LZ4Codec.name] = LZ4Codec
+
+
+def get_codec(name):
+    """Return an instance of the codec called name."""
+    try:
+        return CODECS[name]()
+    except KeyError:
+        msg = "codec must be one of {}, not {!r}"
+        raise ValueError(msg.format(sorted(CODECS), name))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from acquisitions.models import Acquisition
+
+
+class Command(BaseCommand):
+    help = (
+        "Move acquisition data stored in the database to acquisition storage")
+
+    def handle(self, *args, **options):
+        # Only load one blob at a time
+        pks = Acquisition.objects.filter(data__isnull=False).values_list(
+            'pk', flat=True)
+
+        nmigrated = 0
+        for pk in list(pks):
+            with transaction.atomic():
+                queryset = Acquisition.objects.select_for_update()
+                acquisition = queryset.get(pk=pk)
+                acquisition.store_data(acquisition.data)
+                acquisition.save(update_fields=(
+                    'data', 'data_name', 'data_size', 'data_sha512'))
+
+            nmigrated += 1
+
+        msg = "Migrated {} acquisitions to acquisition storage"
+        self.stdout.write(msg.format(nmigrated))
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('acquisitions', '0002_auto_20180624_0845'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='acquisition',
+            name='data_name',
+            field=models.CharField(blank=True, help_text=b'The name of the sample data in acquisition storage', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='acquisition',
+            name='data_sha512',
+            field=models.CharField(blank=True, help_text=b'The sha512 hash of the sample data', max_length=128),
+        ),
+        migrations.AddField(
+            model_name='acquisition',
+            name='data_size',
+            field=models.BigIntegerField(help_text=b'The size of the sample data in bytes', null=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('acquisitions', '0003_acquisition_data_storage'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='acquisition',
+            name='data_name',
+            field=models.CharField(blank=True, db_index=True, help_text=b'The name of the sample data in acquisition storage', max_length=255),
+        ),
+    ]
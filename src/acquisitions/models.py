@@ -1,11 +1,37 @@
-from django.db import models
+import hashlib
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from jsonfield import JSONField
 
 from schedule.models import ScheduleEntry
+from .storage import StoredData, as_bytes, get_storage
+
+
+class AcquisitionQuerySet(models.QuerySet):
+    def without_data(self):
+        """Defer the `data` column, which may hold megabytes of legacy samples.
+
+        Deferred data is still loaded on access, one query per acquisition,
+        so only use this when most rows' data won't be read.
+
+        """
+        return self.defer('data')
 
 
 class Acquisition(models.Model):
-    """Map between schedule entries and their task data and metadata."""
+    """Map between schedule entries and their task data and metadata.
+
+    Sample data is written by the configured storage backend (see
+    `acquisitions.storage`), compressed with
+    `settings.ACQUISITION_DATA_CODEC` if set, and only its name, size and
+    hash are stored in the database. The size and hash are of the data
+    before compression. Acquisitions created before that keep their data in
+    the `data` column.
+
+    """
     schedule_entry = models.ForeignKey(
         ScheduleEntry,
         on_delete=models.PROTECT,
@@ -22,15 +48,96 @@ class Acquisition(models.Model):
         help_text="",
         null=True
     )
+    data_name = models.CharField(
+        max_length=255,
+        blank=True,
+        db_index=True,
+        help_text="The name of the sample data in acquisition storage"
+    )
+    data_size = models.BigIntegerField(
+        null=True,
+        help_text="The size of the sample data in bytes"
+    )
+    data_sha512 = models.CharField(
+        max_length=128,
+        blank=True,
+        help_text="The sha512 hash of the sample data"
+    )
     created = models.DateTimeField(
         help_text="The time the acquisition was created",
         auto_now_add=True
     )
 
+    objects = AcquisitionQuerySet.as_manager()
+
     class Meta:
         db_table = 'acquisitions'
         ordering = ('created',)
         unique_together = (('schedule_entry', 'task_id'),)
 
     def __str__(self):
-        return '{}/{}'.format(self.schedule_entry.name, self.task_id)
+        return '{}/{}'.format(self.schedule_entry_id, self.task_id)
+
+    def store_data(self, data):
+        """Write data to acquisition storage. Call `save()` afterwards."""
+        codec = settings.ACQUISITION_DATA_CODEC
+        name, size, sha512 = get_storage().save(data, codec=codec)
+        self.data_name = name
+        self.data_size = size
+        self.data_sha512 = sha512
+        self.data = None
+
+    def read_data(self):
+        """Return the sample data as a bytes-like object."""
+        if self.data_name:
+            return get_storage().open(self.data_name)
+
+        return self.data
+
+    def stream_data(self):
+        """Return the sample data to be read a chunk at a time.
+
+        Unlike `read_data`, compressed data isn't decompressed up front.
+
+        """
+        if self.data_name:
+            return StoredData(get_storage(), self.data_name, self.data_size)
+
+        return self.data
+
+    def get_data_sha512(self):
+        """Return the sha512 of the sample data, hashing it at most once.
+
+        The hash is normally stored by `store_data`. Acquisitions created
+        before that are hashed on first use and the hash is saved.
+
+        """
+        if not self.data_sha512:
+            data = as_bytes(self.read_data())
+            self.data_sha512 = hashlib.sha512(data).hexdigest()
+            self.save(update_fields=['data_sha512'])
+
+        return self.data_sha512
+
+    @property
+    def data_path(self):
+        """Return a local path to the sample data, or None."""
+        if self.data_name:
+            return get_storage().path(self.data_name)
+
+        return None
+
+
+@receiver(post_delete, sender=Acquisition)
+def delete_acquisition_data(sender, instance, using, **kwargs):
+    name = instance.data_name
+    if name:
+        # Keep the file if the delete is rolled back
+        transaction.on_commit(
+            lambda: delete_unreferenced_data(name), using=using)
+
+
+def delete_unreferenced_data(name):
+    # Data is content-addressed, so another acquisition may share the file
+    if not Acquisition.objects.filter(data_name=name).exists():
+        get_storage().delete(name)
@@ -10,7 +10,9 @@ class AcquisitionsOverviewSerializer(serializers.HyperlinkedModelSerializer):
     schedule_entry = serializers.SerializerMethodField(
         help_text="The related schedule entry for the acquisition"
     )
-    acquisitions_available = serializers.SerializerMethodField(
+    # annotated by AcquisitionsOverviewViewSet
+    acquisitions_available = serializers.IntegerField(
+        read_only=True,
         help_text="The number of available acquisitions"
     )
 
@@ -30,9 +32,6 @@ class AcquisitionsOverviewSerializer(serializers.HyperlinkedModelSerializer):
             }
         }
 
-    def get_acquisitions_available(self, obj):
-        return obj.acquisitions.count()
-
     def get_schedule_entry(self, obj):
         request = self.context['request']
         kwargs = {'pk': obj.name}
@@ -42,8 +41,9 @@ class AcquisitionsOverviewSerializer(serializers.HyperlinkedModelSerializer):
 class AcquisitionHyperlinkedRelatedField(serializers.HyperlinkedRelatedField):
     # django-rest-framework.org/api-guide/relations/#custom-hyperlinked-fields
     def get_url(self, obj, view_name, request, format):
+        # The entry's primary key is its name, so no query is needed
         kws = {
-            'schedule_entry_name': obj.schedule_entry.name,
+            'schedule_entry_name': obj.schedule_entry_id,
             'task_id': obj.task_id
         }
         kws.update(V1)
@@ -82,3 +82,10 @@ class AcquisitionSerializer(serializers.ModelSerializer):
                 'lookup_field': 'name'
             }
         }
+
+    def __init__(self, *args, **kwargs):
+        omit_metadata = kwargs.pop('omit_metadata', False)
+        super(AcquisitionSerializer, self).__init__(*args, **kwargs)
+
+        if omit_metadata:
+            self.fields.pop('sigmf_metadata')
@@ -0,0 +1,239 @@
+"""Pluggable storage for acquisition sample data.
+
+The backend is selected with `settings.ACQUISITION_STORAGE_BACKEND`.
+
+Example usage:
+    >>> from acquisitions.storage import get_storage
+    >>> storage = get_storage()
+    >>> name, size, sha512 = storage.save(np.zeros(1024, dtype=np.float32))
+    >>> data = storage.open(name)  # a read-only uint8 np.memmap
+    >>> name, size, sha512 = storage.save(data, codec='zlib')
+    >>> for chunk in storage.iter_chunks(name, 2**20):
+    ...     pass
+
+"""
+
+from __future__ import absolute_import
+
+import errno
+import hashlib
+import logging
+import os
+import tempfile
+
+import numpy as np
+from django.conf import settings
+from django.core import checks
+from django.utils.module_loading import import_string
+
+from .encoding import get_codec
+
+
+logger = logging.getLogger(__name__)
+
+# Size of the chunks data is compressed and decompressed in
+CHUNK_SIZE = 2**20
+
+
+def get_storage():
+    """Return an instance of the configured storage backend."""
+    return import_string(settings.ACQUISITION_STORAGE_BACKEND)()
+
+
+def as_bytes(data):
+    """Return a flat, contiguous uint8 view of a buffer or NumPy array."""
+    if not isinstance(data, np.ndarray):
+        if not len(data):
+            return np.empty(0, dtype=np.uint8)
+
+        return np.frombuffer(data, dtype=np.uint8)
+
+    array = np.ascontiguousarray(data)
+    if array.dtype == np.uint8 and array.ndim == 1:
+        return array
+
+    return array.reshape(-1).view(np.uint8)
+
+
+def makedirs(directory):
+    """Create directory and its parents if they don't exist."""
+    try:
+        os.makedirs(directory)
+    except OSError as err:
+        if err.errno != errno.EEXIST:
+            raise
+
+
+def iter_slices(data, chunk_size):
+    """Yield the bytes of a uint8 array chunk_size bytes at a time."""
+    for start in range(0, data.nbytes, chunk_size):
+        yield data[start:start + chunk_size].tobytes()
+
+
+class StoredData(object):
+    """Stored data of a known size that's read a chunk at a time.
+
+    Pass this instead of an array to `SigMFArchiveStream` to decompress
+    data while it's streamed.
+
+    """
+    def __init__(self, storage, name, nbytes):
+        self.storage = storage
+        self.name = name
+        self.nbytes = nbytes
+
+    def iter_chunks(self, chunk_size):
+        return self.storage.iter_chunks(self.name, chunk_size)
+
+
+class Storage(object):
+    """Base class for sample data storage backends."""
+    def save(self, data, codec=None):
+        """Store data and return its name, size in bytes and sha512.
+
+        :param codec: name of a codec in `encoding.CODECS` to compress the
+                      data with. The size and sha512 are of the data before
+                      it's compressed.
+
+        """
+        raise NotImplementedError
+
+    def open(self, name):
+        """Return stored data as a read-only uint8 array.
+
+        Compressed data is decompressed into memory, so use `iter_chunks`
+        to read large captures.
+
+        """
+        raise NotImplementedError
+
+    def iter_chunks(self, name, chunk_size):
+        """Yield stored data as bytes, up to chunk_size bytes at a time."""
+        return iter_slices(self.open(name), chunk_size)
+
+    def delete(self, name):
+        raise NotImplementedError
+
+    def path(self, name):
+        """Return a local filesystem path for name, or None."""
+        return None
+
+    def check(self):
+        """Return a list of `django.core.checks` messages about the backend."""
+        return []
+
+
+class FileSystemStorage(Storage):
+    """Store data in content-addressed `.sigmf-data` files.
+
+    Files are named by the sha512 of their contents, so storing the same
+    data twice reuses the existing file. Compressed files have the codec's
+    extension appended. Files are written to a temporary file sequentially
+    and then atomically renamed, so a partially written file is never
+    visible.
+
+    :param location: directory to store files in, defaults to
+                     `settings.ACQUISITION_DATA_DIR`
+
+    """
+    def __init__(self, location=None):
+        self.location = location or settings.ACQUISITION_DATA_DIR
+
+    def save(self, data, codec=None):
+        data = as_bytes(data)
+        sha512 = hashlib.sha512(data).hexdigest()
+        name = os.path.join(sha512[:2], sha512 + '.sigmf-data')
+        if codec is not None:
+            codec = get_codec(codec)
+            name += codec.extension
+
+        path = self.path(name)
+
+        if os.path.exists(path):
+            logger.debug("Reusing existing data file {}".format(name))
+            return name, data.nbytes, sha512
+
+        directory = os.path.dirname(path)
+        makedirs(directory)
+
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                if codec is None:
+                    f.write(data)
+                else:
+                    compressor = codec.compressobj()
+                    for chunk in iter_slices(data, CHUNK_SIZE):
+                        f.write(compressor.compress(chunk))
+
+                    f.write(compressor.flush())
+
+                f.flush()
+                os.fsync(f.fileno())
+
+            os.rename(temp_path, path)
+        except Exception:
+            os.remove(temp_path)
+            raise
+
+        return name, data.nbytes, sha512
+
+    def open(self, name):
+        path = self.path(name)
+        if self._get_codec(name) is not None:
+            data = b''.join(self.iter_chunks(name, CHUNK_SIZE))
+            return as_bytes(data)
+
+        if not os.path.getsize(path):
+            # mmap can't map an empty file
+            return np.empty(0, dtype=np.uint8)
+
+        return np.memmap(path, dtype=np.uint8, mode='r')
+
+    def iter_chunks(self, name, chunk_size):
+        codec = self._get_codec(name)
+        if codec is None:
+            return super(FileSystemStorage, self).iter_chunks(
+                name, chunk_size)
+
+        return self._iter_decompressed(name, codec, chunk_size)
+
+    def delete(self, name):
+        try:
+            os.remove(self.path(name))
+        except OSError as err:
+            if err.errno != errno.ENOENT:
+                raise
+
+    def path(self, name):
+        return os.path.join(self.location, name)
+
+    def check(self):
+        # Write a file, since a read-only mount passes permission checks
+        try:
+            makedirs(self.location)
+            fd, temp_path = tempfile.mkstemp(dir=self.location, suffix='.tmp')
+            os.close(fd)
+            os.remove(temp_path)
+        except (IOError, OSError) as err:
+            msg = "Can't write acquisition data to {}: {}"
+            return [checks.Error(
+                msg.format(self.location, err),
+                hint="Set ACQUISITION_DATA_DIR to a writable directory.",
+                id='acquisitions.E001'
+            )]
+
+        return []
+
+    def _iter_decompressed(self, name, codec, chunk_size):
+        with open(self.path(name), 'rb') as f:
+            for chunk in codec.iter_decompress(f, chunk_size):
+                yield chunk
+
+    def _get_codec(self, name):
+        """Return the codec name was compressed with, or None."""
+        if name.endswith('.sigmf-data'):
+            return None
+
+        # Raises ValueError if the codec's package is no longer installed
+        return get_codec(os.path.splitext(name)[1][1:])
@@ -0,0 +1,39 @@
+import hashlib
+import io
+import json
+import tarfile
+
+import numpy as np
+import pytest
+
+from acquisitions.archive import SigMFArchiveStream
+
+
+METADATA = {
+    'global': {'core:datatype': 'rf32_le', 'core:version': '0.0.1'},
+    'captures': [{'core:sample_start': 0}],
+    'annotations': []
+}
+
+
+@pytest.mark.parametrize('known_hash', (True, False))
+def test_archive_stream(known_hash):
+    data = np.arange(1000, dtype=np.float32)
+    sha512 = hashlib.sha512(data.tobytes()).hexdigest()
+    stream = SigMFArchiveStream(
+        'test', METADATA, data, sha512=sha512 if known_hash else None)
+
+    archive = b''.join(stream)
+    assert len(archive) == len(stream)
+    assert len(archive) % tarfile.RECORDSIZE == 0
+
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tf:
+        names = tf.getnames()
+        meta = tf.extractfile('test/test.sigmf-meta').read()
+        stored_data = tf.extractfile('test/test.sigmf-data').read()
+
+    metadata_first = names.index('test/test.sigmf-meta') == 1
+    assert metadata_first == known_hash
+    assert stored_data == data.tobytes()
+    assert json.loads(meta.decode('utf-8'))['global']['core:sha512'] == sha512
+    assert 'core:sha512' not in METADATA['global']
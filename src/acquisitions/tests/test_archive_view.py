@@ -1,4 +1,6 @@
+import io
 import os
+import tarfile
 import tempfile
 
 import numpy as np
@@ -9,6 +11,7 @@ import sigmf.sigmffile
 
 from acquisitions.tests.utils import (
     reverse_acquisition_archive,
+    reverse_acquisition_list_archive,
     simulate_acquisitions,
     HTTPS_KWARG
 )
@@ -27,7 +30,7 @@ def test_archive_download(user_client, test_scheduler):
     assert response['content-length'] == '20480'
 
     with tempfile.NamedTemporaryFile() as tf:
-        tf.write(response.content)
+        tf.write(b''.join(response.streaming_content))
         tf.flush()
         sigmf_archive_contents = sigmf.sigmffile.fromarchive(tf.name)
         md = sigmf_archive_contents._metadata
@@ -42,3 +45,52 @@ def test_archive_download(user_client, test_scheduler):
 
         assert datafile_actual_size == datafile_expected_size
         assert claimed_sha512 == actual_sha512
+
+
+def test_list_archive_download(user_client, test_scheduler):
+    entry_name = simulate_acquisitions(user_client, n=3)
+    url = reverse_acquisition_list_archive(entry_name)
+    disposition = 'attachment; filename="{}.tar"'.format(entry_name)
+    response = user_client.get(url, **HTTPS_KWARG)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response['content-disposition'] == disposition
+    assert response['content-type'] == 'application/x-tar'
+    assert not response.has_header('content-length')
+
+    content = b''.join(response.streaming_content)
+    assert len(content) % tarfile.RECORDSIZE == 0
+
+    with tarfile.open(fileobj=io.BytesIO(content)) as tf:
+        names = tf.getnames()
+
+    for task_id in (1, 2, 3):
+        archive_name = '{}_{}'.format(entry_name, task_id)
+        assert archive_name in names
+        assert archive_name + '/' + archive_name + '.sigmf-meta' in names
+        assert archive_name + '/' + archive_name + '.sigmf-data' in names
+
+
+def test_list_archive_filters(user_client, test_scheduler):
+    entry_name = simulate_acquisitions(user_client, n=3)
+    url = reverse_acquisition_list_archive(entry_name)
+    query = {'min_task_id': 2, 'max_task_id': 2}
+    response = user_client.get(url, query, **HTTPS_KWARG)
+
+    assert response.status_code == status.HTTP_200_OK
+
+    content = b''.join(response.streaming_content)
+    with tarfile.open(fileobj=io.BytesIO(content)) as tf:
+        directories = [m.name for m in tf.getmembers() if m.isdir()]
+
+    assert directories == ['{}_2'.format(entry_name)]
+
+
+def test_list_archive_bad_filter(user_client, test_scheduler):
+    entry_name = simulate_acquisitions(user_client, n=1)
+    url = reverse_acquisition_list_archive(entry_name)
+    query = {'min_task_id': 'one', 'since': 'yesterday'}
+    response = user_client.get(url, query, **HTTPS_KWARG)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert set(response.data) == {'min_task_id', 'since'}
@@ -0,0 +1,129 @@
+"""Acquisition benchmarks, run with `pytest --benchmark -s`."""
+
+import copy
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pytest
+import sigmf.sigmffile
+
+from acquisitions.archive import SigMFArchiveStream
+from acquisitions.models import Acquisition
+from acquisitions.storage import FileSystemStorage
+from schedule.models import ScheduleEntry
+from sensor.tests.utils import print_benchmark, time_best_of
+from .utils import get_acquisition_list, simulate_acquisitions
+
+
+# Skip captures larger than this many bytes
+MAX_BYTES = int(os.environ.get('BENCHMARK_MAX_BYTES', 2**28))
+
+CAPTURE_SIZES = (10**6, 10**7, 10**8, 10**9)
+
+LIST_SIZES = ((1000, 10**4), (1000, 10**6), (1000, 10**7))
+
+METADATA = {
+    'global': {
+        'core:datatype': 'rf32_le',
+        'core:sample_rate': 15.36e6,
+        'core:version': '0.0.1'
+    },
+    'captures': [{'core:sample_start': 0, 'core:frequency': 700e6}],
+    'annotations': []
+}
+
+
+def legacy_archive(data):
+    """The pre-streaming archive view: temp files and a 4 KiB hash."""
+    with tempfile.NamedTemporaryFile() as tempdatafile:
+        tempdatafile.write(data)
+        tempdatafile.flush()
+
+        sigmf_file = sigmf.sigmffile.SigMFFile(
+            metadata=copy.deepcopy(METADATA))
+        the_hash = hashlib.sha512()
+        with open(tempdatafile.name, 'rb') as f:
+            for buff in iter(lambda: f.read(4096), b''):
+                the_hash.update(buff)
+        sigmf_file.set_global_field(sigmf_file.HASH_KEY, the_hash.hexdigest())
+
+        with tempfile.TemporaryFile() as t:
+            sigmf_file.data_file = tempdatafile.name
+            sigmf_file.archive(name='capture.sigmf', fileobj=t)
+            t.seek(0)
+            for chunk in iter(lambda: t.read(2**16), b''):
+                pass
+
+
+def stream_archive(data, sha512):
+    for chunk in SigMFArchiveStream('capture', METADATA, data, sha512):
+        pass
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('nbytes', CAPTURE_SIZES)
+def test_archive_latency(nbytes):
+    if nbytes > MAX_BYTES:
+        pytest.skip("{} bytes exceeds BENCHMARK_MAX_BYTES".format(nbytes))
+
+    location = tempfile.mkdtemp()
+    try:
+        storage = FileSystemStorage(location)
+        samples = np.random.randn(nbytes // 4).astype(np.float32)
+        name, _, sha512 = storage.save(samples)
+        del samples
+        data = storage.open(name)
+
+        legacy = time_best_of(lambda: legacy_archive(data))
+        unhashed = time_best_of(lambda: stream_archive(data, None))
+        stored = time_best_of(lambda: stream_archive(data, sha512))
+    finally:
+        shutil.rmtree(location)
+
+    print_benchmark(
+        'archive_latency',
+        nbytes=nbytes,
+        legacy_s='{:.4f}'.format(legacy),
+        stream_hashing_s='{:.4f}'.format(unhashed),
+        stream_stored_hash_s='{:.4f}'.format(stored),
+        speedup='{:.2f}'.format(legacy / stored)
+    )
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+@pytest.mark.parametrize('nacquisitions,nbytes', LIST_SIZES)
+def test_list_latency(user_client, test_scheduler, nacquisitions, nbytes):
+    if nacquisitions * nbytes > MAX_BYTES:
+        msg = "{} x {} bytes exceeds BENCHMARK_MAX_BYTES"
+        pytest.skip(msg.format(nacquisitions, nbytes))
+
+    # Legacy acquisitions with their sample data in the database
+    entry_name = simulate_acquisitions(user_client, n=1)
+    entry = ScheduleEntry.objects.get(name=entry_name)
+    data = b'\0' * nbytes
+    Acquisition.objects.bulk_create(
+        (Acquisition(schedule_entry=entry, task_id=task_id,
+                     sigmf_metadata=METADATA, data=data)
+         for task_id in range(2, nacquisitions + 1)),
+        batch_size=max(1, 2**26 // nbytes)
+    )
+
+    queryset = Acquisition.objects.filter(schedule_entry=entry)
+    legacy = time_best_of(lambda: list(queryset.all()))
+    deferred = time_best_of(lambda: list(queryset.without_data()))
+    endpoint = time_best_of(
+        lambda: get_acquisition_list(user_client, entry_name, limit=1000))
+
+    print_benchmark(
+        'acquisition_list_latency',
+        nacquisitions=nacquisitions,
+        nbytes=nbytes,
+        legacy_query_s='{:.4f}'.format(legacy),
+        deferred_query_s='{:.4f}'.format(deferred),
+        list_endpoint_s='{:.4f}'.format(endpoint),
+        speedup='{:.2f}'.format(legacy / deferred)
+    )
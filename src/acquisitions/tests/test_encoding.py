@@ -0,0 +1,77 @@
+import io
+
+import numpy as np
+import pytest
+
+from acquisitions.encoding import (
+    CODECS,
+    decode_iq,
+    encode_iq,
+    get_codec
+)
+
+
+def random_samples(n):
+    real, imag = np.random.normal(size=(2, n))
+    return (real + 1j * imag).astype(np.complex64)
+
+
+def test_encode_cf32():
+    samples = random_samples(1000)
+    encoded, scale = encode_iq(samples.astype(np.complex128), 'cf32_le')
+    assert scale is None
+    assert encoded.nbytes == 8 * samples.size
+    assert np.array_equal(decode_iq(encoded.tobytes(), 'cf32_le'), samples)
+
+
+def test_encode_ci16():
+    samples = random_samples(1000)
+    encoded, scale = encode_iq(samples, 'ci16_le')
+    assert encoded.dtype == np.dtype('<i2')
+    assert encoded.nbytes == 4 * samples.size
+    assert np.abs(encoded).max() == 32767
+
+    decoded = decode_iq(encoded.tobytes(), 'ci16_le', scale)
+    assert decoded.dtype == np.complex64
+    assert np.abs(decoded.real - samples.real).max() <= scale / 2 * 1.001
+    assert np.abs(decoded.imag - samples.imag).max() <= scale / 2 * 1.001
+
+
+def test_encode_ci16_silence():
+    encoded, scale = encode_iq(np.zeros(10, dtype=np.complex64), 'ci16_le')
+    assert scale == 1.0
+    assert not encoded.any()
+
+    encoded, scale = encode_iq(np.zeros(0, dtype=np.complex64), 'ci16_le')
+    assert encoded.size == 0
+
+
+def test_encode_bad_datatype():
+    with pytest.raises(ValueError):
+        encode_iq(random_samples(10), 'rf32_le')
+
+
+@pytest.mark.parametrize('name', sorted(CODECS))
+def test_codec_round_trip(name):
+    codec = get_codec(name)
+    data = np.zeros(2**20, dtype=np.float32)
+    data[::7] = np.random.normal(size=data[::7].size)
+    data = data.tobytes()
+
+    compressor = codec.compressobj()
+    compressed = b''.join(
+        compressor.compress(data[i:i + 100000])
+        for i in range(0, len(data), 100000))
+    compressed += compressor.flush()
+    assert len(compressed) < len(data)
+
+    chunk_size = 2**16
+    chunks = list(codec.iter_decompress(io.BytesIO(compressed), chunk_size))
+    assert max(len(chunk) for chunk in chunks) <= chunk_size
+    assert b''.join(chunks) == data
+
+
+def test_unknown_codec():
+    assert 'zlib' in CODECS
+    with pytest.raises(ValueError):
+        get_codec('rar')
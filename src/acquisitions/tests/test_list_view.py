@@ -3,6 +3,7 @@ from rest_framework import status
 
 from acquisitions.tests.utils import (
     get_acquisition_list,
+    get_acquisition_list_page,
     reverse_acquisition_detail,
     reverse_acquisition_list,
     simulate_acquisitions
@@ -47,6 +48,72 @@ def test_multiple_acquisition_response(user_client, test_scheduler):
         assert acq['task_id'] == i
 
 
+@pytest.mark.django_db
+def test_list_is_paginated(user_client, test_scheduler):
+    entry_name = simulate_acquisitions(user_client, n=5)
+    page = get_acquisition_list_page(user_client, entry_name, limit=2)
+    assert page['previous'] is None
+
+    task_ids = []
+    while True:
+        task_ids.extend(acq['task_id'] for acq in page['results'])
+        if page['next'] is None:
+            break
+
+        response = user_client.get(page['next'], **HTTPS_KWARG)
+        page = validate_response(response, status.HTTP_200_OK)
+
+    assert task_ids == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.django_db
+def test_list_after_task_id(user_client, test_scheduler):
+    entry_name = simulate_acquisitions(user_client, n=5)
+
+    acquisitions = get_acquisition_list(user_client, entry_name,
+                                        after_task_id=3)
+    assert [acq['task_id'] for acq in acquisitions] == [4, 5]
+    assert not get_acquisition_list(user_client, entry_name, after_task_id=5)
+
+
+@pytest.mark.django_db
+def test_list_since(user_client, test_scheduler):
+    entry_name = simulate_acquisitions(user_client, n=3)
+    acquisitions = get_acquisition_list(user_client, entry_name)
+
+    since = acquisitions[1]['created']
+    newer = get_acquisition_list(user_client, entry_name, since=since)
+    assert [acq['task_id'] for acq in newer] == [2, 3]
+
+    future = '2100-01-01T00:00:00Z'
+    assert not get_acquisition_list(user_client, entry_name, since=future)
+
+
+@pytest.mark.django_db
+def test_list_omit_metadata(user_client, test_scheduler):
+    entry_name = simulate_acquisitions(user_client, n=1)
+
+    acquisition, = get_acquisition_list(user_client, entry_name)
+    assert 'sigmf_metadata' in acquisition
+
+    acquisition, = get_acquisition_list(user_client, entry_name,
+                                        omit_metadata='true')
+    assert 'sigmf_metadata' not in acquisition
+    assert acquisition['task_id'] == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params', [
+    {'after_task_id': 'one'},
+    {'since': 'yesterday'},
+])
+def test_list_bad_filters(user_client, test_scheduler, params):
+    entry_name = simulate_acquisitions(user_client, n=1)
+    url = reverse_acquisition_list(entry_name)
+    response = user_client.get(url, params, **HTTPS_KWARG)
+    validate_response(response, status.HTTP_400_BAD_REQUEST)
+
+
 @pytest.mark.django_db
 def test_delete_list(user_client, test_scheduler):
     entry_name = simulate_acquisitions(user_client, n=3)
@@ -0,0 +1,31 @@
+"""Query counts shouldn't grow with the number of entries or acquisitions."""
+
+import pytest
+
+from sensor.tests.utils import count_queries
+from .utils import (
+    get_acquisition_list,
+    get_acquisitions_overview,
+    simulate_acquisitions
+)
+
+
+@pytest.mark.django_db
+def test_acquisitions_overview_queries(user_client, test_scheduler):
+    simulate_acquisitions(user_client, n=1, name='entry0')
+    nqueries = count_queries(get_acquisitions_overview, user_client)
+
+    for i in range(1, 4):
+        simulate_acquisitions(user_client, n=2, name='entry' + str(i))
+
+    assert count_queries(get_acquisitions_overview, user_client) <= nqueries
+
+
+@pytest.mark.django_db
+def test_acquisition_list_queries(user_client, test_scheduler):
+    small_entry = simulate_acquisitions(user_client, n=1, name='small')
+    large_entry = simulate_acquisitions(user_client, n=5, name='large')
+
+    nqueries = count_queries(get_acquisition_list, user_client, small_entry)
+    assert count_queries(
+        get_acquisition_list, user_client, large_entry) <= nqueries
@@ -0,0 +1,149 @@
+import hashlib
+import os
+
+import numpy as np
+import pytest
+from django.core.management import call_command
+
+from acquisitions.archive import SigMFArchiveStream
+from acquisitions.encoding import CODECS
+from acquisitions.models import Acquisition
+from acquisitions.storage import FileSystemStorage, StoredData
+from acquisitions.tests.utils import simulate_acquisitions
+from sensor.tests.utils import run_commit_callbacks
+
+
+def test_filesystem_storage(tmpdir):
+    storage = FileSystemStorage(location=str(tmpdir))
+    data = np.arange(16, dtype=np.float32)
+
+    name, size, sha512 = storage.save(data)
+    assert name.endswith('.sigmf-data')
+    assert size == data.nbytes
+    assert sha512 == hashlib.sha512(data.tobytes()).hexdigest()
+    assert storage.open(name).tobytes() == data.tobytes()
+
+    # Data is content-addressed
+    assert storage.save(data.copy())[0] == name
+    assert storage.save(data + 1)[0] != name
+
+    storage.delete(name)
+    assert not os.path.exists(storage.path(name))
+    storage.delete(name)  # deleting twice is harmless
+
+
+@pytest.mark.parametrize('codec', sorted(CODECS))
+def test_compressed_filesystem_storage(tmpdir, codec):
+    storage = FileSystemStorage(str(tmpdir))
+    data = np.zeros(3 * 2**20 + 5, dtype=np.uint8)
+    data[::3] = 1
+
+    name, size, sha512 = storage.save(data, codec=codec)
+    assert name.endswith('.sigmf-data.' + codec)
+    assert size == data.nbytes
+    assert sha512 == hashlib.sha512(data).hexdigest()
+    assert os.path.getsize(storage.path(name)) < data.nbytes
+
+    assert np.array_equal(storage.open(name), data)
+    chunks = list(storage.iter_chunks(name, 2**20))
+    assert max(len(chunk) for chunk in chunks) <= 2**20
+    assert b''.join(chunks) == data.tobytes()
+
+    # Stream the archive without decompressing the data up front
+    metadata = {'global': {}, 'captures': [], 'annotations': []}
+    stored = StoredData(storage, name, size)
+    streamed = SigMFArchiveStream('test', metadata, stored, sha512, mtime=0)
+    expected = SigMFArchiveStream('test', metadata, data, sha512, mtime=0)
+    archive = b''.join(streamed)
+    assert len(archive) == len(streamed)
+    assert archive == b''.join(expected)
+
+
+def test_filesystem_storage_check(tmpdir):
+    storage = FileSystemStorage(str(tmpdir.join('acquisition_data')))
+    assert storage.check() == []
+    assert tmpdir.join('acquisition_data').check(dir=True)
+    assert tmpdir.join('acquisition_data').listdir() == []
+
+    # A directory can't be created under a file
+    tmpdir.join('file').write('')
+    storage = FileSystemStorage(str(tmpdir.join('file', 'acquisition_data')))
+    errors = storage.check()
+    assert [error.id for error in errors] == ['acquisitions.E001']
+
+
+def test_compressed_acquisition_data(settings, user_client, test_scheduler):
+    settings.ACQUISITION_DATA_CODEC = 'zlib'
+    entry_name = simulate_acquisitions(user_client, n=1)
+    acquisition = Acquisition.objects.get(schedule_entry__name=entry_name)
+    assert acquisition.data_name.endswith('.zlib')
+
+    data = acquisition.read_data()
+    assert len(data) == acquisition.data_size
+    assert hashlib.sha512(data).hexdigest() == acquisition.data_sha512
+
+    stream = acquisition.stream_data()
+    assert b''.join(stream.iter_chunks(2**20)) == data.tobytes()
+
+
+def test_acquisition_data_is_stored_outside_db(user_client, test_scheduler):
+    entry_name = simulate_acquisitions(user_client, n=1)
+    acquisition = Acquisition.objects.get(schedule_entry__name=entry_name)
+    assert acquisition.data is None
+    assert os.path.exists(acquisition.data_path)
+    assert len(acquisition.read_data()) == acquisition.data_size
+
+    acquisition.delete()
+    # The file is only deleted once the delete is committed
+    assert os.path.exists(acquisition.data_path)
+    run_commit_callbacks()
+    assert not os.path.exists(acquisition.data_path)
+
+
+def test_migrate_acquisition_data(user_client, test_scheduler):
+    entry_name = simulate_acquisitions(user_client, n=1)
+    acquisition = Acquisition.objects.get(schedule_entry__name=entry_name)
+    data = acquisition.read_data().tobytes()
+    acquisition.data = data
+    acquisition.data_name = ''
+    acquisition.save()
+
+    call_command('migrate_acquisition_data')
+
+    acquisition.refresh_from_db()
+    assert acquisition.data is None
+    assert acquisition.data_sha512 == hashlib.sha512(data).hexdigest()
+    assert acquisition.read_data().tobytes() == data
+
+
+def test_legacy_data_is_hashed_once(user_client, test_scheduler):
+    entry_name = simulate_acquisitions(user_client, n=1)
+    acquisition = Acquisition.objects.get(schedule_entry__name=entry_name)
+    data = acquisition.read_data().tobytes()
+    acquisition.data = data
+    acquisition.data_name = ''
+    acquisition.data_sha512 = ''
+    acquisition.save()
+
+    sha512 = hashlib.sha512(data).hexdigest()
+    assert acquisition.get_data_sha512() == sha512
+
+    acquisition.refresh_from_db()
+    assert acquisition.data_sha512 == sha512
+
+
+def test_legacy_data_is_deferred(user_client, test_scheduler):
+    entry_name = simulate_acquisitions(user_client, n=1)
+    acquisition = Acquisition.objects.get(schedule_entry__name=entry_name)
+    data = acquisition.read_data().tobytes()
+    acquisition.data = data
+    acquisition.data_name = ''
+    acquisition.save()
+
+    acquisition = Acquisition.objects.without_data().get(pk=acquisition.pk)
+    assert 'data' in acquisition.get_deferred_fields()
+    assert bytes(acquisition.read_data()) == data  # loaded on access
+
+    acquisition = Acquisition.objects.get(pk=acquisition.pk)
+    assert not acquisition.get_deferred_fields()
+    assert bytes(acquisition.data) == data
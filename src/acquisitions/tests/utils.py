@@ -62,6 +62,15 @@ def reverse_acquisition_list(schedule_entry_name):
     return reverse('acquisition-list', kwargs=kws, request=request)
 
 
+def reverse_acquisition_list_archive(schedule_entry_name):
+    rf = RequestFactory()
+    url = '/'.join(['/acquisitions', schedule_entry_name, 'archive'])
+    request = rf.get(url, **HTTPS_KWARG)
+    kws = {'schedule_entry_name': schedule_entry_name}
+    kws.update(V1)
+    return reverse('acquisition-list-archive', kwargs=kws, request=request)
+
+
 def reverse_acquisition_detail(schedule_entry_name, task_id):
     rf = RequestFactory()
     url = '/acquisitions/' + schedule_entry_name + '/' + str(task_id)
@@ -87,12 +96,18 @@ def get_acquisitions_overview(client):
     return validate_response(response, status.HTTP_200_OK)
 
 
-def get_acquisition_list(client, schedule_entry_name):
+def get_acquisition_list_page(client, schedule_entry_name, **params):
     url = reverse_acquisition_list(schedule_entry_name)
-    response = client.get(url, **HTTPS_KWARG)
+    response = client.get(url, params, **HTTPS_KWARG)
     return validate_response(response, status.HTTP_200_OK)
 
 
+def get_acquisition_list(client, schedule_entry_name, **params):
+    """Return the acquisitions on the first page of the list."""
+    page = get_acquisition_list_page(client, schedule_entry_name, **params)
+    return page['results']
+
+
 def get_acquisition_detail(client, schedule_entry_name, task_id):
     url = reverse_acquisition_detail(schedule_entry_name, task_id)
     response = client.get(url, **HTTPS_KWARG)
@@ -1,9 +1,10 @@
-import tempfile
-
-from django.core.files import File
-from django.http import Http404, HttpResponse
+from django.db.models import Count
+from django.http import Http404, StreamingHttpResponse
+from django.utils.dateparse import parse_datetime
 from rest_framework import status
 from rest_framework.decorators import list_route, detail_route
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import BooleanField
 from rest_framework.generics import get_object_or_404
 from rest_framework.mixins import (ListModelMixin,
                                    RetrieveModelMixin,
@@ -12,9 +13,9 @@ from rest_framework.response import Response
 from rest_framework.settings import api_settings
 from rest_framework.viewsets import GenericViewSet
 
-import sigmf.sigmffile
-
 from schedule.models import ScheduleEntry
+from sensor.pagination import TaskCursorPagination
+from .archive import SigMFArchiveStream, iter_archives
 from .models import Acquisition
 from .permissions import IsAdminOrOwnerOrReadOnly
 from .serializers import (AcquisitionsOverviewSerializer,
@@ -36,10 +37,11 @@ class AcquisitionsOverviewViewSet(ListModelMixin, GenericViewSet):
         # checks, so we need to filter our queryset based on `is_private` and
         # request user.
         base_queryset = self.filter_queryset(self.queryset)
-        if self.request.user.is_staff:
-            return base_queryset
-        else:
-            return base_queryset.filter(is_private=False)
+        if not self.request.user.is_staff:
+            base_queryset = base_queryset.filter(is_private=False)
+
+        return base_queryset.annotate(
+            acquisitions_available=Count('acquisitions'))
 
 
 class MultipleFieldLookupMixin(object):
@@ -69,17 +71,39 @@ class AcquisitionListViewSet(MultipleFieldLookupMixin,
                              GenericViewSet):
     """
     list:
-    Returns a list of all acquisitions created by the given schedule entry.
+    Returns a page of the acquisitions created by the given schedule entry,
+    oldest first. Pass `since` or `after_task_id` to only list newer
+    acquisitions, `limit` to set the page size, and `omit_metadata=true` to
+    leave out each acquisition's SigMF metadata.
 
     destroy_all:
     Deletes all acquisitions created by the given schedule entry.
+
+    archive:
+    Downloads a single tar file containing the SigMF archive of each
+    acquisition created by the given schedule entry. Filter with the
+    `min_task_id`, `max_task_id`, `since` and `until` query parameters.
     """
-    queryset = Acquisition.objects.all()
+    queryset = Acquisition.objects.without_data()
     serializer_class = AcquisitionSerializer
+    pagination_class = TaskCursorPagination
     permission_classes = (
         api_settings.DEFAULT_PERMISSION_CLASSES + [IsAdminOrOwnerOrReadOnly])
     lookup_fields = ('schedule_entry__name', 'task_id')
 
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        omit_metadata = (
+            request.query_params.get('omit_metadata') in
+            BooleanField.TRUE_VALUES)
+        if omit_metadata:
+            queryset = queryset.defer('sigmf_metadata')
+
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(
+            page, many=True, omit_metadata=omit_metadata)
+        return self.get_paginated_response(serializer.data)
+
     @list_route(methods=('delete',))
     def destroy_all(self, request, version, schedule_entry_name):
         queryset = self.get_queryset()
@@ -92,6 +116,69 @@ class AcquisitionListViewSet(MultipleFieldLookupMixin,
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @list_route()
+    def archive(self, request, version, schedule_entry_name):
+        queryset = self.get_queryset()
+        queryset = filter_archive_queryset(queryset, request.query_params)
+
+        # Stream rows from the database cursor and load sample data one
+        # acquisition at a time (the queryset defers the `data` column)
+        acquisitions = queryset.order_by('task_id').iterator()
+        archives = (
+            SigMFArchiveStream(
+                schedule_entry_name + '_' + str(acq.task_id),
+                acq.sigmf_metadata,
+                acq.stream_data(),
+                sha512=acq.data_sha512 or None
+            )
+            for acq in acquisitions
+        )
+
+        # The total size isn't known up front, so there's no Content-Length
+        filename = schedule_entry_name + '.tar'
+        content_type = 'application/x-tar'
+        response = StreamingHttpResponse(
+            iter_archives(archives), content_type=content_type)
+        content_disp = 'attachment; filename="{}"'.format(filename)
+        response['Content-Disposition'] = content_disp
+        return response
+
+
+def filter_archive_queryset(queryset, query_params):
+    """Filter acquisitions by the task_id and time range in query_params."""
+    errors = {}
+    filters = {}
+
+    for param, lookup in (('min_task_id', 'task_id__gte'),
+                          ('max_task_id', 'task_id__lte')):
+        value = query_params.get(param)
+        if value is None:
+            continue
+
+        try:
+            filters[lookup] = int(value)
+        except ValueError:
+            errors[param] = ["A valid integer is required."]
+
+    for param, lookup in (('since', 'created__gte'),
+                          ('until', 'created__lte')):
+        value = query_params.get(param)
+        if value is None:
+            continue
+
+        try:
+            filters[lookup] = parse_datetime(value)
+        except ValueError:
+            filters[lookup] = None
+
+        if filters[lookup] is None:
+            errors[param] = ["A valid ISO 8601 datetime is required."]
+
+    if errors:
+        raise ValidationError(errors)
+
+    return queryset.filter(**filters)
+
 
 class AcquisitionInstanceViewSet(MultipleFieldLookupMixin,
                                  RetrieveModelMixin,
@@ -113,24 +200,31 @@ class AcquisitionInstanceViewSet(MultipleFieldLookupMixin,
         api_settings.DEFAULT_PERMISSION_CLASSES + [IsAdminOrOwnerOrReadOnly])
     lookup_fields = ('schedule_entry__name', 'task_id')
 
+    def get_queryset(self):
+        queryset = super(AcquisitionInstanceViewSet, self).get_queryset()
+        if self.action != 'archive':
+            queryset = queryset.without_data()
+
+        return queryset
+
     @detail_route()
     def archive(self, request, version, schedule_entry_name, task_id):
         entry_name = schedule_entry_name
         acq = self.get_object()
 
-        with tempfile.NamedTemporaryFile() as tempdatafile:
-            tempdatafile.write(acq.data)
-            tempdatafile.seek(0)  # move fd ptr to start of data for reading
-
-            sigmf_file = sigmf.sigmffile.SigMFFile(metadata=acq.sigmf_metadata)
-            sigmf_file.set_data_file(tempdatafile.name)
-
-            with tempfile.TemporaryFile() as t:
-                # FIXME: prefix filename with sensor_id when that is available
-                filename = entry_name + '_' + str(task_id) + '.sigmf'
-                sigmf_file.archive(name=filename, fileobj=t)
-                content_type = 'application/x-tar'
-                response = HttpResponse(File(t), content_type=content_type)
-                content_disp = 'attachment; filename="{}"'.format(filename)
-                response['Content-Disposition'] = content_disp
-                return response
+        # FIXME: prefix filename with sensor_id when that is available
+        archive_name = entry_name + '_' + str(task_id)
+        filename = archive_name + '.sigmf'
+        stream = SigMFArchiveStream(
+            archive_name,
+            acq.sigmf_metadata,
+            acq.stream_data(),
+            sha512=acq.get_data_sha512()
+        )
+
+        content_type = 'application/x-tar'
+        response = StreamingHttpResponse(stream, content_type=content_type)
+        response['Content-Length'] = str(len(stream))
+        content_disp = 'attachment; filename="{}"'.format(filename)
+        response['Content-Disposition'] = content_disp
+        return response
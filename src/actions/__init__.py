@@ -1,3 +1,4 @@
+from . import acquire_frequency_sweep
 from . import acquire_single_freq_fft
 from . import time_sample_acquire
 from . import logger
@@ -10,6 +11,13 @@ registered_actions = {
         frequency=751e6,
         sample_rate=15.36e6,
         fft_size=1024,
+        nffts=300,
+        median_method='exact'  # or 'histogram' to trade accuracy for CPU
+    ),
+    "sweep700_800": acquire_frequency_sweep.FrequencySweepFftAcquisition(
+        frequencies=[700e6 + i * 10e6 for i in range(11)],
+        sample_rate=15.36e6,
+        fft_size=1024,
         nffts=300
     ),
     "acquire1024samples" : time_sample_acquire.SingleTimeAcquisition(
@@ -0,0 +1,145 @@
+"""Take acquisitions at a series of frequencies as a single task."""
+
+from __future__ import absolute_import
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from rest_framework.reverse import reverse
+
+from sensor import V1, utils
+
+from . import offload
+from .acquire_single_freq_fft import SingleFrequencyFftAcquisition
+
+
+logger = logging.getLogger(__name__)
+
+
+class FrequencySweepFftAcquisition(SingleFrequencyFftAcquisition):
+    """Perform m4s detection over single-frequency FFTs at each frequency.
+
+    The radio's clock and sample rate are set once per task and only the
+    center frequency is changed between steps. The detector for one step
+    runs in a worker thread while the next step is captured, and all steps
+    are stored in a single acquisition with one SigMF capture per step.
+
+    :param frequencies: an iterable of center frequencies in Hz
+    :param sample_rate: requested sample_rate in Hz
+    :param fft_size: number of points in FFT (some 2^n)
+    :param nffts: number of consecutive FFTs to pass to detector per step
+    :param median_method: 'exact' or 'histogram' (see `m4s_detector`)
+
+    """
+    def __init__(self, frequencies, sample_rate, fft_size, nffts,
+                 median_method='exact'):
+        frequencies = list(frequencies)
+        if not frequencies:
+            raise ValueError("frequency sweep requires at least 1 frequency")
+
+        super(FrequencySweepFftAcquisition, self).__init__(
+            frequency=frequencies[0],
+            sample_rate=sample_rate,
+            fft_size=fft_size,
+            nffts=nffts,
+            median_method=median_method
+        )
+
+        self.frequencies = frequencies
+
+    def __call__(self, schedule_entry_name, task_id):
+        from schedule.models import ScheduleEntry
+
+        # raises ScheduleEntry.DoesNotExist if no matching schedule entry
+        parent_entry = ScheduleEntry.objects.get(name=schedule_entry_name)
+
+        self.test_required_components()
+        self.set_usrp_clock_rate()
+        self.set_usrp_sample_rate()
+        m4s_data, captures = self.sweep(parent_entry, task_id)
+        sigmf_md = self.build_sweep_sigmf_md(captures)
+        self.archive(m4s_data, sigmf_md, parent_entry, task_id)
+
+        kws = {'schedule_entry_name': schedule_entry_name, 'task_id': task_id}
+        kws.update(V1)
+        detail = reverse(
+            'acquisition-detail',
+            kwargs=kws,
+            request=parent_entry.request
+        )
+
+        return detail
+
+    def sweep(self, parent_entry, task_id):
+        """Capture each step while the previous step's detector runs.
+
+        At most one step is waiting on the detector at a time, so only two
+        steps worth of samples are held in memory at once. The action is
+        shared between tasks, so each step's frequency is passed along
+        instead of being set on it.
+
+        :returns: a (5 * nsteps x fft_size) array of m4s data in dBm and a
+                  list of SigMF capture metadata, one per step
+
+        """
+        captures = []
+        m4s_steps = []
+        pending = None
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            for frequency in self.frequencies:
+                frequency = self.set_usrp_frequency(frequency)
+                captures.append({
+                    "core:frequency": frequency,
+                    "core:time": utils.get_datetime_str_now()
+                })
+                data = self.acquire_data(parent_entry, task_id, frequency)
+
+                try:
+                    if pending is not None:
+                        m4s_steps.append(pending.result())
+
+                    pending = executor.submit(self.apply_detector, data)
+                except Exception:
+                    # apply_detector releases the data it's given, but this
+                    # step never got that far
+                    offload.release(data)
+                    raise
+
+            m4s_steps.append(pending.result())
+
+        return np.concatenate(m4s_steps), captures
+
+    def get_sigmf_template_key(self):
+        sweep = super(FrequencySweepFftAcquisition, self)
+        return sweep.get_sigmf_template_key() + (tuple(self.frequencies),)
+
+    def build_sweep_sigmf_md(self, captures):
+        logger.debug("Building SigMF metadata")
+
+        # Each step's capture is followed by its own detector annotations
+        return self.get_sigmf_template().render(captures)
+
+    @property
+    def description(self):
+        return """Apply m4s detector over {} {}-point FFTs at {} frequencies.
+
+        The frequencies range from {:.2f} to {:.2f} MHz and the radio will
+        use a sample rate of {:.2f} MHz.
+
+        At each frequency, the m4s detector will take the min, max, mean,
+        median, and a random sample over the requested FFTs. Each frequency
+        is stored as a separate capture in the same acquisition.
+
+        The FFTs are taken gap-free in time and a Blackman window is applied.
+        The resulting data is real-valued with units of dBm.
+        {}
+        """.format(
+            self.nffts,
+            self.fft_size,
+            len(self.frequencies),
+            min(self.frequencies) / 1e6,
+            max(self.frequencies) / 1e6,
+            self.sample_rate / 1e6,
+            self.median_description
+        )
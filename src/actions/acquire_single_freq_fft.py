@@ -3,20 +3,24 @@
 from __future__ import absolute_import
 
 import logging
+import threading
 from itertools import compress
 
 import numpy as np
+from django import db
 from enum import Enum
+from six.moves import queue
 
 from rest_framework.reverse import reverse
-from sigmf.sigmffile import SigMFFile
 
-from capabilities.models import SensorDefinition
-from capabilities.serializers import SensorDefinitionSerializer
+from capabilities.calibration import scale_factors
+from capabilities.definition import sensor_definition
 from sensor import V1, settings, utils
 
 from .base import Action
-from . import usrp
+from .dsp import HistogramMedian, StreamingM4sDetector, get_fft_plan
+from .metadata import SigMFTemplate
+from . import offload, usrp
 
 
 logger = logging.getLogger(__name__)
@@ -39,28 +43,80 @@ class M4sDetector(Enum):
 # FIXME: this needs to be defined globally somewhere
 SCOS_TRANSFER_SPEC_VER = '0.1'
 
+WINDOW = 'blackman'
+IMPEDANCE = 50.0  # ohms
+MEDIAN_METHODS = ('exact', 'histogram')
 
-def m4s_detector(array):
+
+def m4s_detector(array, median='exact'):
     """Take min, max, mean, median, and random sample of n-dimensional array.
 
     Detector is applied along each column.
 
+    With `median='exact'`, the random sample and mean are taken first and a
+    single partition of a transposed copy then yields the min, max and
+    median of each column.
+    With `median='histogram'`, the median is estimated from a log-power
+    histogram (see :class:`actions.dsp.HistogramMedian`) and is within
+    `HistogramMedian.error_bound_db` (0.125 dB by default) of the exact
+    median for powers between -200 and 100 dB.
+
     :param array: an (m x n) array of real frequency-domain linear power values
-    :returns: a (5 x n) in the order min, max, mean, median, sample in the case
-              that `detector` is `m4s`, otherwise a (1 x n) array
+    :param median: 'exact' or 'histogram'
+    :returns: a (5 x n) in the order min, max, mean, median, sample
 
     """
-    amin = np.min(array, axis=0)
-    amax = np.max(array, axis=0)
-    mean = np.mean(array, axis=0)
-    median = np.median(array, axis=0)
-    random_sample = array[np.random.randint(0, array.shape[0], 1)][0]
+    if median not in MEDIAN_METHODS:
+        msg = "median must be one of {}, not {!r}"
+        raise ValueError(msg.format(MEDIAN_METHODS, median))
+
+    m = array.shape[0]
+    random_sample = array[np.random.randint(0, m)].copy()
+    mean = np.sum(array, axis=0, dtype=np.float64) / m
+
+    if median == 'histogram':
+        amin = np.min(array, axis=0)
+        amax = np.max(array, axis=0)
+        hist = HistogramMedian(array.shape[1], max_rows=m)
+        hist.update(array)
+        amedian = hist.median()
+    else:
+        # Partitioning contiguous rows is much faster than strided columns
+        columns = np.ascontiguousarray(array.T)
+        lo_mid = (m - 1) // 2
+        hi_mid = m // 2
+        columns.partition(sorted({0, lo_mid, hi_mid, m - 1}), axis=1)
+        amin = columns[:, 0]
+        amax = columns[:, m - 1]
+        amedian = (columns[:, lo_mid] + columns[:, hi_mid]) / 2.0
+
     m4s = np.array(
-        [amin, amax, mean, median, random_sample], dtype=np.float32)
+        [amin, amax, mean, amedian, random_sample], dtype=np.float32)
 
     return m4s
 
 
+def detect(data, fft_size, median_method='exact'):
+    """Take FFTs of data, apply the m4s detector, and convert to dBm.
+
+    Data is overwritten. This is a module-level function so it can be run
+    in the process pool (see `actions.offload`).
+
+    :param data: an (nffts x fft_size) complex array of samples
+    :returns: a (5 x fft_size) float32 array in dBm
+
+    """
+    plan = get_fft_plan(fft_size, WINDOW, IMPEDANCE)
+    # Window, FFT, shift fc to center, and take power
+    fdata_watts = plan.power_spectra(data, overwrite_input=True)
+    # Apply detector while we're linear
+    # The m4s detector returns a (5 x fft_size) ndarray
+    fdata_watts_m4s = m4s_detector(fdata_watts, median_method)
+    fdata_dbm_m4s = plan.watts_to_dbm(fdata_watts_m4s)
+
+    return fdata_dbm_m4s
+
+
 class SingleFrequencyFftAcquisition(Action):
     """Perform m4s detection over requested number of single-frequency FFTs.
 
@@ -68,17 +124,32 @@ class SingleFrequencyFftAcquisition(Action):
     :param sample_rate: requested sample_rate in Hz
     :param fft_size: number of points in FFT (some 2^n)
     :param nffts: number of consecutive FFTs to pass to detector
+    :param nffts_per_chunk: if given, stream the acquisition in chunks of
+                            this many FFTs and overlap capture with detection
+    :param median_method: 'exact', or 'histogram' to estimate the median
+                          with less CPU time (see `m4s_detector`). Streaming
+                          acquisitions always use 'histogram'.
 
     """
-    def __init__(self, frequency, sample_rate, fft_size, nffts):
+    resources = ('usrp',)
+
+    def __init__(self, frequency, sample_rate, fft_size, nffts,
+                 nffts_per_chunk=None, median_method='exact'):
         super(SingleFrequencyFftAcquisition, self).__init__()
 
         self.frequency = frequency
         self.sample_rate = sample_rate
         self.fft_size = fft_size
         self.nffts = nffts
+        self.nffts_per_chunk = nffts_per_chunk
+        if median_method not in MEDIAN_METHODS:
+            msg = "median_method must be one of {}, not {!r}"
+            raise ValueError(msg.format(MEDIAN_METHODS, median_method))
+
+        self.median_method = median_method
         self.usrp = usrp  # make instance variable to allow hotswapping mock
         self.enbw = None
+        self._sigmf_template = None
 
     def __call__(self, schedule_entry_name, task_id):
         from schedule.models import ScheduleEntry
@@ -88,8 +159,11 @@ class SingleFrequencyFftAcquisition(Action):
 
         self.test_required_components()
         self.configure_usrp()
-        data = self.acquire_data(parent_entry, task_id)
-        m4s_data = self.apply_detector(data)
+        if self.nffts_per_chunk:
+            m4s_data = self.apply_streaming_detector()
+        else:
+            data = self.acquire_data(parent_entry, task_id)
+            m4s_data = self.apply_detector(data)
         sigmf_md = self.build_sigmf_md()
         self.archive(m4s_data, sigmf_md, parent_entry, task_id)
 
@@ -122,7 +196,7 @@ class SingleFrequencyFftAcquisition(Action):
     def configure_usrp(self):
         self.set_usrp_clock_rate()
         self.set_usrp_sample_rate()
-        self.set_usrp_frequency()
+        self.frequency = self.set_usrp_frequency()
 
     def set_usrp_sample_rate(self):
         self.usrp.radio.sample_rate = self.sample_rate
@@ -135,51 +209,117 @@ class SingleFrequencyFftAcquisition(Action):
 
         self.usrp.radio.clock_rate = clock_rate
 
-    def set_usrp_frequency(self):
-        requested_frequency = self.frequency
-        self.usrp.radio.frequency = requested_frequency
-        self.frequency = self.usrp.radio.frequency
+    def set_usrp_frequency(self, frequency=None):
+        """Tune the radio and return the frequency it tuned to.
 
-    def acquire_data(self, parent_entry, task_id):
-        msg = "Acquiring {} FFTs at {} MHz"
-        logger.debug(msg.format(self.nffts, self.frequency / 1e6))
+        :param frequency: center frequency in Hz, defaults to
+                          `self.frequency`
+
+        """
+        if frequency is None:
+            frequency = self.frequency
 
-        data = self.usrp.radio.acquire_samples(self.nffts * self.fft_size)
-        data.resize((self.nffts, self.fft_size))
+        self.usrp.radio.frequency = frequency
+        return self.usrp.radio.frequency
+
+    def acquire_data(self, parent_entry, task_id, frequency=None):
+        msg = "Acquiring {} FFTs at {} MHz"
+        if frequency is None:
+            frequency = self.frequency
+
+        logger.debug(msg.format(self.nffts, frequency / 1e6))
+
+        shape = (self.nffts, self.fft_size)
+        if offload.is_enabled():
+            # Capture straight into memory the DSP process pool can map
+            data = offload.shared_empty(shape, np.complex64)
+            try:
+                self.usrp.radio.acquire_samples(
+                    data.size, out=data.reshape(-1))
+            except Exception:
+                offload.release(data)
+                raise
+        else:
+            data = self.usrp.radio.acquire_samples(self.nffts * self.fft_size)
+            data.resize(shape)
 
         return data
 
     def build_sigmf_md(self):
-        logger.debug("Building SigMF metadata file")
+        logger.debug("Building SigMF metadata")
+
+        capture_md = {
+            "core:frequency": self.frequency,
+            "core:time": utils.get_datetime_str_now()
+        }
+
+        return self.get_sigmf_template().render([capture_md])
+
+    def get_sigmf_template(self):
+        """Return the SigMF template for the current configuration.
+
+        The template is compiled on first use and again only if
+        `get_sigmf_template_key` changes, so the global fields and detector
+        annotations aren't built for every task.
+
+        """
+        key = self.get_sigmf_template_key()
+        cached = self._sigmf_template
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        logger.debug("Compiling SigMF metadata template")
+        template = SigMFTemplate(
+            self.get_global_sigmf_fields(),
+            self.get_detector_annotations(),
+            len(M4sDetector) * self.fft_size
+        )
+        self._sigmf_template = (key, template)
 
-        sigmf_md = SigMFFile()
-        sigmf_md.set_global_field("core:datatype", "rf32_le")
-        sigmf_md.set_global_field("core:sample_rate", self.sample_rate)
-        sigmf_md.set_global_field("core:description", self.description)
+        return template
 
-        sensor_def_obj = SensorDefinition.objects.get()
-        sensor_def_json = SensorDefinitionSerializer(sensor_def_obj).data
-        sigmf_md.set_global_field("scos:sensor_definition", sensor_def_json)
+    def get_sigmf_template_key(self):
+        """Return the configuration the SigMF template is compiled from.
 
+        This includes the generations of the sensor definition and scale
+        factor caches, which change whenever either is invalidated.
+
+        """
+        return (
+            self.frequency,
+            self.sample_rate,
+            self.fft_size,
+            self.nffts,
+            self.nffts_per_chunk,
+            self.median_method,
+            self.enbw,
+            tuple(settings.ALLOWED_HOSTS),
+            sensor_definition.generation,
+            scale_factors.generation
+        )
+
+    def get_global_sigmf_fields(self):
         try:
             fqdn = settings.ALLOWED_HOSTS[1]
         except IndexError:
             fqdn = 'not.set'
 
-        sigmf_md.set_global_field("scos:sensor_id", fqdn)
-        sigmf_md.set_global_field("scos:version", SCOS_TRANSFER_SPEC_VER)
-
-        capture_md = {
-            "core:frequency": self.frequency,
-            "core:time": utils.get_datetime_str_now()
+        return {
+            "core:datatype": "rf32_le",
+            "core:sample_rate": self.sample_rate,
+            "core:description": self.description,
+            "scos:sensor_definition": sensor_definition.get(),
+            "scos:sensor_id": fqdn,
+            "scos:version": SCOS_TRANSFER_SPEC_VER
         }
 
-        sigmf_md.add_capture(start_index=0, metadata=capture_md)
-
+    def get_detector_annotations(self):
+        """Return `(start_index, length, metadata)` for each detector."""
+        annotations = []
         for i, detector in enumerate(M4sDetector):
             single_frequency_fft_md = {
                 "number_of_samples_in_fft": self.fft_size,
-                "window": "blackman",
+                "window": WINDOW,
                 "equivalent_noise_bandwidth": self.enbw,
                 "detector": detector.name + "_power",
                 "number_of_ffts": self.nffts,
@@ -193,52 +333,117 @@ class SingleFrequencyFftAcquisition(Action):
                 }
             }
 
-            sigmf_md.add_annotation(
-                start_index=(i * self.fft_size),
-                length=self.fft_size,
-                metadata=annotation_md
-            )
+            annotations.append(
+                (i * self.fft_size, self.fft_size, annotation_md))
 
-        return sigmf_md
+        return annotations
 
     def apply_detector(self, data):
-        """Take FFT of data, apply detector, and translate watts to dBm."""
-        logger.debug("Applying detector")
+        """Take FFT of data, apply detector, and translate watts to dBm.
 
-        window = np.blackman(self.fft_size)
-        window_power = sum(window**2)
-        impedance = 50.0  # ohms
+        Data captured into shared memory by `acquire_data` is processed in
+        the DSP process pool and then released.
 
-        self.enbw = self.fft_size * window_power / sum(window)**2
+        """
+        logger.debug("Applying detector")
 
-        Vsq2W_dB = -10.0 * np.log10(self.fft_size * window_power * impedance)
+        self.enbw = self.fft_plan.enbw
+        if not offload.is_shared(data):
+            return detect(data, self.fft_size, self.median_method)
 
-        # Apply window
-        tdata_windowed = data * window
-        # Take FFT
-        fdata = np.fft.fft(tdata_windowed)
-        # Shift fc to center
-        fdata_shifted = np.fft.fftshift(fdata)
-        # Take power
-        fdata_watts = np.square(np.abs(fdata_shifted))
-        # Apply detector while we're linear
-        # The m4s detector returns a (5 x fft_size) ndarray
-        fdata_watts_m4s = m4s_detector(fdata_watts)
-        fdata_dbm_m4s = 10 * np.log10(fdata_watts_m4s) + 30 + Vsq2W_dB
+        try:
+            return offload.run_in_process(
+                detect, data, self.fft_size, self.median_method)
+        finally:
+            offload.release(data)
+
+    def apply_streaming_detector(self):
+        """Acquire and detect chunks of FFTs concurrently.
+
+        A producer thread acquires `nffts_per_chunk` FFTs worth of samples at
+        a time while this thread transforms and detects the previous chunk,
+        so at most a few chunks are held in memory at once. FFTs are
+        gap-free within a chunk, but each chunk is a separate capture.
+
+        """
+        msg = "Streaming {} FFTs at {} MHz in chunks of {}"
+        logger.debug(msg.format(
+            self.nffts, self.frequency / 1e6, self.nffts_per_chunk))
+
+        plan = self.fft_plan
+        self.enbw = plan.enbw
+        detector = StreamingM4sDetector(self.fft_size, self.nffts)
+        chunks = queue.Queue(maxsize=2)
+        cancelled = threading.Event()
+        producer = threading.Thread(
+            target=self._produce_chunks,
+            args=(chunks, cancelled),
+            name='StreamingAcquisition'
+        )
+        producer.daemon = True
+        producer.start()
+
+        try:
+            while True:
+                chunk = chunks.get()
+                if chunk is None:
+                    break
+                if isinstance(chunk, Exception):
+                    raise chunk
+
+                spectra = plan.power_spectra(chunk, overwrite_input=True)
+                detector.update(spectra)
+        finally:
+            cancelled.set()
+            producer.join()
+
+        fdata_watts_m4s = detector.result()
+        fdata_dbm_m4s = plan.watts_to_dbm(fdata_watts_m4s)
 
         return fdata_dbm_m4s
 
+    def _produce_chunks(self, chunks, cancelled):
+        """Put (m x fft_size) sample arrays into `chunks`, then `None`."""
+        try:
+            remaining = self.nffts
+            while remaining and not cancelled.is_set():
+                nffts = min(self.nffts_per_chunk, remaining)
+                data = self.usrp.radio.acquire_samples(nffts * self.fft_size)
+                self._put_chunk(chunks, cancelled, data.reshape(nffts, -1))
+                remaining -= nffts
+
+            self._put_chunk(chunks, cancelled, None)
+        except Exception as err:
+            self._put_chunk(chunks, cancelled, err)
+        finally:
+            # This thread may have opened its own database connection
+            db.connection.close()
+
+    @staticmethod
+    def _put_chunk(chunks, cancelled, chunk):
+        while not cancelled.is_set():
+            try:
+                chunks.put(chunk, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    @property
+    def fft_plan(self):
+        return get_fft_plan(self.fft_size, WINDOW, IMPEDANCE)
+
     def archive(self, m4s_data, sigmf_md, parent_entry, task_id):
         from acquisitions.models import Acquisition
 
-        logger.debug("Storing acquisition in database")
+        logger.debug("Storing acquisition")
 
-        Acquisition(
+        acquisition = Acquisition(
             schedule_entry=parent_entry,
             task_id=task_id,
-            sigmf_metadata=sigmf_md._metadata,
-            data=m4s_data
-        ).save()
+            sigmf_metadata=sigmf_md
+        )
+        acquisition.store_data(m4s_data)
+        acquisition.save()
 
     @property
     def description(self):
@@ -251,10 +456,31 @@ class SingleFrequencyFftAcquisition(Action):
 
         The FFTs are taken gap-free in time and a Blackman window is applied.
         The resulting data is real-valued with units of dBm.
-
+        {}
         """.format(
             self.nffts,
             self.fft_size,
             self.frequency / 1e6,
-            self.sample_rate / 1e6
+            self.sample_rate / 1e6,
+            self.streaming_description or self.median_description
         )
+
+    @property
+    def median_description(self):
+        if self.median_method != 'histogram':
+            return ""
+
+        return """
+        The median is estimated from a histogram of the power in each bin.
+        """
+
+    @property
+    def streaming_description(self):
+        if not self.nffts_per_chunk:
+            return ""
+
+        return """
+        The FFTs are acquired in chunks of {} that are processed while the
+        next chunk is captured. FFTs within a chunk are gap-free, and the
+        median is estimated from a histogram of the power in each bin.
+        """.format(self.nffts_per_chunk)
@@ -15,7 +15,14 @@ class Action(object):
         and if the value returned to the scheduler is a string, it will be
         added to the task result's detail field.
 
+    Set `resources` to the names of shared resources, such as the `usrp`
+    radio, that the action needs exclusive access to. The scheduler never
+    runs two tasks that need the same resource at once, but runs other
+    tasks concurrently.
+
     """
+    resources = ()
+
     def __init__(self, admin_only=False):
         self.admin_only = admin_only
 
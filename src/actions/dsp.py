@@ -0,0 +1,259 @@
+"""Signal processing helpers shared by the FFT-based actions."""
+
+from __future__ import absolute_import, division
+
+import numpy as np
+
+
+WINDOWS = {
+    'bartlett': np.bartlett,
+    'blackman': np.blackman,
+    'boxcar': np.ones,
+    'hamming': np.hamming,
+    'hanning': np.hanning,
+}
+
+# Upper bound on the complex FFT scratch space used by FftPlan.power_spectra
+MAX_FFT_BLOCK_BYTES = 16 * 2**20
+
+# Upper bound on the histogram counters HistogramMedian works on at once
+MAX_HISTOGRAM_BLOCK_COUNTS = 2**20
+
+_fft_plans = {}
+
+
+def get_fft_plan(fft_size, window='blackman', impedance=50.0):
+    """Return a cached :class:`FftPlan` for the given configuration."""
+    key = (fft_size, window, impedance)
+    try:
+        return _fft_plans[key]
+    except KeyError:
+        plan = _fft_plans[key] = FftPlan(fft_size, window, impedance)
+        return plan
+
+
+class FftPlan(object):
+    """Precomputed constants for converting sample frames to power spectra.
+
+    Plans are immutable once created, so use :func:`get_fft_plan` to share
+    one between tasks instead of recomputing the window on every task.
+
+    :param fft_size: number of points in FFT (some 2^n)
+    :param window: name of a window function in `WINDOWS`
+    :param impedance: system impedance in ohms
+
+    """
+    def __init__(self, fft_size, window='blackman', impedance=50.0):
+        self.fft_size = fft_size
+        self.window_name = window
+        self.impedance = impedance
+        self.window = WINDOWS[window](fft_size)
+
+        window_power = np.sum(self.window**2)
+        self.enbw = fft_size * window_power / np.sum(self.window)**2
+        self.Vsq2W_dB = -10.0 * np.log10(fft_size * window_power * impedance)
+
+        # complex128 FFT output is 16 bytes per point
+        self.block_nffts = max(1, MAX_FFT_BLOCK_BYTES // (16 * fft_size))
+
+    def power_spectra(self, data, out=None, overwrite_input=False):
+        """Return the linear power of each windowed, centered FFT in data.
+
+        :param data: array of samples with a multiple of `fft_size` elements
+        :param out: optional preallocated (nffts x fft_size) float32 array
+        :param overwrite_input: apply the window to `data` in place
+        :returns: an (nffts x fft_size) float32 array
+
+        """
+        tdata = data.reshape(-1, self.fft_size)
+        nffts = tdata.shape[0]
+        if out is None:
+            out = np.empty((nffts, self.fft_size), dtype=np.float32)
+
+        # Transform in blocks to bound the size of the complex intermediate
+        for start in range(0, nffts, self.block_nffts):
+            stop = start + self.block_nffts
+            self._power_spectra_block(
+                tdata[start:stop], out[start:stop], overwrite_input)
+
+        return out
+
+    def _power_spectra_block(self, tdata, out, overwrite_input):
+        if overwrite_input:
+            np.multiply(tdata, self.window, out=tdata)
+        else:
+            tdata = tdata * self.window
+
+        fdata = np.fft.fft(tdata)
+
+        # Square the interleaved real and imaginary parts in place, then sum
+        # them straight into `out`. Writing each half to the other side of
+        # `out` is equivalent to fftshift without materializing a copy.
+        fdata_ri = fdata.view(fdata.real.dtype).reshape(fdata.shape + (2,))
+        np.square(fdata_ri, out=fdata_ri)
+        real_sq = fdata_ri[..., 0]
+        imag_sq = fdata_ri[..., 1]
+        half = self.fft_size // 2
+        rest = self.fft_size - half
+        np.add(real_sq[:, :rest], imag_sq[:, :rest], out=out[:, half:])
+        np.add(real_sq[:, rest:], imag_sq[:, rest:], out=out[:, :half])
+
+    def watts_to_dbm(self, array):
+        """Convert linear FFT power to dBm in place and return array."""
+        np.log10(array, out=array)
+        array *= 10
+        array += 30 + self.Vsq2W_dB
+        return array
+
+
+class HistogramMedian(object):
+    """Estimate the per-column median of streamed linear power values.
+
+    Values are binned on a logarithmic (dB) scale, so memory use is bounded
+    by `ncols * nbins` counters no matter how many rows are streamed through
+    :meth:`update`. Pass `max_rows` to store each counter in the smallest
+    type that can hold it.
+
+    Error bound: for values between `lo_db` and `hi_db`, the estimate is
+    within `resolution_db / 2` dB of the exact median. Values outside of that
+    range are clamped to the first or last bin.
+
+    :param ncols: number of columns (e.g., FFT bins) to track
+    :param lo_db: power (dB) of the lowest histogram bin
+    :param hi_db: power (dB) of the highest histogram bin
+    :param resolution_db: width of each histogram bin in dB
+    :param max_rows: total number of rows that will be passed to
+                     :meth:`update`, or None if unknown
+
+    """
+    def __init__(self, ncols, lo_db=-200.0, hi_db=100.0, resolution_db=0.25,
+                 max_rows=None):
+        self.ncols = ncols
+        self.lo_db = lo_db
+        self.hi_db = hi_db
+        self.resolution_db = resolution_db
+        self.max_rows = max_rows
+        self.nbins = int(np.ceil((hi_db - lo_db) / resolution_db))
+        if max_rows is None:
+            dtype = np.uint32
+        else:
+            dtype = np.min_scalar_type(max_rows)
+        self.counts = np.zeros((ncols, self.nbins), dtype=dtype)
+        self.nrows = 0
+
+        # Work on blocks of columns to bound the size of temporary arrays
+        self._block_ncols = max(1, MAX_HISTOGRAM_BLOCK_COUNTS // self.nbins)
+        self._col_offsets = np.arange(self._block_ncols) * self.nbins
+
+    @property
+    def error_bound_db(self):
+        return self.resolution_db / 2
+
+    def update(self, array):
+        """Add an (m x ncols) array of linear power values."""
+        m = array.shape[0]
+        if self.max_rows is not None and self.nrows + m > self.max_rows:
+            err = "Expected at most {} rows, but received {}"
+            raise ValueError(err.format(self.max_rows, self.nrows + m))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            bins = np.log10(array)
+
+        bins *= 10 / self.resolution_db
+        bins -= self.lo_db / self.resolution_db
+        # Truncation is floor once negative values are clipped to zero
+        np.clip(bins, 0, self.nbins - 1, out=bins)
+        bins = bins.astype(np.intp)
+
+        for start in range(0, self.ncols, self._block_ncols):
+            block_bins = bins[:, start:start + self._block_ncols]
+            block_counts = self.counts[start:start + self._block_ncols]
+            # Offset each column so a single bincount covers the block
+            block_bins += self._col_offsets[:block_bins.shape[1]]
+            counts = np.bincount(
+                block_bins.ravel(), minlength=block_counts.size)
+            counts = counts.reshape(block_counts.shape)
+            np.add(block_counts, counts, out=block_counts, casting='unsafe')
+
+        self.nrows += m
+
+    def median(self):
+        """Return the estimated median of each column in linear units."""
+        if not self.nrows:
+            raise ValueError("median of empty histogram")
+
+        # The median is the mean of the two middle ranks (1-based), which are
+        # the same rank when the number of rows is odd.
+        lower_rank = (self.nrows + 1) // 2
+        upper_rank = self.nrows // 2 + 1
+        lower = np.empty(self.ncols)
+        upper = np.empty(self.ncols)
+
+        for start in range(0, self.ncols, self._block_ncols):
+            stop = start + self._block_ncols
+            # The counts type can hold nrows, so it can hold the running sum
+            cumulative_counts = np.cumsum(
+                self.counts[start:stop], axis=1, dtype=self.counts.dtype)
+            lower[start:stop] = self._rank_to_linear(
+                cumulative_counts, lower_rank)
+            upper[start:stop] = self._rank_to_linear(
+                cumulative_counts, upper_rank)
+
+        return (lower + upper) / 2
+
+    def _rank_to_linear(self, cumulative_counts, rank):
+        bin_idx = np.argmax(cumulative_counts >= rank, axis=1)
+        bin_center_db = self.lo_db + (bin_idx + 0.5) * self.resolution_db
+        return 10 ** (bin_center_db / 10)
+
+
+class StreamingM4sDetector(object):
+    """Apply the m4s detector to FFT power spectra one block at a time.
+
+    Min, max and mean are exact. The median is estimated by `median`, which
+    defaults to a :class:`HistogramMedian`. The random sample is chosen up
+    front, so it is equivalent to picking a random row of the full array.
+
+    :param fft_size: number of points in each FFT
+    :param nffts: total number of FFTs that will be passed to :meth:`update`
+    :param median: an object with `update` and `median` methods
+
+    """
+    def __init__(self, fft_size, nffts, median=None):
+        self.fft_size = fft_size
+        self.nffts = nffts
+        self.median_estimator = median or HistogramMedian(
+            fft_size, max_rows=nffts)
+        self.min = np.full(fft_size, np.inf)
+        self.max = np.full(fft_size, -np.inf)
+        self.sum = np.zeros(fft_size)
+        self.count = 0
+        self.sample_idx = np.random.randint(0, nffts)
+        self.sample = None
+
+    def update(self, array):
+        """Add an (m x fft_size) array of linear power values."""
+        m = array.shape[0]
+
+        np.minimum(self.min, array.min(axis=0), out=self.min)
+        np.maximum(self.max, array.max(axis=0), out=self.max)
+        self.sum += array.sum(axis=0, dtype=np.float64)
+
+        if self.count <= self.sample_idx < self.count + m:
+            self.sample = array[self.sample_idx - self.count].copy()
+
+        self.median_estimator.update(array)
+        self.count += m
+
+    def result(self):
+        """Return a (5 x fft_size) array of min, max, mean, median, sample."""
+        if self.count != self.nffts:
+            err = "Expected {} FFTs, but received {}"
+            raise RuntimeError(err.format(self.nffts, self.count))
+
+        mean = self.sum / self.count
+        median = self.median_estimator.median()
+        m4s = np.array(
+            [self.min, self.max, mean, median, self.sample], dtype=np.float32)
+
+        return m4s
@@ -0,0 +1,101 @@
+"""Build SigMF metadata from templates compiled once per configuration.
+
+Building metadata with `SigMFFile` validates each field against the
+schema and deep-copies the annotations as each one is inserted, which
+takes milliseconds per task. A `SigMFTemplate` does that once for the
+global fields and the annotations of one capture, and `render` only
+copies them and fills in the captures.
+
+Example usage:
+    >>> template = SigMFTemplate(global_fields, annotations, 80)
+    >>> metadata = template.render([
+    ...     {"core:frequency": 700e6, "core:time": now()},
+    ...     {"core:frequency": 710e6, "core:time": now()}
+    ... ])
+
+"""
+
+from __future__ import absolute_import
+
+import copy
+
+from sigmf.sigmffile import SigMFFile
+
+
+GLOBAL_KEY = SigMFFile.GLOBAL_KEY
+CAPTURE_KEY = SigMFFile.CAPTURE_KEY
+ANNOTATION_KEY = SigMFFile.ANNOTATION_KEY
+START_INDEX_KEY = SigMFFile.START_INDEX_KEY
+
+
+class SigMFTemplate(object):
+    """SigMF metadata validated once and rendered for each task.
+
+    Rendered metadata shares nested values with the template, so don't
+    modify them.
+
+    :param global_fields: dict of global fields
+    :param annotations: list of `(start_index, length, metadata)` tuples
+                        annotating one capture, relative to its start
+    :param capture_length: number of samples in each capture
+
+    """
+    def __init__(self, global_fields, annotations=(), capture_length=0):
+        self.global_fields = global_fields
+        self.annotations = list(annotations)
+        self.capture_length = capture_length
+
+        # Validate and insert fields as SigMFFile would, but only once
+        sigmf_md = SigMFFile()
+        for key, value in global_fields.items():
+            sigmf_md.set_global_field(key, value)
+
+        for start_index, length, metadata in self.annotations:
+            sigmf_md.add_annotation(
+                start_index=start_index,
+                length=length,
+                metadata=copy.deepcopy(metadata)
+            )
+
+        self._global = sigmf_md._metadata[GLOBAL_KEY]
+        self._annotations = sigmf_md._metadata[ANNOTATION_KEY]
+
+    def matches(self, global_fields, annotations=(), capture_length=0):
+        """Return True if the template was compiled from these arguments."""
+        return (capture_length == self.capture_length and
+                global_fields == self.global_fields and
+                list(annotations) == self.annotations)
+
+    def render(self, captures, global_fields=None):
+        """Return a SigMF metadata dict with the given captures.
+
+        Capture i starts at sample `i * capture_length` and gets its own
+        copy of the annotations, offset to match.
+
+        :param captures: list of capture metadata dicts, which are copied
+        :param global_fields: dict of global fields that change between
+                              tasks, which aren't validated
+
+        """
+        global_info = dict(self._global)
+        if global_fields:
+            global_info.update(global_fields)
+
+        capture_list = []
+        annotation_list = []
+        for i, capture in enumerate(captures):
+            start_index = i * self.capture_length
+            capture_md = dict(capture)
+            capture_md[START_INDEX_KEY] = start_index
+            capture_list.append(capture_md)
+
+            for annotation in self._annotations:
+                annotation_md = dict(annotation)
+                annotation_md[START_INDEX_KEY] += start_index
+                annotation_list.append(annotation_md)
+
+        return {
+            GLOBAL_KEY: global_info,
+            CAPTURE_KEY: capture_list,
+            ANNOTATION_KEY: annotation_list
+        }
@@ -22,6 +22,8 @@ def touch(fname, times=None):
 
 class USRPMonitor(Action):
     """Monitor USRP connection and restart container if unreachable."""
+    resources = ('usrp',)
+
     def __init__(self, admin_only=True):
         super(USRPMonitor, self).__init__(admin_only=admin_only)
 
@@ -52,7 +54,8 @@ class USRPMonitor(Action):
 
         if healthy:
             try:
-                data = self.usrp.radio.acquire_samples(requested_samples)
+                data = self.usrp.radio.acquire_samples(
+                    requested_samples, reuse_buffer=True)
             except Exception:
                 detail = "Unable to acquire USRP"
                 healthy = False
@@ -0,0 +1,152 @@
+"""Run signal processing in a process pool with samples in shared memory.
+
+Signal processing holds the GIL for long stretches, which stalls the API
+threads in the same process. With `settings.DSP_PROCESS_POOL_WORKERS` set,
+actions can move that work into separate processes. Samples are captured
+straight into a memory-mapped file in `settings.DSP_SHARED_MEMORY_DIR`
+(`/dev/shm` on Linux), and only its path is sent to the worker, so the
+samples are never pickled or copied.
+
+Shared memory is often small (64 MB in a Docker container by default), and
+writing past the free space of a sparse memory-mapped file kills the
+process with SIGBUS. If there isn't room for an array, `shared_empty`
+returns an ordinary array instead, which must be processed in-process.
+
+Example usage:
+    >>> data = shared_empty((nffts, fft_size), np.complex64)
+    >>> radio.acquire_samples(data.size, out=data.reshape(-1))
+    >>> try:
+    ...     result = run_in_process(detect, data, fft_size)
+    ... finally:
+    ...     release(data)
+
+"""
+
+from __future__ import absolute_import
+
+import errno
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_workers = None
+_pool_lock = threading.Lock()
+
+
+def is_enabled():
+    """Return True if signal processing should run in the process pool."""
+    return settings.DSP_PROCESS_POOL_WORKERS > 0
+
+
+def shared_empty(shape, dtype):
+    """Return an uninitialized array backed by a shared memory file.
+
+    If there isn't enough free space for it, return an ordinary array, for
+    which `is_shared` is False.
+
+    """
+    directory = settings.DSP_SHARED_MEMORY_DIR
+    if not os.path.isdir(directory):
+        directory = tempfile.gettempdir()
+
+    nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    free = get_free_space(directory)
+    if nbytes > free:
+        msg = "Only {} bytes free in {}, allocating {} bytes in-process"
+        logger.warning(msg.format(free, directory, nbytes))
+        return np.empty(shape, dtype=dtype)
+
+    fd, path = tempfile.mkstemp(prefix='scos-', suffix='.dat', dir=directory)
+    os.close(fd)
+    try:
+        return np.memmap(path, dtype=dtype, mode='w+', shape=shape)
+    except Exception:
+        os.remove(path)
+        raise
+
+
+def get_free_space(directory):
+    """Return the number of bytes available in directory's filesystem."""
+    stat = os.statvfs(directory)
+    return stat.f_bavail * stat.f_frsize
+
+
+def is_shared(array):
+    """Return True if array was returned by `shared_empty`."""
+    return isinstance(array, np.memmap) and array.filename is not None
+
+
+def release(array):
+    """Remove the file backing a shared array.
+
+    The array stays usable until it's garbage collected. Arrays that aren't
+    shared are left alone.
+
+    """
+    if not is_shared(array):
+        return
+
+    try:
+        os.remove(array.filename)
+    except OSError as err:
+        if err.errno != errno.ENOENT:
+            raise
+
+
+def run_in_process(fn, array, *args):
+    """Return `fn(array, *args)` computed in the process pool.
+
+    `fn` must be a module-level function and `array` a shared array. The
+    worker maps the same memory, so changes it makes to `array` are seen
+    by the caller. The return value is pickled, so keep it small.
+
+    """
+    if not is_shared(array):
+        raise ValueError("array must be created with shared_empty")
+
+    spec = (array.filename, array.offset, array.shape, array.dtype.str)
+    future = get_process_pool().submit(_call_with_shared_array, fn, spec, args)
+    return future.result()
+
+
+def get_process_pool():
+    """Return the process pool, starting it on first use."""
+    global _pool, _pool_workers
+
+    workers = settings.DSP_PROCESS_POOL_WORKERS
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_workers = workers
+
+        return _pool
+
+
+def shutdown():
+    """Stop the process pool's workers, if started."""
+    global _pool, _pool_workers
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+            _pool_workers = None
+
+
+def _call_with_shared_array(fn, spec, args):
+    filename, offset, shape, dtype = spec
+    array = np.memmap(
+        filename, dtype=dtype, mode='r+', offset=offset, shape=shape)
+    return fn(array, *args)
@@ -0,0 +1,277 @@
+"""Continuously receive samples from the USRP into a ring buffer.
+
+Example usage:
+    >>> receiver = StreamingReceiver(usrp_source, buffer_size=2**23)
+    >>> receiver.start()
+    >>> receiver.mark_settle('rx_freq', 700e6)  # e.g., after a retune
+    >>> start, samples = receiver.read(1000)
+    >>> _, same_samples = receiver.read(1000, start=start)
+
+Samples are indexed by the total number of samples received since the
+receiver started, so several consumers can read the same window as long as
+it hasn't been overwritten.
+
+Samples from the old tuning are still buffered in the flowgraph when a
+retune returns. The usrp_source tags the first sample received after the
+frequency or sample rate changes with the new value (`rx_freq` or
+`rx_rate`), so the receiver waits for that tag and skips samples from
+there.
+
+"""
+
+from __future__ import absolute_import
+
+import logging
+import threading
+import time
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds to sleep between checks for new samples
+POLL_INTERVAL = 0.001
+
+# Stream tags the usrp_source adds to the first sample received after the
+# frequency or sample rate changes, with the new value
+RETUNE_TAG_KEYS = ('rx_freq', 'rx_rate')
+
+# Tolerance (Hz) when matching the value of a stream tag to a setting
+TAG_VALUE_TOLERANCE = 1.0
+
+
+class BufferOverrun(RuntimeError):
+    """Requested samples were overwritten before they could be read."""
+
+
+class SampleRingBuffer(object):
+    """A single-writer, multiple-reader ring of complex64 samples.
+
+    The writer never waits for readers. It advances `nreserved`, copies
+    samples into the ring and then advances `nwritten`. Readers check
+    `nreserved` again after copying a window, so a window that was
+    overwritten mid-copy raises `BufferOverrun` instead of returning torn
+    data. Neither side takes a lock.
+
+    :param size: number of samples in the ring
+
+    """
+    def __init__(self, size):
+        self.size = size
+        self._buffer = np.zeros(size, dtype=np.complex64)
+        self.nwritten = 0
+        self.nreserved = 0
+
+    def write(self, samples):
+        n = len(samples)
+        start = self.nwritten
+        if n > self.size:
+            # Only the newest samples fit
+            start += n - self.size
+            samples = samples[n - self.size:]
+
+        # Readers treat reserved samples as overwritten, even mid-copy
+        self.nreserved = self.nwritten + n
+        pos = start % self.size
+        first = min(len(samples), self.size - pos)
+        self._buffer[pos:pos + first] = samples[:first]
+        self._buffer[:len(samples) - first] = samples[first:]
+        self.nwritten = self.nreserved
+
+    def read(self, start, n, out=None, timeout=None):
+        """Copy samples [start, start + n) into `out` and return it.
+
+        Waits until the samples have been written.
+
+        :raises BufferOverrun: if the samples are no longer in the ring
+        :raises RuntimeError: if `timeout` seconds pass before the samples
+                              are written
+
+        """
+        if n > self.size:
+            err = "Can't read {} samples from a ring of {}"
+            raise ValueError(err.format(n, self.size))
+
+        if out is None:
+            out = np.empty(n, dtype=np.complex64)
+
+        self._check_overrun(start)
+        self._wait_for(start + n, timeout)
+
+        pos = start % self.size
+        first = min(n, self.size - pos)
+        out[:first] = self._buffer[pos:pos + first]
+        out[first:] = self._buffer[:n - first]
+
+        # The writer may have lapped us while we were copying
+        self._check_overrun(start)
+
+        return out
+
+    def _check_overrun(self, start):
+        oldest = self.nreserved - self.size
+        if start < oldest:
+            err = "Sample {} was overwritten, oldest available is {}"
+            raise BufferOverrun(err.format(start, oldest))
+
+    def _wait_for(self, nwritten, timeout):
+        deadline = None if timeout is None else time.time() + timeout
+        while self.nwritten < nwritten:
+            if deadline is not None and time.time() > deadline:
+                err = "Timed out waiting for {} samples, only {} received"
+                raise RuntimeError(err.format(nwritten, self.nwritten))
+
+            time.sleep(POLL_INTERVAL)
+
+
+class StreamingReceiver(object):
+    """Stream samples from a gnuradio.uhd usrp_source into a ring buffer.
+
+    :param usrp_source: a gnuradio.uhd usrp_source
+    :param buffer_size: number of samples in the ring buffer
+    :param settle_samples: number of samples to skip after `mark_settle`
+
+    """
+    def __init__(self, usrp_source, buffer_size, settle_samples=1000):
+        self.usrp_source = usrp_source
+        self.ring = SampleRingBuffer(buffer_size)
+        self.settle_samples = settle_samples
+        self.settled_index = 0
+        self._top_block = None
+        self._lock = threading.Lock()
+        self._last_tags = {}
+        self._awaited_tags = {}
+
+    def start(self):
+        from gnuradio import gr
+
+        sink = make_ring_buffer_sink(self.ring, self.tag_received)
+        top_block = gr.top_block()
+        top_block.connect(self.usrp_source, sink)
+        top_block.start()
+        self._top_block = top_block
+        logger.debug("Started streaming receiver")
+
+    def stop(self):
+        if self._top_block is not None:
+            self._top_block.stop()
+            self._top_block.wait()
+            self._top_block = None
+            logger.debug("Stopped streaming receiver")
+
+    @property
+    def is_running(self):
+        return self._top_block is not None
+
+    def mark_settle(self, tag_key=None, tag_value=None):
+        """Skip samples received before the radio settles.
+
+        Call this after changing the frequency, sample rate or gain. Without
+        a tag, `settle_samples` are skipped from the newest sample received,
+        but samples still buffered in the flowgraph aren't.
+
+        :param tag_key: key of the stream tag marking the change, e.g.,
+                        'rx_freq' after a retune
+        :param tag_value: the new setting, which the tag's value must match
+
+        """
+        with self._lock:
+            nwritten = self.ring.nwritten
+            self.settled_index = max(
+                self.settled_index, nwritten + self.settle_samples)
+            if tag_key is None:
+                return
+
+            # The tag may have been received before the change returned
+            last_value, last_offset = self._last_tags.get(tag_key, (None, 0))
+            if last_value is None or not _values_match(last_value, tag_value):
+                self._awaited_tags[tag_key] = tag_value
+            else:
+                self._awaited_tags.pop(tag_key, None)
+                self.settled_index = max(
+                    self.settled_index, last_offset + self.settle_samples)
+
+    def tag_received(self, key, value, offset):
+        """Record a stream tag on the sample at index `offset`.
+
+        Called by the sink before the tagged samples are written.
+
+        """
+        with self._lock:
+            self._last_tags[key] = (value, offset)
+            awaited = self._awaited_tags.get(key)
+            if awaited is not None and _values_match(value, awaited):
+                del self._awaited_tags[key]
+                self.settled_index = max(
+                    self.settled_index, offset + self.settle_samples)
+
+    def read(self, n, start=None, out=None, timeout=None):
+        """Return the index of the first sample and an array of n samples.
+
+        :param start: index of the first sample. Defaults to the next sample
+                      that will be received once the radio has settled.
+        :raises RuntimeError: if `timeout` seconds pass before the samples
+                              are written or the radio settles
+
+        """
+        if start is None:
+            nwritten = self.ring.nwritten
+            deadline = None if timeout is None else time.time() + timeout
+            self._wait_for_tags(deadline)
+            start = max(nwritten, self.settled_index)
+            if deadline is not None:
+                timeout = max(0, deadline - time.time())
+
+        return start, self.ring.read(start, n, out=out, timeout=timeout)
+
+    def _wait_for_tags(self, deadline):
+        while self._awaited_tags:
+            if deadline is not None and time.time() > deadline:
+                err = "Timed out waiting for stream tags {}"
+                raise RuntimeError(err.format(sorted(self._awaited_tags)))
+
+            time.sleep(POLL_INTERVAL)
+
+
+def _values_match(value, expected):
+    return abs(value - expected) <= TAG_VALUE_TOLERANCE
+
+
+def make_ring_buffer_sink(ring, on_tag=None):
+    """Return a GNU Radio sink block that writes its input into `ring`.
+
+    :param on_tag: called with the key, value and offset of each
+                   `RETUNE_TAG_KEYS` stream tag before the tagged samples
+                   are written
+
+    """
+    import pmt
+    from gnuradio import gr
+
+    class RingBufferSink(gr.sync_block):
+        def __init__(self):
+            gr.sync_block.__init__(
+                self,
+                name="ring_buffer_sink",
+                in_sig=[np.complex64],
+                out_sig=None
+            )
+
+        def work(self, input_items, output_items):
+            samples = input_items[0]
+            if on_tag is not None:
+                self._handle_tags(len(samples))
+
+            ring.write(samples)
+            return len(samples)
+
+        def _handle_tags(self, n):
+            start = self.nitems_read(0)
+            for tag in self.get_tags_in_range(0, start, start + n):
+                key = pmt.symbol_to_string(tag.key)
+                if key in RETUNE_TAG_KEYS:
+                    on_tag(key, pmt.to_double(tag.value), tag.offset)
+
+    return RingBufferSink()
@@ -23,7 +23,7 @@ class RadioInterfaceMock(object):
         self.frequency = 400e6
         self.gain = 30
 
-    def acquire_samples(self, n):
+    def acquire_samples(self, n, nskip=1000, out=None, reuse_buffer=False):
         """Create the array [0.1] * 16 + [0.2] * 16 + ... until n runs out."""
         fft_size = 16
         r = np.zeros(n)
@@ -35,4 +35,60 @@ class RadioInterfaceMock(object):
         if remainder:
             r[final*fft_size:n] = [0.1 * (final + 1)] * remainder
 
+        if out is not None:
+            out[:] = r
+            return out
+
         return r
+
+
+class FakeUsrpSource(object):
+    """Mimic the parts of a gnuradio.uhd usrp_source used by RadioInterface.
+
+    Like the SWIG wrapper, `finite_acquisition` returns a tuple of Python
+    complex values. The samples are a tone in complex Gaussian noise.
+
+    """
+    def __init__(self, sample_rate=10e6, frequency=700e6, tone=1e6, seed=0):
+        self.samp_rate = sample_rate
+        self.clock_rate = sample_rate
+        self.center_freq = frequency
+        self.gain = 30
+        self.tone = tone
+        self.random = np.random.RandomState(seed)
+        self.last_acquisition = None
+
+    def get_samp_rate(self):
+        return self.samp_rate
+
+    def set_samp_rate(self, rate):
+        self.samp_rate = rate
+
+    def get_clock_rate(self):
+        return self.clock_rate
+
+    def set_clock_rate(self, rate):
+        self.clock_rate = rate
+
+    def get_center_freq(self):
+        return self.center_freq
+
+    def set_center_freq(self, freq):
+        self.center_freq = freq
+
+    def get_gain(self):
+        return self.gain
+
+    def set_gain(self, gain):
+        self.gain = gain
+
+    def set_auto_dc_offset(self, enable):
+        pass
+
+    def finite_acquisition(self, n):
+        t = np.arange(n) / self.samp_rate
+        samples = 0.1 * np.exp(2j * np.pi * self.tone * t)
+        samples += 0.01 * self.random.randn(n)
+        samples += 0.01j * self.random.randn(n)
+        self.last_acquisition = tuple(samples.astype(np.complex64).tolist())
+        return self.last_acquisition
@@ -0,0 +1,55 @@
+from __future__ import absolute_import
+
+import os
+
+import numpy as np
+import pytest
+
+from actions import by_name, offload
+from actions.tests.test_acquire_single_freq_fft import schema
+from acquisitions.models import Acquisition
+from jsonschema import validate as schema_validate
+from schedule.tests.utils import post_schedule, TEST_SCHEDULE_ENTRY
+from sigmf.validate import validate as sigmf_validate
+
+
+def test_sweep_detector(user_client, rf):
+    rjson = post_schedule(user_client, TEST_SCHEDULE_ENTRY)
+    entry_name = rjson['name']
+    task_id = rjson['next_task_id']
+
+    # use mock_sweep_acquire set up in conftest.py
+    sweep = by_name['mock_sweep_acquire']
+    frequency = sweep.frequency
+    sweep(entry_name, task_id)
+    assert sweep.frequency == frequency  # the action is shared between tasks
+    acquistion = Acquisition.objects.get(task_id=task_id)
+    sigmf_metadata = acquistion.sigmf_metadata
+    assert sigmf_validate(sigmf_metadata)
+    schema_validate(sigmf_metadata, schema)
+
+    nsteps = len(sweep.frequencies)
+    captures = sigmf_metadata['captures']
+    assert [c['core:frequency'] for c in captures] == sweep.frequencies
+    assert [c['core:sample_start'] for c in captures] == [0, 80, 160]
+    assert len(sigmf_metadata['annotations']) == 5 * nsteps
+
+    data = acquistion.read_data().view(np.float32)
+    assert data.size == 5 * nsteps * sweep.fft_size
+
+
+def test_failed_sweep_releases_shared_data(user_client, settings, tmpdir,
+                                           monkeypatch):
+    settings.DSP_PROCESS_POOL_WORKERS = 1
+    settings.DSP_SHARED_MEMORY_DIR = str(tmpdir.mkdir('shm'))
+
+    def run_in_process(fn, array, *args):
+        raise RuntimeError("detector failed")
+
+    monkeypatch.setattr(offload, 'run_in_process', run_in_process)
+    rjson = post_schedule(user_client, TEST_SCHEDULE_ENTRY)
+
+    with pytest.raises(RuntimeError):
+        by_name['mock_sweep_acquire'](rjson['name'], rjson['next_task_id'])
+
+    assert not os.listdir(settings.DSP_SHARED_MEMORY_DIR)
@@ -30,3 +30,16 @@ def test_detector(user_client, rf):
     sigmf_metadata = acquistion.sigmf_metadata
     assert sigmf_validate(sigmf_metadata)
     schema_validate(sigmf_metadata, schema)
+
+
+def test_streaming_detector(user_client, rf):
+    rjson = post_schedule(user_client, TEST_SCHEDULE_ENTRY)
+    entry_name = rjson['name']
+    task_id = rjson['next_task_id']
+
+    # use mock_stream_acquire set up in conftest.py
+    by_name['mock_stream_acquire'](entry_name, task_id)
+    acquistion = Acquisition.objects.get(task_id=task_id)
+    sigmf_metadata = acquistion.sigmf_metadata
+    assert sigmf_validate(sigmf_metadata)
+    schema_validate(sigmf_metadata, schema)
@@ -0,0 +1,219 @@
+"""Performance benchmarks for actions, run with `pytest --benchmark -s`."""
+
+import os
+
+import numpy as np
+import pytest
+from sigmf.sigmffile import SigMFFile
+
+from actions.acquire_frequency_sweep import FrequencySweepFftAcquisition
+from actions.acquire_single_freq_fft import m4s_detector
+from actions.dsp import FftPlan
+from actions.tests.mocks.usrp import FakeUsrpSource
+from actions.usrp import RadioInterface
+from actions.utils import FindNearestDict
+from capabilities.models import SensorDefinition
+from capabilities.serializers import SensorDefinitionSerializer
+from sensor import utils
+from sensor.tests.utils import print_benchmark, time_best_of
+
+
+# Skip parameter combinations that would need more memory than this
+MAX_SAMPLES = int(os.environ.get('BENCHMARK_MAX_SAMPLES', 2**24))
+
+FFT_SIZES = (256, 1024, 4096, 16384)
+NFFTS = (100, 1000, 10000)
+
+
+def random_samples(nffts, fft_size):
+    shape = (nffts, fft_size)
+    samples = np.random.randn(*shape) + 1j * np.random.randn(*shape)
+    return samples.astype(np.complex64)
+
+
+def skip_if_too_large(nsamples):
+    if nsamples > MAX_SAMPLES:
+        msg = "{} samples exceeds BENCHMARK_MAX_SAMPLES".format(nsamples)
+        pytest.skip(msg)
+
+
+def legacy_power_spectra(data, fft_size):
+    """The pre-FftPlan path from SingleFrequencyFftAcquisition."""
+    window = np.blackman(fft_size)
+    window_power = sum(window**2)
+    impedance = 50.0
+    enbw = fft_size * window_power / sum(window)**2
+    Vsq2W_dB = -10.0 * np.log10(fft_size * window_power * impedance)
+    tdata_windowed = data * window
+    fdata = np.fft.fft(tdata_windowed)
+    fdata_shifted = np.fft.fftshift(fdata)
+    fdata_watts = np.square(np.abs(fdata_shifted))
+    return fdata_watts, enbw, Vsq2W_dB
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('nffts', NFFTS)
+@pytest.mark.parametrize('fft_size', FFT_SIZES)
+def test_fft_plan(fft_size, nffts):
+    skip_if_too_large(fft_size * nffts)
+    data = random_samples(nffts, fft_size)
+
+    def run_legacy():
+        legacy_power_spectra(data.copy(), fft_size)
+
+    def run_planned():
+        # include plan construction to match the per-task cost
+        plan = FftPlan(fft_size)
+        plan.power_spectra(data.copy(), overwrite_input=True)
+
+    legacy = time_best_of(run_legacy)
+    planned = time_best_of(run_planned)
+    print_benchmark(
+        'fft_plan',
+        fft_size=fft_size,
+        nffts=nffts,
+        legacy_s='{:.4f}'.format(legacy),
+        planned_s='{:.4f}'.format(planned),
+        speedup='{:.2f}'.format(legacy / planned)
+    )
+
+
+def legacy_m4s_detector(array):
+    """The pre-partition m4s detector."""
+    amin = np.min(array, axis=0)
+    amax = np.max(array, axis=0)
+    mean = np.mean(array, axis=0)
+    median = np.median(array, axis=0)
+    random_sample = array[np.random.randint(0, array.shape[0], 1)][0]
+    return np.array(
+        [amin, amax, mean, median, random_sample], dtype=np.float32)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('nffts', NFFTS)
+@pytest.mark.parametrize('fft_size', FFT_SIZES)
+def test_m4s_detector(fft_size, nffts):
+    skip_if_too_large(fft_size * nffts)
+    data = np.random.exponential(1e-6, (nffts, fft_size)).astype(np.float32)
+
+    results = {}
+    for name, detect in (
+            ('legacy', legacy_m4s_detector),
+            ('exact', m4s_detector),
+            ('histogram', lambda a: m4s_detector(a, median='histogram'))):
+        elapsed = time_best_of(lambda: detect(data))
+        results[name + '_s'] = '{:.4f}'.format(elapsed)
+
+    print_benchmark('m4s_detector', fft_size=fft_size, nffts=nffts, **results)
+
+
+def legacy_find_nearest(d, value):
+    """The pre-bisect FindNearestDict lookup."""
+    float_keys = np.array(list(d.keys()), dtype=float)
+    nearest_idx = np.abs(float_keys - value).argmin()
+    return d.get(float_keys[nearest_idx])
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('nkeys', (10, 100, 1000))
+def test_find_nearest_dict(nkeys):
+    keys = np.linspace(70e6, 6e9, nkeys)
+    cals = FindNearestDict(zip(keys, np.random.uniform(0.5, 2, nkeys)))
+    items = np.random.uniform(70e6, 6e9, 1000)
+
+    legacy = time_best_of(
+        lambda: [legacy_find_nearest(cals, i) for i in items])
+    bisect = time_best_of(lambda: [cals[i] for i in items])
+    batched = time_best_of(lambda: cals.lookup(items))
+    print_benchmark(
+        'find_nearest_dict',
+        nkeys=nkeys,
+        legacy_us='{:.2f}'.format(legacy / len(items) * 1e6),
+        bisect_us='{:.2f}'.format(bisect / len(items) * 1e6),
+        batched_us='{:.3f}'.format(batched / len(items) * 1e6)
+    )
+
+
+def legacy_acquire_samples(source, n, nskip=1000, scale_factor=1):
+    """The pre-buffer RadioInterface.acquire_samples."""
+    acquired_samples = source.finite_acquisition(nskip + n)
+    return np.array(acquired_samples[nskip:]) * scale_factor
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+@pytest.mark.parametrize('nsamples', (10**5, 10**6, 10**7))
+def test_acquire_samples(nsamples):
+    skip_if_too_large(nsamples)
+
+    source = FakeUsrpSource()
+    radio = RadioInterface(usrp_source=source)
+    # Time only the copy out of UHD's sequence, not generating fake samples
+    samples = source.finite_acquisition(nsamples + 1000)
+    source.finite_acquisition = lambda n: samples
+
+    legacy = time_best_of(lambda: legacy_acquire_samples(source, nsamples))
+    new = time_best_of(lambda: radio.acquire_samples(nsamples))
+    reused = time_best_of(
+        lambda: radio.acquire_samples(nsamples, reuse_buffer=True))
+    print_benchmark(
+        'acquire_samples',
+        nsamples=nsamples,
+        legacy_s='{:.4f}'.format(legacy),
+        new_s='{:.4f}'.format(new),
+        reuse_buffer_s='{:.4f}'.format(reused)
+    )
+
+
+def legacy_sigmf_md(action, captures):
+    """The pre-template metadata build, one SigMFFile per task."""
+    sigmf_md = SigMFFile()
+    sigmf_md.set_global_field("core:datatype", "rf32_le")
+    sigmf_md.set_global_field("core:sample_rate", action.sample_rate)
+    sigmf_md.set_global_field("core:description", action.description)
+    sensor_def_obj = SensorDefinition.objects.get()
+    sensor_def_json = SensorDefinitionSerializer(sensor_def_obj).data
+    sigmf_md.set_global_field("scos:sensor_definition", sensor_def_json)
+    sigmf_md.set_global_field("scos:sensor_id", 'not.set')
+    sigmf_md.set_global_field("scos:version", '0.1')
+
+    step_length = 5 * action.fft_size
+    annotations = action.get_detector_annotations()
+    for i, capture_md in enumerate(captures):
+        start_index = i * step_length
+        sigmf_md.add_capture(start_index=start_index, metadata=capture_md)
+        for offset, length, annotation_md in annotations:
+            sigmf_md.add_annotation(
+                start_index=start_index + offset,
+                length=length,
+                metadata=dict(annotation_md)
+            )
+
+    return sigmf_md._metadata
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+@pytest.mark.parametrize('ncaptures', (1, 10, 100))
+def test_sigmf_metadata(ncaptures):
+    frequencies = np.linspace(700e6, 6e9, ncaptures).tolist()
+    action = FrequencySweepFftAcquisition(
+        frequencies, sample_rate=15.36e6, fft_size=1024, nffts=300)
+    captures = [
+        {"core:frequency": f, "core:time": utils.get_datetime_str_now()}
+        for f in frequencies
+    ]
+
+    legacy = time_best_of(
+        lambda: legacy_sigmf_md(action, [dict(c) for c in captures]),
+        number=10)
+    action.build_sweep_sigmf_md(captures)  # compile the template
+    template = time_best_of(
+        lambda: action.build_sweep_sigmf_md(captures), number=10)
+    print_benchmark(
+        'sigmf_metadata',
+        ncaptures=ncaptures,
+        legacy_us='{:.1f}'.format(legacy * 1e6),
+        template_us='{:.1f}'.format(template * 1e6),
+        speedup='{:.1f}'.format(legacy / template)
+    )
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from actions.acquire_single_freq_fft import m4s_detector
+from actions.dsp import (
+    HistogramMedian,
+    StreamingM4sDetector,
+    get_fft_plan
+)
+
+
+def random_power(shape):
+    return np.random.exponential(1e-6, shape)
+
+
+def test_histogram_median_error_bound():
+    data = random_power((101, 64))
+    hist = HistogramMedian(64)
+    hist.update(data[:50])
+    hist.update(data[50:])
+    estimate_db = 10 * np.log10(hist.median())
+    exact_db = 10 * np.log10(np.median(data, axis=0))
+    assert np.all(np.abs(estimate_db - exact_db) <= hist.error_bound_db)
+
+
+def test_histogram_median_max_rows():
+    # Wide enough to be binned in several blocks of columns
+    data = random_power((31, 2000))
+    hist = HistogramMedian(2000, max_rows=31)
+    assert hist.counts.dtype == np.uint8
+    hist.update(data)
+    estimate_db = 10 * np.log10(hist.median())
+    exact_db = 10 * np.log10(np.median(data, axis=0))
+    assert np.all(np.abs(estimate_db - exact_db) <= hist.error_bound_db)
+
+    with pytest.raises(ValueError):
+        hist.update(data[:1])
+
+
+def test_streaming_m4s_matches_m4s_detector():
+    fft_size = 32
+    nffts = 100
+    data = random_power((nffts, fft_size))
+    detector = StreamingM4sDetector(fft_size, nffts)
+    for chunk in np.array_split(data, 7):
+        detector.update(chunk)
+
+    streamed = detector.result()
+    exact = m4s_detector(data)
+    assert streamed.shape == exact.shape == (5, fft_size)
+    assert np.allclose(streamed[:3], exact[:3], rtol=1e-5)
+    median_error_db = 10 * np.log10(streamed[3] / exact[3])
+    assert np.all(np.abs(median_error_db) <= 0.125 + 1e-3)
+    assert any(np.array_equal(streamed[4], row.astype(np.float32))
+               for row in data)
+
+
+def test_fft_plan_matches_reference():
+    fft_size = 64
+    data = np.random.randn(10, fft_size) + 1j * np.random.randn(10, fft_size)
+    window = np.blackman(fft_size)
+    expected = np.abs(np.fft.fftshift(np.fft.fft(data * window), axes=-1))**2
+
+    plan = get_fft_plan(fft_size)
+    assert plan is get_fft_plan(fft_size)
+    assert np.allclose(plan.power_spectra(data), expected, rtol=1e-5)
+    assert np.allclose(plan.power_spectra(data.ravel()), expected, rtol=1e-5)
+
+
+def test_m4s_detector_exact_median():
+    for nffts in (1, 2, 99, 100):
+        data = random_power((nffts, 16))
+        expected = np.array([
+            np.min(data, axis=0),
+            np.max(data, axis=0),
+            np.mean(data, axis=0),
+            np.median(data, axis=0)
+        ], dtype=np.float32)
+        m4s = m4s_detector(data)
+        assert np.allclose(m4s[:4], expected, rtol=1e-6)
+        assert any(np.array_equal(m4s[4], row.astype(np.float32))
+                   for row in data)
+
+
+def test_m4s_detector_histogram_median():
+    data = random_power((100, 16))
+    exact = m4s_detector(data)
+    approx = m4s_detector(data, median='histogram')
+    assert np.allclose(approx[:3], exact[:3], rtol=1e-6)
+    median_error_db = 10 * np.log10(approx[3] / exact[3])
+    assert np.all(np.abs(median_error_db) <= 0.125 + 1e-3)
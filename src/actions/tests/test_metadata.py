@@ -0,0 +1,106 @@
+from __future__ import absolute_import
+
+import pytest
+from sigmf.sigmffile import SigMFFile
+from sigmf.validate import validate as sigmf_validate
+
+from actions import by_name
+from actions.metadata import SigMFTemplate
+from capabilities.definition import sensor_definition
+
+
+GLOBAL_FIELDS = {
+    "core:datatype": "rf32_le",
+    "core:sample_rate": 15.36e6,
+    "core:description": "test"
+}
+
+ANNOTATIONS = [
+    (i * 16, 16, {"scos:measurement_type": {"detector": name}})
+    for i, name in enumerate(('min', 'max'))
+]
+
+CAPTURES = [
+    {"core:frequency": frequency, "core:time": "2018-01-01T00:00:00.000Z"}
+    for frequency in (700e6, 710e6, 720e6)
+]
+
+
+def build_with_sigmffile(captures):
+    sigmf_md = SigMFFile()
+    for key, value in GLOBAL_FIELDS.items():
+        sigmf_md.set_global_field(key, value)
+
+    for i, capture in enumerate(captures):
+        sigmf_md.add_capture(start_index=i * 32, metadata=dict(capture))
+        for start_index, length, metadata in ANNOTATIONS:
+            sigmf_md.add_annotation(
+                start_index=i * 32 + start_index,
+                length=length,
+                metadata=dict(metadata)
+            )
+
+    return sigmf_md._metadata
+
+
+@pytest.mark.parametrize('ncaptures', (1, 3))
+def test_template_matches_sigmffile(ncaptures):
+    template = SigMFTemplate(GLOBAL_FIELDS, ANNOTATIONS, 32)
+    metadata = template.render(CAPTURES[:ncaptures])
+    assert metadata == build_with_sigmffile(CAPTURES[:ncaptures])
+    assert sigmf_validate(metadata)
+
+
+def test_render_copies_template():
+    template = SigMFTemplate(GLOBAL_FIELDS, ANNOTATIONS, 32)
+    metadata = template.render(CAPTURES, {"scos:scale_factor": 2.0})
+    assert metadata['global']['scos:scale_factor'] == 2.0
+    metadata['annotations'][0]['core:sample_start'] = 100
+    metadata['captures'][0]['core:frequency'] = 1e9
+
+    assert template.render(CAPTURES) == build_with_sigmffile(CAPTURES)
+    assert CAPTURES[0]['core:frequency'] == 700e6
+    assert 'core:sample_start' not in CAPTURES[0]
+
+
+def test_template_matches():
+    template = SigMFTemplate(GLOBAL_FIELDS, ANNOTATIONS, 32)
+    assert template.matches(dict(GLOBAL_FIELDS), list(ANNOTATIONS), 32)
+    assert not template.matches(GLOBAL_FIELDS, ANNOTATIONS, 64)
+    assert not template.matches(GLOBAL_FIELDS, ANNOTATIONS[:1], 32)
+    assert not template.matches(
+        dict(GLOBAL_FIELDS, **{"core:sample_rate": 1e6}), ANNOTATIONS, 32)
+
+    with pytest.raises(ValueError):
+        SigMFTemplate({"core:offset": -1})
+
+
+@pytest.mark.django_db
+def test_action_compiles_template_once(monkeypatch):
+    # use mock_acquire set up in conftest.py
+    action = by_name['mock_acquire']
+    monkeypatch.setattr(action, '_sigmf_template', None)
+    template = action.get_sigmf_template()
+    assert action.get_sigmf_template() is template
+
+    monkeypatch.setattr(action, 'nffts', action.nffts + 1)
+    recompiled = action.get_sigmf_template()
+    assert recompiled is not template
+
+    sensor_definition.invalidate()
+    assert action.get_sigmf_template() is not recompiled
+
+
+@pytest.mark.django_db
+def test_action_reuses_template_without_building_fields(monkeypatch):
+    # use mock_acquire set up in conftest.py
+    action = by_name['mock_acquire']
+    monkeypatch.setattr(action, '_sigmf_template', None)
+    template = action.get_sigmf_template()
+
+    def fail():
+        raise AssertionError("fields built for a cached template")
+
+    monkeypatch.setattr(action, 'get_global_sigmf_fields', fail)
+    monkeypatch.setattr(action, 'get_detector_annotations', fail)
+    assert action.get_sigmf_template() is template
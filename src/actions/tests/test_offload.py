@@ -0,0 +1,81 @@
+from __future__ import absolute_import
+
+import os
+
+import numpy as np
+import pytest
+
+from actions import by_name, offload
+from actions.acquire_single_freq_fft import detect
+from acquisitions.models import Acquisition
+from schedule.tests.utils import post_schedule, TEST_SCHEDULE_ENTRY
+
+
+FFT_SIZE = 64
+
+
+@pytest.yield_fixture
+def process_pool(settings, tmpdir):
+    settings.DSP_PROCESS_POOL_WORKERS = 1
+    settings.DSP_SHARED_MEMORY_DIR = str(tmpdir.mkdir('shm'))
+    yield settings.DSP_SHARED_MEMORY_DIR
+    offload.shutdown()
+
+
+def random_samples(shape):
+    real, imag = np.random.normal(size=(2,) + shape)
+    return (real + 1j * imag).astype(np.complex64)
+
+
+def test_shared_array_is_backed_by_file(process_pool):
+    data = offload.shared_empty((4, FFT_SIZE), np.complex64)
+    assert offload.is_shared(data)
+    assert offload.is_shared(data.reshape(-1))
+    assert os.listdir(process_pool) == [os.path.basename(data.filename)]
+
+    offload.release(data)
+    assert not os.listdir(process_pool)
+    offload.release(data)  # already released
+
+
+def test_shared_array_falls_back_without_free_space(process_pool,
+                                                    monkeypatch):
+    monkeypatch.setattr(offload, 'get_free_space', lambda directory: 1024)
+    data = offload.shared_empty((4, FFT_SIZE), np.complex64)
+    assert not offload.is_shared(data)
+    assert data.shape == (4, FFT_SIZE)
+    assert not os.listdir(process_pool)
+    offload.release(data)
+
+
+def test_run_in_process_matches_inline(process_pool):
+    samples = random_samples((100, FFT_SIZE))
+    data = offload.shared_empty(samples.shape, samples.dtype)
+    data[:] = samples
+
+    try:
+        result = offload.run_in_process(detect, data, FFT_SIZE)
+    finally:
+        offload.release(data)
+
+    expected = detect(samples.copy(), FFT_SIZE)
+    # The last row is a random sample
+    assert np.allclose(result[:-1], expected[:-1])
+
+
+def test_run_in_process_requires_shared_array(process_pool):
+    with pytest.raises(ValueError):
+        offload.run_in_process(detect, np.zeros((1, FFT_SIZE)), FFT_SIZE)
+
+
+def test_detector_in_process_pool(user_client, process_pool):
+    rjson = post_schedule(user_client, TEST_SCHEDULE_ENTRY)
+    entry_name = rjson['name']
+    task_id = rjson['next_task_id']
+
+    # use mock_acquire set up in conftest.py
+    by_name['mock_acquire'](entry_name, task_id)
+
+    acquisition = Acquisition.objects.get(task_id=task_id)
+    assert len(acquisition.read_data()) == 5 * 16 * 4  # float32 m4s
+    assert not os.listdir(process_pool)
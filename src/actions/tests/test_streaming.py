@@ -0,0 +1,124 @@
+import threading
+
+import numpy as np
+import pytest
+
+from actions.streaming import (
+    BufferOverrun,
+    SampleRingBuffer,
+    StreamingReceiver
+)
+from actions.tests.mocks.usrp import FakeUsrpSource
+from actions.usrp import RadioInterface
+
+
+def ramp(start, n):
+    return np.arange(start, start + n).astype(np.complex64)
+
+
+def receive(receiver, samples, tags=()):
+    """Write samples to receiver as its sink would, tags first."""
+    for key, value, offset in tags:
+        receiver.tag_received(key, value, offset)
+
+    receiver.ring.write(samples)
+
+
+def test_ring_buffer_wraps():
+    ring = SampleRingBuffer(10)
+    ring.write(ramp(0, 7))
+    ring.write(ramp(7, 7))
+    assert ring.nwritten == 14
+    assert np.array_equal(ring.read(4, 10), ramp(4, 10))
+    assert np.array_equal(ring.read(6, 3), ramp(6, 3))
+
+    with pytest.raises(BufferOverrun):
+        ring.read(3, 2)
+
+    ring.write(ramp(14, 25))
+    assert np.array_equal(ring.read(29, 10), ramp(29, 10))
+
+
+def test_ring_buffer_read_waits():
+    ring = SampleRingBuffer(100)
+    with pytest.raises(RuntimeError):
+        ring.read(0, 10, timeout=0.01)
+
+    timer = threading.Timer(0.05, ring.write, args=(ramp(0, 20),))
+    timer.start()
+    assert np.array_equal(ring.read(5, 10, timeout=5), ramp(5, 10))
+    timer.join()
+
+
+def test_receiver_skips_settling_samples():
+    receiver = StreamingReceiver(None, buffer_size=100, settle_samples=10)
+    receiver.ring.write(ramp(0, 20))
+    receiver.mark_settle()
+
+    timer = threading.Timer(0.05, receiver.ring.write, args=(ramp(20, 40),))
+    timer.start()
+    start, data = receiver.read(5, timeout=5)
+    timer.join()
+    assert start == 30
+    assert np.array_equal(data, ramp(30, 5))
+
+    # A second consumer can read the same window
+    _, same_data = receiver.read(5, start=start)
+    assert np.array_equal(same_data, data)
+
+
+def test_receiver_skips_samples_buffered_before_retune():
+    receiver = StreamingReceiver(None, buffer_size=100, settle_samples=10)
+    receive(receiver, ramp(0, 20))
+    receiver.mark_settle('rx_freq', 710e6)
+
+    # Samples 20-29 were buffered before the retune and the stale tag is
+    # from an earlier one
+    tags = [('rx_freq', 700e6, 20), ('rx_freq', 710e6, 30)]
+    timer = threading.Timer(
+        0.05, receive, args=(receiver, ramp(20, 50), tags))
+    timer.start()
+    start, data = receiver.read(5, timeout=5)
+    timer.join()
+    assert start == 40
+    assert np.array_equal(data, ramp(40, 5))
+
+
+def test_receiver_uses_retune_tag_received_before_mark():
+    receiver = StreamingReceiver(None, buffer_size=100, settle_samples=10)
+    receive(receiver, ramp(0, 20))
+    receiver.tag_received('rx_freq', 710e6, 30)
+    receiver.mark_settle('rx_freq', 710e6)
+
+    timer = threading.Timer(0.05, receive, args=(receiver, ramp(20, 40)))
+    timer.start()
+    start, _ = receiver.read(5, timeout=5)
+    timer.join()
+    assert start == 40
+
+
+def test_receiver_times_out_waiting_for_retune_tag():
+    receiver = StreamingReceiver(None, buffer_size=100, settle_samples=10)
+    receiver.mark_settle('rx_freq', 710e6)
+    receive(receiver, ramp(0, 50))
+    with pytest.raises(RuntimeError):
+        receiver.read(5, timeout=0.01)
+
+
+@pytest.mark.django_db
+def test_radio_reads_from_receiver():
+    receiver = StreamingReceiver(None, buffer_size=100, settle_samples=10)
+    radio = RadioInterface(usrp_source=FakeUsrpSource(), receiver=receiver)
+    radio.sample_rate = 1e3  # marks the radio as settling
+
+    tags = [('rx_rate', 1e3, 0)]
+    timer = threading.Timer(0.05, receive, args=(receiver, ramp(0, 50), tags))
+    timer.start()
+    assert np.array_equal(radio.acquire_samples(20), ramp(10, 20))
+    timer.join()
+
+    # Later acquisitions at the same tuning start at the next sample
+    timer = threading.Timer(0.05, receiver.ring.write, args=(ramp(50, 30),))
+    timer.start()
+    assert np.array_equal(radio.acquire_samples(20), ramp(50, 20))
+    timer.join()
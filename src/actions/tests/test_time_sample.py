@@ -2,6 +2,7 @@ from __future__ import absolute_import
 
 from actions import by_name # to get test mocks (see conftest.py)
 
+from acquisitions.encoding import SCALE_FACTOR_KEY
 from acquisitions.models import Acquisition
 # includes models {schedule_entry, task_id, sigmf_metadata, data, created)
 
@@ -41,3 +42,20 @@ def test_detector_time(user_client, rf):
     sigmf_metadata = acquistion.sigmf_metadata
     assert sigmf_validate(sigmf_metadata)
     schema_validate(sigmf_metadata, schema)
+
+
+def test_time_sample_ci16(user_client, monkeypatch):
+    rjson = post_schedule(user_client, TEST_SCHEDULE_ENTRY)
+    entry_name = rjson['name']
+    task_id = rjson['next_task_id']
+
+    action = by_name['mock_time_acquire']
+    monkeypatch.setattr(action, 'datatype', 'ci16_le')
+    action(entry_name, task_id)
+
+    acquisition = Acquisition.objects.get(task_id=task_id)
+    sigmf_metadata = acquisition.sigmf_metadata
+    assert sigmf_metadata['global']['core:datatype'] == 'ci16_le'
+    assert sigmf_metadata['global'][SCALE_FACTOR_KEY] > 0
+    assert sigmf_validate(sigmf_metadata)
+    assert acquisition.data_size == 1024 * 4  # 2 x int16 per sample
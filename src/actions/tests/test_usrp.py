@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from actions.tests.mocks.usrp import FakeUsrpSource
+from actions.usrp import ACQUIRE_BLOCK_SIZE, BUFFER_RING_SIZE, RadioInterface
+
+
+@pytest.mark.django_db
+def test_acquire_samples():
+    source = FakeUsrpSource()
+    radio = RadioInterface(usrp_source=source)
+
+    n = ACQUIRE_BLOCK_SIZE + 100  # span more than one block
+    data = radio.acquire_samples(n, nskip=10)
+    expected = np.array(source.last_acquisition[10:], dtype=np.complex64)
+    assert data.dtype == np.complex64
+    assert np.array_equal(data, expected)
+
+    out = np.empty(100, dtype=np.complex64)
+    assert radio.acquire_samples(100, out=out) is out
+
+    with pytest.raises(ValueError):
+        radio.acquire_samples(100, out=np.empty(10, dtype=np.complex64))
+
+
+@pytest.mark.django_db
+def test_acquire_samples_reuses_buffers():
+    radio = RadioInterface(usrp_source=FakeUsrpSource())
+
+    buffers = [radio.acquire_samples(100, reuse_buffer=True)
+               for _ in range(BUFFER_RING_SIZE + 1)]
+    assert np.shares_memory(buffers[0], buffers[-1])
+    assert not np.shares_memory(buffers[0], buffers[1])
+    assert not np.shares_memory(buffers[0], radio.acquire_samples(100))
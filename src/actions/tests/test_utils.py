@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from actions.utils import FindNearestDict
+
+
+def brute_force_nearest(d, key):
+    return d[min(sorted(dict.keys(d)), key=lambda k: abs(k - key))]
+
+
+def test_find_nearest_dict():
+    cals = FindNearestDict({100e6: 1.1, 200e6: 1.2, 500e6: 1.5})
+    assert cals[0] == 1.1
+    assert cals[150e6] == 1.1  # ties go to the lower key
+    assert cals[300e6] == 1.2
+    assert cals[400e6] == 1.5
+    assert cals[1e10] == 1.5
+
+    cals[300e6] = 1.3
+    assert cals[290e6] == 1.3
+    del cals[300e6]
+    assert cals[290e6] == 1.2
+
+    with pytest.raises(TypeError):
+        cals[1j]
+
+    with pytest.raises(ValueError):
+        FindNearestDict()[100e6]
+
+
+def test_find_nearest_dict_lookup():
+    keys = np.random.uniform(0, 6e9, 50)
+    cals = FindNearestDict(zip(keys, range(len(keys))))
+    items = np.random.uniform(-1e9, 7e9, 1000)
+    expected = [brute_force_nearest(cals, item) for item in items]
+    assert [cals[item] for item in items] == expected
+    assert cals.lookup(items).tolist() == expected
+    assert FindNearestDict({1: 2}).lookup([0, 5]).tolist() == [2, 2]
+
+
+def test_find_nearest_dict_interpolate():
+    cals = FindNearestDict({100e6: 1.1, 200e6: 1.2, 500e6: 1.5})
+    assert cals.interpolate(350e6) == pytest.approx(1.35)
+    assert cals.interpolate(0) == 1.1
+    assert np.allclose(cals.interpolate([150e6, 1e10]), [1.15, 1.5])
@@ -8,13 +8,12 @@ from itertools import compress
 import numpy as np
 
 from rest_framework.reverse import reverse
-from sigmf.sigmffile import SigMFFile
 
-from capabilities.models import SensorDefinition
-from capabilities.serializers import SensorDefinitionSerializer
+from acquisitions.encoding import SCALE_FACTOR_KEY, encode_iq
 from sensor import V1, settings, utils
 
 from .base import Action
+from .metadata import SigMFTemplate
 from . import usrp
 
 
@@ -39,6 +38,8 @@ class SingleTimeAcquisition(Action):
     :param sample_rate: requested sample_rate in Hz
     :param num_samples: number of samples to collect
     """
+    resources = ('usrp',)
+
     def __init__(self, frequency, sample_rate,num_samples):
         super(SingleTimeAcquisition, self).__init__()
 
@@ -47,6 +48,8 @@ class SingleTimeAcquisition(Action):
         self.num_samples = num_samples
         self.usrp = usrp  # make instance variable to allow hotswapping mock
         self.enbw = None
+        self.datatype = settings.ACQUISITION_IQ_DATATYPE
+        self._sigmf_template = None
 
     def __call__(self, schedule_entry_name, task_id):
         from schedule.models import ScheduleEntry
@@ -63,8 +66,11 @@ class SingleTimeAcquisition(Action):
         # acquire the data from the sensor
         data = self.acquire_data(parent_entry, task_id)
 
+        # encode the samples in the configured SigMF datatype
+        data, scale_factor = encode_iq(data, self.datatype)
+
         # create the signal model
-        sigmf_md = self.build_sigmf_md()
+        sigmf_md = self.build_sigmf_md(scale_factor)
 
         # store the signal in the database
         self.archive(data, sigmf_md, parent_entry, task_id)
@@ -126,71 +132,59 @@ class SingleTimeAcquisition(Action):
 
         return data
 
-    def build_sigmf_md(self):
-        logger.debug("Building SigMF metadata file")
+    def build_sigmf_md(self, scale_factor=None):
+        logger.debug("Building SigMF metadata")
+
+        capture_md = {
+            "core:frequency": self.frequency,
+            "core:time": utils.get_datetime_str_now()
+        }
+
+        global_fields = None
+        if scale_factor is not None:
+            global_fields = {SCALE_FACTOR_KEY: scale_factor}
 
-        sigmf_md = SigMFFile()
-        sigmf_md.set_global_field("core:datatype", "rf32_le")
-        sigmf_md.set_global_field("core:sample_rate", self.sample_rate)
-        sigmf_md.set_global_field("core:description", self.description)
+        return self.get_sigmf_template().render([capture_md], global_fields)
 
-        # get() expects a single object - currently there are none and this fails.
-        # how do I put one in?
-        #sensor_def_obj = SensorDefinition.objects.get()
-        #sensor_def_json = SensorDefinitionSerializer(sensor_def_obj).data
-        #sigmf_md.set_global_field("scos:sensor_definition", sensor_def_json)
+    def get_sigmf_template(self):
+        """Return the SigMF template for the current configuration."""
+        global_fields = self.get_global_sigmf_fields()
+        template = self._sigmf_template
+        if template is None or not template.matches(global_fields):
+            logger.debug("Compiling SigMF metadata template")
+            template = SigMFTemplate(global_fields)
+            self._sigmf_template = template
 
+        return template
+
+    def get_global_sigmf_fields(self):
+        # FIXME: add "scos:sensor_definition" from
+        # `capabilities.definition` once every sensor has one
         try:
             fqdn = settings.ALLOWED_HOSTS[1]
         except IndexError:
             fqdn = 'not.set'
 
-        sigmf_md.set_global_field("scos:sensor_id", fqdn)
-        sigmf_md.set_global_field("scos:version", SCOS_TRANSFER_SPEC_VER)
-
-        capture_md = {
-            "core:frequency": self.frequency,
-            "core:time": utils.get_datetime_str_now()
+        return {
+            "core:datatype": self.datatype,
+            "core:sample_rate": self.sample_rate,
+            "core:description": self.description,
+            "scos:sensor_id": fqdn,
+            "scos:version": SCOS_TRANSFER_SPEC_VER
         }
 
-        sigmf_md.add_capture(start_index=0, metadata=capture_md)
-
-        # for i, detector in enumerate(M4sDetector):
-        #     single_frequency_fft_md = {
-        #         "number_of_samples_in_fft": self.fft_size,
-        #         "window": "blackman",
-        #         "equivalent_noise_bandwidth": self.enbw,
-        #         "detector": detector.name + "_power",
-        #         "number_of_ffts": self.nffts,
-        #         "units": "dBm",
-        #         "reference": "not referenced"
-        #     }
-
-        #     annotation_md = {
-        #         "scos:measurement_type": {
-        #             "single_frequency_fft_detection": single_frequency_fft_md,
-        #         }
-        #     }
-
-        #     sigmf_md.add_annotation(
-        #         start_index=(i * self.fft_size),
-        #         length=self.fft_size,
-        #         metadata=annotation_md
-        #     )
-
-        return sigmf_md
-
     def archive(self, m4s_data, sigmf_md, parent_entry, task_id):
         from acquisitions.models import Acquisition
 
-        logger.debug("Storing acquisition in database")
+        logger.debug("Storing acquisition")
 
-        Acquisition(
+        acquisition = Acquisition(
             schedule_entry=parent_entry,
             task_id=task_id,
-            sigmf_metadata=sigmf_md._metadata,
-            data=m4s_data
-        ).save()
+            sigmf_metadata=sigmf_md
+        )
+        acquisition.store_data(m4s_data)
+        acquisition.save()
 
     @property
     def description(self):
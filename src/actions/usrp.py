@@ -16,14 +16,25 @@ import logging
 
 import numpy as np
 
-from capabilities.models import SensorDefinition
+from capabilities.calibration import scale_factors
+from sensor import settings
 
-from .utils import FindNearestDict
+from .streaming import StreamingReceiver
 
 
 logger = logging.getLogger(__name__)
 
 
+# Copy samples out of UHD's sequence in blocks of this many samples to bound
+# the size of the temporary slices
+ACQUIRE_BLOCK_SIZE = 2**16
+
+# Number of buffers handed out in turn by `acquire_samples(reuse_buffer=True)`
+BUFFER_RING_SIZE = 2
+
+# Seconds to wait for streamed samples beyond the capture duration
+STREAMING_TIMEOUT = 1.0
+
 uhd = None
 radio = None
 is_available = False
@@ -50,8 +61,46 @@ def connect():  # -> bool:
         return False
 
 
+class BufferRing(object):
+    """Hand out preallocated complex64 buffers in round-robin order.
+
+    A buffer returned by :meth:`get` is reused after `size` more calls.
+
+    """
+    def __init__(self, size):
+        self._buffers = [None] * size
+        self._next = 0
+
+    def get(self, n):
+        buf = self._buffers[self._next]
+        if buf is None or buf.size < n:
+            buf = self._buffers[self._next] = np.empty(n, dtype=np.complex64)
+
+        self._next = (self._next + 1) % len(self._buffers)
+        return buf[:n]
+
+
 class RadioInterface(object):
-    def __init__(self):
+    """Wrap a gnuradio.uhd usrp_source.
+
+    If `settings.USRP_STREAMING` is set, the USRP streams continuously into
+    a ring buffer and `acquire_samples` reads from it instead of starting a
+    new finite acquisition (see `actions.streaming`).
+
+    :param usrp_source: an already configured usrp_source (or an object with
+                        the same interface) to use instead of searching for
+                        a USRP
+    :param receiver: a `StreamingReceiver` to read samples from
+
+    """
+    def __init__(self, usrp_source=None, receiver=None):
+        self._buffers = BufferRing(BUFFER_RING_SIZE)
+        self.receiver = receiver
+
+        if usrp_source is not None:
+            self.usrp = usrp_source
+            return
+
         if uhd is None:
             raise RuntimeError("UHD not available, did you call connect()?")
 
@@ -82,6 +131,11 @@ class RadioInterface(object):
 
         self.usrp.set_auto_dc_offset(True)
 
+        if settings.USRP_STREAMING:
+            self.receiver = StreamingReceiver(
+                self.usrp, settings.USRP_STREAMING_BUFFER_SIZE)
+            self.receiver.start()
+
     @property
     def sample_rate(self):  # -> float:
         return self.usrp.get_samp_rate()
@@ -89,6 +143,7 @@ class RadioInterface(object):
     @sample_rate.setter
     def sample_rate(self, rate):
         self.usrp.set_samp_rate(rate)
+        self._mark_settle('rx_rate', self.sample_rate)
         fs_MHz = self.sample_rate / 1e6
         logger.debug("set USRP sample rate: {:.2f} MS/s".format(fs_MHz))
 
@@ -99,6 +154,7 @@ class RadioInterface(object):
     @clock_rate.setter
     def clock_rate(self, rate):
         self.usrp.set_clock_rate(rate)
+        self._mark_settle()
         clk_MHz = self.clock_rate / 1e6
         logger.debug("set USRP clock rate: {:.2f} MHz".format(clk_MHz))
 
@@ -110,6 +166,7 @@ class RadioInterface(object):
     def frequency(self, freq):
         tune_request = uhd.tune_request(freq)
         tune_result = self.usrp.set_center_freq(tune_request)
+        self._mark_settle('rx_freq', self.frequency)
         logger.debug(tune_result.to_pp_string())
 
     @property
@@ -119,46 +176,81 @@ class RadioInterface(object):
     @gain.setter
     def gain(self, gain):
         self.usrp.set_gain(gain)
+        self._mark_settle()
         logger.debug("set USRP gain: {:.2f} dB".format(self.usrp.get_gain()))
 
+    def _mark_settle(self, tag_key=None, tag_value=None):
+        if self.receiver is not None:
+            self.receiver.mark_settle(tag_key, tag_value)
+
     def _get_scale_factor(self):
-        """Find the scale factor closest to the current frequency.
+        """Find the scale factor for the current frequency.
 
-        If no sensor definition exists or no scale factors are set, return 1.
+        Scale factors are cached in-process (see `capabilities.calibration`),
+        so this doesn't query the database on every acquisition. If no sensor
+        definition exists or no scale factors are set, return 1.
 
         """
         default = 1
 
-        try:
-            sensor_def = SensorDefinition.objects.get()
-        except SensorDefinition.DoesNotExist:
-            msg = "No sensor definition exists, using default scale factor"
-            logger.debug(msg)
-            return default
-
-        scale_factors = sensor_def.receiver.scale_factors.values()
-        nearest_factor_map = FindNearestDict(
-            (sf['frequency'], sf['scale_factor']) for sf in scale_factors
+        scale_factor = scale_factors.get(
+            self.frequency,
+            interpolate=settings.INTERPOLATE_SCALE_FACTORS
         )
 
-        try:
-            scale_factor = nearest_factor_map[self.frequency]
-        except ValueError:
+        if scale_factor is None:
             logger.debug("No scale factors set, using default scale factor")
             return default
 
         logger.debug("Using scale factor {}".format(scale_factor))
         return scale_factor
 
-    def acquire_samples(self, n, nskip=1000):  # -> np.ndarray:
-        """Aquire nskip+n samples and return the last n"""
+    def acquire_samples(self, n, nskip=1000, out=None,
+                        reuse_buffer=False):  # -> np.ndarray:
+        """Aquire nskip+n samples and return the last n as complex64.
+
+        The last n samples are copied from UHD straight into the returned
+        array and scaled in place. The first nskip are never copied.
+
+        :param n: number of samples to return
+        :param nskip: number of samples to discard while the radio settles.
+                      Ignored when streaming, where samples received within
+                      `settle_samples` of the last retune are skipped.
+        :param out: optional complex64 array of n samples to fill
+        :param reuse_buffer: if `out` is not given, fill a buffer that will be
+                             overwritten after `BUFFER_RING_SIZE` more calls
+                             instead of allocating a new one. Only use this
+                             if the samples aren't kept.
+
+        """
+        if out is None:
+            if reuse_buffer:
+                out = self._buffers.get(n)
+            else:
+                out = np.empty(n, dtype=np.complex64)
+        elif out.shape != (n,):
+            err = "out must have shape ({},), not {}"
+            raise ValueError(err.format(n, out.shape))
+
+        if self.receiver is not None:
+            # The receiver skips samples since the last retune itself
+            timeout = STREAMING_TIMEOUT + n / self.sample_rate
+            self.receiver.read(n, out=out, timeout=timeout)
+        else:
+            self._finite_acquisition(n, nskip, out)
+
+        out *= self._get_scale_factor()
+
+        return out
+
+    def _finite_acquisition(self, n, nskip, out):
         total_samples = nskip + n
         acquired_samples = self.usrp.finite_acquisition(total_samples)
-        scale_factor = self._get_scale_factor()
-        data = np.array(acquired_samples[nskip:]) * scale_factor
-        nreceived = len(data)
+        nreceived = max(0, len(acquired_samples) - nskip)
         if nreceived != n:
             err = "Requested {} samples, but received {}"
             raise RuntimeError(err.format(n, nreceived))
 
-        return data
+        for start in range(0, n, ACQUIRE_BLOCK_SIZE):
+            stop = min(start + ACQUIRE_BLOCK_SIZE, n)
+            out[start:stop] = acquired_samples[nskip + start:nskip + stop]
@@ -1,9 +1,15 @@
+from bisect import bisect_left
+from numbers import Real
+
 import numpy as np
 
 
 class FindNearestDict(dict):
     """Return associated value for nearest matching key.
 
+    Keys are kept in a sorted array that is rebuilt only after the dict is
+    modified, so lookups are a binary search.
+
     Raises TypeError if key is not a real number.
 
     Example usage;
@@ -15,32 +21,112 @@ class FindNearestDict(dict):
         1.2
         >>> nearest_cal[400e6]
         1.5
+        >>> nearest_cal.lookup([100e6, 400e6])
+        array([1.1, 1.5])
+        >>> nearest_cal.interpolate(350e6)
+        1.35
     """
     def __init__(self, *args, **kwargs):
         dict.__init__(self, *args, **kwargs)
         self._check_keys(self.keys())
+        self._sorted = None
 
     @staticmethod
     def _check_keys(keys):
-        if not np.all(np.isreal(keys)):
+        if not all(isinstance(key, Real) for key in keys):
+            raise TypeError("Caught non-real key")
+
+    @staticmethod
+    def _check_key(key):
+        if not isinstance(key, Real):
             raise TypeError("Caught non-real key")
 
+    def _get_sorted(self):
+        """Return sorted keys as a list and array, and values as an array."""
+        if self._sorted is None:
+            if not self:
+                raise ValueError("FindNearestDict is empty")
+
+            keys = sorted(self.keys())
+            values = np.array([dict.__getitem__(self, k) for k in keys])
+            self._sorted = (keys, np.array(keys, dtype=float), values)
+
+        return self._sorted
+
     def _find_nearest(self, value):
-        """Find the index of the closest matching value in a NumPy array."""
-        float_keys = np.array(self.keys(), dtype=float)
-        # http://stackoverflow.com/a/2566508
-        nearest_idx = np.abs(float_keys - value).argmin()
-        return self.get(float_keys[nearest_idx])
+        """Find the closest matching key, preferring the lower on a tie."""
+        keys, _, _ = self._get_sorted()
+        idx = bisect_left(keys, value)
+        if idx == len(keys):
+            idx -= 1
+        elif idx > 0 and value - keys[idx - 1] <= keys[idx] - value:
+            idx -= 1
+
+        return dict.__getitem__(self, keys[idx])
 
     def __getitem__(self, item):
         """Override __getitem__ to find nearest"""
-        self._check_keys(item)
+        self._check_key(item)
         return self._find_nearest(item)
 
+    def lookup(self, items):
+        """Return an array of the values nearest to each item in `items`."""
+        items = np.asarray(items)
+        if np.iscomplexobj(items):
+            raise TypeError("Caught non-real key")
+
+        _, keys, values = self._get_sorted()
+        if len(keys) == 1:
+            return values[np.zeros(items.shape, dtype=np.intp)]
+
+        # Compare each item to the keys on either side of its insertion point
+        idx = np.asarray(np.searchsorted(keys, items))
+        np.clip(idx, 1, len(keys) - 1, out=idx)
+        lower_is_nearer = items - keys[idx - 1] <= keys[idx] - items
+        idx -= lower_is_nearer
+
+        return values[idx]
+
+    def interpolate(self, items):
+        """Linearly interpolate values between the two nearest keys.
+
+        Items outside the range of keys take the value of the nearest key.
+        Values must be real numbers.
+
+        """
+        if np.iscomplexobj(items):
+            raise TypeError("Caught non-real key")
+
+        _, keys, values = self._get_sorted()
+        return np.interp(items, keys, values)
+
     def __setitem__(self, item, value):
-        self._check_keys(item)
+        self._check_key(item)
         dict.__setitem__(self, item, value)
+        self._sorted = None
+
+    def __delitem__(self, item):
+        dict.__delitem__(self, item)
+        self._sorted = None
 
     def update(self, newdict):
         self._check_keys(newdict.keys())
         dict.update(self, newdict)
+        self._sorted = None
+
+    def clear(self):
+        dict.clear(self)
+        self._sorted = None
+
+    def pop(self, *args):
+        self._sorted = None
+        return dict.pop(self, *args)
+
+    def popitem(self):
+        self._sorted = None
+        return dict.popitem(self)
+
+    def setdefault(self, item, default=None):
+        self._check_key(item)
+        self._sorted = None
+        return dict.setdefault(self, item, default)
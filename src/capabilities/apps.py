@@ -6,3 +6,8 @@ from django.apps import AppConfig
 
 class CapabilitiesConfig(AppConfig):
     name = 'capabilities'
+
+    def ready(self):
+        # Connect the signal handlers that invalidate cached scale factors
+        # and the cached sensor definition
+        from . import calibration, definition  # noqa
@@ -0,0 +1,114 @@
+"""In-process cache of the sensor's IQ scale factors.
+
+Example usage:
+    >>> from capabilities.calibration import scale_factors
+    >>> scale_factors.get(700e6)
+    1.1
+    >>> scale_factors.get(750e6, interpolate=True)
+    1.15
+
+The cache is loaded from the database on first use and is invalidated
+whenever a `ScaleFactor`, `Receiver` or `SensorDefinition` is saved or
+deleted in this process. A standalone scheduler process can't see those
+changes, so it invalidates the cache before it runs tasks (see
+`Scheduler.standalone`).
+
+"""
+
+from __future__ import absolute_import
+
+import logging
+import threading
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Receiver, ScaleFactor, SensorDefinition
+
+
+logger = logging.getLogger(__name__)
+
+
+class ScaleFactorCache(object):
+    """Map frequencies to scale factors with a cached `FindNearestDict`."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._table = None
+
+    @property
+    def generation(self):
+        """A number that changes each time the cache is invalidated."""
+        return self._generation
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._table = None
+
+    def get(self, frequency, interpolate=False):
+        """Return the scale factor for frequency, or None if none are set.
+
+        :param frequency: frequency in Hz
+        :param interpolate: linearly interpolate between the two nearest
+                            scale factors instead of using the nearest one.
+                            Frequencies outside of the calibrated range use
+                            the nearest scale factor.
+
+        """
+        table = self._get_table()
+        if not table:
+            return None
+
+        if interpolate:
+            return float(table.interpolate(frequency))
+
+        return table[frequency]
+
+    def _get_table(self):
+        table = self._table
+        if table is not None:
+            return table
+
+        with self._lock:
+            generation = self._generation
+
+        table = self._load()
+
+        with self._lock:
+            # Don't cache a table that was invalidated while loading
+            if generation == self._generation:
+                self._table = table
+
+        return table
+
+    @staticmethod
+    def _load():
+        # actions.usrp imports this module, so import FindNearestDict late
+        from actions.utils import FindNearestDict
+
+        logger.debug("Loading scale factors")
+
+        try:
+            sensor_def = SensorDefinition.objects.get()
+        except SensorDefinition.DoesNotExist:
+            logger.debug("No sensor definition exists")
+            return FindNearestDict()
+
+        rows = sensor_def.receiver.scale_factors.values_list(
+            'frequency', 'scale_factor')
+
+        return FindNearestDict(rows)
+
+
+scale_factors = ScaleFactorCache()
+
+
+@receiver(post_save, sender=ScaleFactor)
+@receiver(post_delete, sender=ScaleFactor)
+@receiver(post_save, sender=Receiver)
+@receiver(post_delete, sender=Receiver)
+@receiver(post_save, sender=SensorDefinition)
+@receiver(post_delete, sender=SensorDefinition)
+def invalidate_scale_factors(sender, **kwargs):
+    scale_factors.invalidate()
@@ -0,0 +1,94 @@
+"""In-process cache of the serialized sensor definition.
+
+Example usage:
+    >>> from capabilities.definition import sensor_definition
+    >>> sensor_definition.get()['antenna']['model']
+    'Comtelco BS698XL3 Base Station Antenna'
+
+The cache is loaded from the database on first use and is invalidated
+whenever the sensor definition or one of its components is saved or
+deleted in this process. A standalone scheduler process can't see those
+changes, so it invalidates the cache before it runs tasks (see
+`Scheduler.standalone`). The same dict is returned until then, so don't
+modify it.
+
+"""
+
+from __future__ import absolute_import
+
+import logging
+import threading
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Antenna, Preselector, Receiver, RFPath, SensorDefinition
+from .serializers import SensorDefinitionSerializer
+
+
+logger = logging.getLogger(__name__)
+
+
+class SensorDefinitionCache(object):
+    """Cache `SensorDefinitionSerializer` data for the sensor definition."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._data = None
+
+    @property
+    def generation(self):
+        """A number that changes each time the cache is invalidated."""
+        return self._generation
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._data = None
+
+    def get(self):
+        """Return the serialized sensor definition.
+
+        Raises SensorDefinition.DoesNotExist if there is none.
+
+        """
+        data = self._data
+        if data is not None:
+            return data
+
+        with self._lock:
+            generation = self._generation
+
+        data = self._load()
+
+        with self._lock:
+            # Don't cache a definition that was invalidated while loading
+            if generation == self._generation:
+                self._data = data
+
+        return data
+
+    @staticmethod
+    def _load():
+        logger.debug("Loading sensor definition")
+
+        sensor_def = SensorDefinition.objects.select_related(
+            'antenna', 'receiver', 'preselector').get()
+        return SensorDefinitionSerializer(sensor_def).data
+
+
+sensor_definition = SensorDefinitionCache()
+
+
+@receiver(post_save, sender=Antenna)
+@receiver(post_delete, sender=Antenna)
+@receiver(post_save, sender=Preselector)
+@receiver(post_delete, sender=Preselector)
+@receiver(post_save, sender=Receiver)
+@receiver(post_delete, sender=Receiver)
+@receiver(post_save, sender=RFPath)
+@receiver(post_delete, sender=RFPath)
+@receiver(post_save, sender=SensorDefinition)
+@receiver(post_delete, sender=SensorDefinition)
+def invalidate_sensor_definition(sender, **kwargs):
+    sensor_definition.invalidate()
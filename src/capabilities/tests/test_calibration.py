@@ -0,0 +1,36 @@
+import pytest
+
+from capabilities.calibration import scale_factors
+from capabilities.models import Receiver, ScaleFactor
+
+
+@pytest.yield_fixture
+def clean_cache():
+    """Don't leak scale factors from rolled back transactions."""
+    scale_factors.invalidate()
+    yield
+    scale_factors.invalidate()
+
+
+@pytest.mark.django_db
+def test_scale_factor_cache(clean_cache):
+    assert scale_factors.get(700e6) is None
+
+    receiver = Receiver.objects.get()
+    for frequency, scale_factor in ((500e6, 1.5), (100e6, 1.1)):
+        ScaleFactor.objects.create(
+            receiver=receiver, frequency=frequency, scale_factor=scale_factor)
+
+    assert scale_factors.get(50e6) == 1.1
+    assert scale_factors.get(200e6) == 1.1
+    assert scale_factors.get(400e6) == 1.5
+    assert scale_factors.get(1e9) == 1.5
+    assert scale_factors.get(300e6, interpolate=True) == pytest.approx(1.3)
+    assert scale_factors.get(1e9, interpolate=True) == 1.5
+
+    # saving or deleting a scale factor invalidates the cache
+    sf = ScaleFactor.objects.create(
+        receiver=receiver, frequency=200e6, scale_factor=1.2)
+    assert scale_factors.get(250e6) == 1.2
+    sf.delete()
+    assert scale_factors.get(250e6) == 1.1
@@ -0,0 +1,26 @@
+import pytest
+
+from capabilities.definition import sensor_definition
+from capabilities.models import Antenna
+
+
+@pytest.yield_fixture
+def clean_cache():
+    """Don't leak definitions from rolled back transactions."""
+    sensor_definition.invalidate()
+    yield
+    sensor_definition.invalidate()
+
+
+@pytest.mark.django_db
+def test_sensor_definition_cache(clean_cache):
+    definition = sensor_definition.get()
+    assert sensor_definition.get() is definition
+
+    # saving a component invalidates the cache
+    antenna = Antenna.objects.get()
+    antenna.model = 'test antenna'
+    antenna.save()
+    definition = sensor_definition.get()
+    assert definition['antenna']['model'] == 'test antenna'
+    assert sensor_definition.get() is definition
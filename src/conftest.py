@@ -11,17 +11,26 @@ from authentication.models import User
 def pytest_addoption(parser):
     parser.addoption('--update-api-docs', action='store_true',
                      default=False, help="Ensure API docs match code")
+    parser.addoption('--benchmark', action='store_true',
+                     default=False, help="Run (slow) performance benchmarks")
 
 
 def pytest_collection_modifyitems(config, items):
-    """Skips `test_api_docs_up_to_date` if CLI option not passed."""
-    if config.getoption('--update-api-docs'):
-        # --update-api-docs given on cli: do not skip api doc generation
-        return
+    """Skips tests that must be explicitly requested on the CLI.
+
+    `test_api_docs_up_to_date` requires `--update-api-docs`, and tests marked
+    `benchmark` require `--benchmark`.
+
+    """
     skip_api_gen = pytest.mark.skip(reason="didn't pass --update-api-docs")
+    skip_benchmark = pytest.mark.skip(reason="didn't pass --benchmark")
     for item in items:
-        if 'update_api_docs' in item.keywords:
+        if ('update_api_docs' in item.keywords and
+                not config.getoption('--update-api-docs')):
             item.add_marker(skip_api_gen)
+        if ('benchmark' in item.keywords and
+                not config.getoption('--benchmark')):
+            item.add_marker(skip_benchmark)
 
 
 @pytest.fixture(scope='session')
@@ -32,18 +41,36 @@ def django_db_setup(django_db_setup, django_db_blocker):
         call_command('loaddata', 'capabilities/fixtures/greyhound.json')
 
 
+@pytest.fixture(autouse=True)
+def acquisition_data_dir(settings, tmpdir):
+    """Write acquisition sample data to a temporary directory."""
+    settings.ACQUISITION_DATA_DIR = str(tmpdir.mkdir('acquisition_data'))
+
+
+@pytest.fixture(autouse=True)
+def inline_task_execution(settings):
+    """Run scheduled tasks in the scheduler's thread."""
+    settings.SCHEDULER_MAX_WORKERS = 0
+
+
 @pytest.yield_fixture
 def testclock():
     """Replace scheduler's timefn with manually steppable test timefn."""
     # Setup test clock
     real_timefn = scheduler.utils.timefn
+    real_monotonicfn = scheduler.utils.monotonicfn
     real_delayfun = scheduler.utils.delayfn
+    real_waitfn = scheduler.utils.waitfn
     scheduler.utils.timefn = scheduler.tests.utils.TestClock()
+    scheduler.utils.monotonicfn = scheduler.utils.timefn
     scheduler.utils.delayfn = scheduler.tests.utils.delayfn
+    scheduler.utils.waitfn = scheduler.tests.utils.waitfn
     yield
     # Teardown test clock
     scheduler.utils.timefn = real_timefn
+    scheduler.utils.monotonicfn = real_monotonicfn
     scheduler.utils.delayfn = real_delayfun
+    scheduler.utils.waitfn = real_waitfn
 
 
 @pytest.fixture
@@ -153,6 +180,29 @@ mock_acquire = actions.acquire_single_freq_fft.SingleFrequencyFftAcquisition(
 mock_acquire.usrp = actions.tests.mocks.usrp
 actions.by_name['mock_acquire'] = mock_acquire
 
+mock_stream_acquire = (
+    actions.acquire_single_freq_fft.SingleFrequencyFftAcquisition(
+        frequency=1e9,
+        sample_rate=1e6,
+        fft_size=16,
+        nffts=11,
+        nffts_per_chunk=4
+    )
+)
+mock_stream_acquire.usrp = actions.tests.mocks.usrp
+actions.by_name['mock_stream_acquire'] = mock_stream_acquire
+
+mock_sweep_acquire = (
+    actions.acquire_frequency_sweep.FrequencySweepFftAcquisition(
+        frequencies=[1e9, 1.1e9, 1.2e9],
+        sample_rate=1e6,
+        fft_size=16,
+        nffts=11
+    )
+)
+mock_sweep_acquire.usrp = actions.tests.mocks.usrp
+actions.by_name['mock_sweep_acquire'] = mock_sweep_acquire
+
 mock_time_acquire = actions.time_sample_acquire.SingleTimeAcquisition(
     frequency=1e9,
     sample_rate=1e6,
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('results', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskresult',
+            name='lateness',
+            field=models.DurationField(help_text=b'How long after its scheduled time the task started', null=True),
+        ),
+    ]
@@ -1,7 +1,13 @@
+import operator
+from datetime import timedelta
+from functools import reduce
+
+from django.conf import settings
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
 
 from schedule.models import ScheduleEntry
-from sensor.settings import MAX_TASK_RESULTS
 from .consts import MAX_DETAIL_LEN
 
 
@@ -24,6 +30,10 @@ class TaskResult(models.Model):
     started = models.DateTimeField(help_text="The time the task started")
     finished = models.DateTimeField(help_text="The time the task finished")
     duration = models.DurationField(help_text="Task duration in seconds")
+    lateness = models.DurationField(
+        null=True,
+        help_text="How long after its scheduled time the task started"
+    )
     result = models.CharField(max_length=7, help_text='"success" or "failure"',
                               choices=RESULT_CHOICES)
     detail = models.CharField(
@@ -36,22 +46,49 @@ class TaskResult(models.Model):
         ordering = ('task_id',)
         unique_together = (('schedule_entry', 'task_id'),)
 
-    def __init__(self, *args, **kwargs):
-        super(TaskResult, self).__init__(*args, **kwargs)
+    def save(self, *args, **kwargs):
+        """Save, then prune the entry's results every few tasks.
 
-        # Allow Swapping max_results for testing
-        self.max_results = MAX_TASK_RESULTS
+        Results are pruned after every `TASK_RESULT_PRUNE_INTERVAL` tasks,
+        so an entry can briefly have that many more results than it keeps.
 
-    def save(self):
-        """Limit number of results to MAX_TASK_RESULTS by removing oldest."""
-        all_results = TaskResult.objects.all()
-        filter = {'schedule_entry__name': self.schedule_entry.name}
-        same_entry_results = all_results.filter(**filter)
-        if same_entry_results.count() >= self.max_results:
-            same_entry_results[0].delete()
+        """
+        super(TaskResult, self).save(*args, **kwargs)
 
-        super(TaskResult, self).save()
+        if self.task_id % settings.TASK_RESULT_PRUNE_INTERVAL == 0:
+            prune_task_results(self.schedule_entry)
 
     def __str__(self):
         s = "{}/{}"
-        return s.format(self.schedule_entry.name, self.task_id)
+        return s.format(self.schedule_entry_id, self.task_id)
+
+
+def prune_task_results(schedule_entry):
+    """Delete results beyond the entry's retention policy.
+
+    The entry keeps the results with the highest `max_results` task ids
+    (`settings.MAX_TASK_RESULTS` if unset) that finished within
+    `max_result_age`. This takes two queries: one to find the lowest task id
+    to keep on the (schedule_entry, task_id) index, and one DELETE.
+
+    :returns: the number of results deleted
+
+    """
+    results = TaskResult.objects.filter(schedule_entry=schedule_entry)
+    max_results = schedule_entry.max_results or settings.MAX_TASK_RESULTS
+    task_ids = results.order_by('-task_id').values_list('task_id', flat=True)
+    oldest_kept = list(task_ids[max_results - 1:max_results])
+
+    expired = []
+    if oldest_kept:
+        expired.append(Q(task_id__lt=oldest_kept[0]))
+
+    if schedule_entry.max_result_age:
+        max_age = timedelta(milliseconds=schedule_entry.max_result_age)
+        expired.append(Q(finished__lt=timezone.now() - max_age))
+
+    if not expired:
+        return 0
+
+    ndeleted, _ = results.filter(reduce(operator.or_, expired)).delete()
+    return ndeleted
@@ -10,7 +10,9 @@ class TaskResultsOverviewSerializer(serializers.HyperlinkedModelSerializer):
     schedule_entry = serializers.SerializerMethodField(
         help_text="The related schedule entry for the result"
     )
-    results_available = serializers.SerializerMethodField(
+    # annotated by ResultsOverviewViewSet
+    results_available = serializers.IntegerField(
+        read_only=True,
         help_text="The number of available results"
     )
 
@@ -30,9 +32,6 @@ class TaskResultsOverviewSerializer(serializers.HyperlinkedModelSerializer):
             }
         }
 
-    def get_results_available(self, obj):
-        return obj.results.count()
-
     def get_schedule_entry(self, obj):
         request = self.context['request']
         route = 'schedule-detail'
@@ -47,8 +46,9 @@ class TaskResultsOverviewSerializer(serializers.HyperlinkedModelSerializer):
 class TaskResultHyperlinkedRelatedField(serializers.HyperlinkedRelatedField):
     # django-rest-framework.org/api-guide/relations/#custom-hyperlinked-fields
     def get_url(self, obj, view_name, request, format):
+        # The entry's primary key is its name, so no query is needed
         kws = {
-            'schedule_entry_name': obj.schedule_entry.name,
+            'schedule_entry_name': obj.schedule_entry_id,
             'task_id': obj.task_id
         }
         kws.update(V1)
@@ -74,6 +74,7 @@ class TaskResultSerializer(serializers.HyperlinkedModelSerializer):
             'started',
             'finished',
             'duration',
+            'lateness',
             'result',
             'detail',
             'schedule_entry',
@@ -82,7 +83,7 @@ class TaskResultSerializer(serializers.HyperlinkedModelSerializer):
     def get_schedule_entry(self, obj):
         request = self.context['request']
         route = 'schedule-detail'
-        kws = {'pk': obj.schedule_entry.name}
+        kws = {'pk': obj.schedule_entry_id}
         kws.update(V1)
         url = reverse(route, kwargs=kws, request=request)
 
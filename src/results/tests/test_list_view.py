@@ -5,6 +5,7 @@ from acquisitions.tests.utils import simulate_acquisitions
 from results.tests.utils import (
     create_task_results,
     get_result_list,
+    get_result_list_page,
     reverse_result_detail,
     reverse_result_list,
 )
@@ -38,6 +39,25 @@ def test_multiple_result_response(user_client, test_scheduler):
         assert acq['task_id'] == i
 
 
+@pytest.mark.django_db
+def test_list_is_paginated(user_client):
+    entry_name = create_task_results(5, user_client)
+    page = get_result_list_page(user_client, entry_name, limit=3)
+    assert [r['task_id'] for r in page['results']] == [1, 2, 3]
+
+    response = user_client.get(page['next'], **HTTPS_KWARG)
+    page = validate_response(response, status.HTTP_200_OK)
+    assert [r['task_id'] for r in page['results']] == [4, 5]
+    assert page['next'] is None
+
+
+@pytest.mark.django_db
+def test_list_after_task_id(user_client):
+    entry_name = create_task_results(5, user_client)
+    results = get_result_list(user_client, entry_name, after_task_id=2)
+    assert [r['task_id'] for r in results] == [3, 4, 5]
+
+
 def test_private_entry_results_list_is_private(admin_client, user_client,
                                                test_scheduler):
     entry_name = simulate_acquisitions(admin_client, is_private=True)
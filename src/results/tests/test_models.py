@@ -1,7 +1,17 @@
+from datetime import timedelta
+
 import pytest
+from django.utils import timezone
 
-from results.models import TaskResult
+from results.models import TaskResult, prune_task_results
 from results.tests.utils import TEST_MAX_TASK_RESULTS, create_task_results
+from schedule.models import ScheduleEntry
+
+
+def create_entry_with_retention(user_client, **retention):
+    entry_name = create_task_results(0, user_client)
+    ScheduleEntry.objects.filter(name=entry_name).update(**retention)
+    return entry_name
 
 
 @pytest.mark.django_db
@@ -11,6 +21,50 @@ def test_max_results(user_client):
     assert TaskResult.objects.count() == TEST_MAX_TASK_RESULTS
 
 
+@pytest.mark.django_db
+def test_results_pruned_in_batches(user_client, settings):
+    """Old results should only be deleted every few tasks."""
+    settings.TASK_RESULT_PRUNE_INTERVAL = 10
+    entry_name = create_entry_with_retention(user_client, max_results=5)
+
+    create_task_results(12, user_client, entry_name)
+
+    task_ids = TaskResult.objects.values_list('task_id', flat=True)
+    assert list(task_ids) == [6, 7, 8, 9, 10, 11, 12]
+
+
+@pytest.mark.django_db
+def test_max_results_per_entry(user_client):
+    entry_name = create_entry_with_retention(user_client, max_results=5)
+    create_task_results(20, user_client, entry_name)
+
+    task_ids = TaskResult.objects.values_list('task_id', flat=True)
+    assert list(task_ids) == [16, 17, 18, 19, 20]
+
+
+@pytest.mark.django_db
+def test_max_result_age(user_client):
+    entry_name = create_entry_with_retention(user_client, max_result_age=60000)
+    create_task_results(5, user_client, entry_name)
+    an_hour_ago = timezone.now() - timedelta(hours=1)
+    TaskResult.objects.filter(task_id__lte=3).update(finished=an_hour_ago)
+
+    entry = ScheduleEntry.objects.get(name=entry_name)
+    assert prune_task_results(entry) == 3
+    assert TaskResult.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_prune_makes_two_queries(user_client, django_assert_num_queries):
+    entry_name = create_entry_with_retention(
+        user_client, max_results=5, max_result_age=60000)
+    create_task_results(9, user_client, entry_name)
+    entry = ScheduleEntry.objects.get(name=entry_name)
+
+    with django_assert_num_queries(2):
+        assert prune_task_results(entry) == 4
+
+
 @pytest.mark.django_db
 def test_str(user_client):
     create_task_results(1, user_client)
@@ -0,0 +1,31 @@
+"""Query counts shouldn't grow with the number of entries or results."""
+
+import pytest
+
+from sensor.tests.utils import count_queries
+from .utils import (
+    create_task_results,
+    get_result_list,
+    get_results_overview
+)
+
+
+@pytest.mark.django_db
+def test_results_overview_queries(user_client):
+    create_task_results(1, user_client, 'entry0')
+    nqueries = count_queries(get_results_overview, user_client)
+
+    for i in range(1, 5):
+        create_task_results(3, user_client, 'entry' + str(i))
+
+    assert count_queries(get_results_overview, user_client) <= nqueries
+
+
+@pytest.mark.django_db
+def test_result_list_queries(user_client):
+    entry_name = create_task_results(1, user_client)
+    nqueries = count_queries(get_result_list, user_client, entry_name)
+
+    create_task_results(50, user_client, entry_name, first_task_id=2)
+
+    assert count_queries(get_result_list, user_client, entry_name) <= nqueries
@@ -12,18 +12,18 @@ from sensor import V1
 from sensor.tests.utils import validate_response, HTTPS_KWARG
 
 
-TEST_MAX_TASK_RESULTS = 100  # Reduce from default of settings.MAX_TASK_RESULTS
+TEST_MAX_TASK_RESULTS = 100  # settings.MAX_TASK_RESULTS
 ONE_MICROSECOND = datetime.timedelta(0, 0, 1)
 
 EMPTY_RESULTS_RESPONSE = []
 
 
-def create_task_results(n, user_client, entry_name=None):
+def create_task_results(n, user_client, entry_name=None, first_task_id=1):
     # We need an entry in the schedule to create TRs for
     try:
         entry = ScheduleEntry.objects.get(name=entry_name)
     except Exception:
-        test_entry = TEST_SCHEDULE_ENTRY
+        test_entry = TEST_SCHEDULE_ENTRY.copy()
         if entry_name is not None:
             test_entry['name'] = entry_name
 
@@ -35,14 +35,13 @@ def create_task_results(n, user_client, entry_name=None):
         started = timezone.now()
         tr = TaskResult(
             schedule_entry=entry,
-            task_id=i+1,
+            task_id=first_task_id+i,
             started=started,
             finished=started+ONE_MICROSECOND,
             duration=ONE_MICROSECOND,
             result='success',
             detail=''
         )
-        tr.max_results = TEST_MAX_TASK_RESULTS
         tr.save()
 
     return entry_name
@@ -77,12 +76,18 @@ def get_results_overview(client):
     return validate_response(response, status.HTTP_200_OK)
 
 
-def get_result_list(client, schedule_entry_name):
+def get_result_list_page(client, schedule_entry_name, **params):
     url = reverse_result_list(schedule_entry_name)
-    response = client.get(url, **HTTPS_KWARG)
+    response = client.get(url, params, **HTTPS_KWARG)
     return validate_response(response, status.HTTP_200_OK)
 
 
+def get_result_list(client, schedule_entry_name, **params):
+    """Return the results on the first page of the list."""
+    page = get_result_list_page(client, schedule_entry_name, **params)
+    return page['results']
+
+
 def get_result_detail(client, schedule_entry_name, task_id):
     url = reverse_result_detail(schedule_entry_name, task_id)
     response = client.get(url, **HTTPS_KWARG)
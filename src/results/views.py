@@ -1,9 +1,11 @@
+from django.db.models import Count
 from django.http import Http404
 from rest_framework.generics import get_object_or_404
 from rest_framework.mixins import ListModelMixin, RetrieveModelMixin
 from rest_framework.viewsets import GenericViewSet
 
 from schedule.models import ScheduleEntry
+from sensor.pagination import TaskCursorPagination
 from .models import TaskResult
 from .serializers import TaskResultsOverviewSerializer, TaskResultSerializer
 
@@ -23,10 +25,10 @@ class ResultsOverviewViewSet(ListModelMixin, GenericViewSet):
         # checks, so we need to filter our queryset based on `is_private` and
         # request user.
         base_queryset = self.filter_queryset(self.queryset)
-        if self.request.user.is_staff:
-            return base_queryset.all()
-        else:
-            return base_queryset.filter(is_private=False)
+        if not self.request.user.is_staff:
+            base_queryset = base_queryset.filter(is_private=False)
+
+        return base_queryset.annotate(results_available=Count('results'))
 
 
 class MultipleFieldLookupMixin(object):
@@ -53,13 +55,20 @@ class MultipleFieldLookupMixin(object):
         return get_object_or_404(queryset, **filter)
 
 
+class TaskResultCursorPagination(TaskCursorPagination):
+    ordering = ('finished', 'task_id')
+
+
 class ResultListViewSet(ListModelMixin, GenericViewSet):
     """
     list:
-    Returns a list of all results created by the given schedule entry.
+    Returns a page of the results created by the given schedule entry,
+    oldest first. Pass `since` or `after_task_id` to only list newer results
+    and `limit` to set the page size.
     """
     queryset = TaskResult.objects.all()
     serializer_class = TaskResultSerializer
+    pagination_class = TaskResultCursorPagination
     lookup_fields = ('schedule_entry__name',)
 
     def get_queryset(self):
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import django.core.validators
+from django.db import migrations, models
+from django.db.models import F
+
+import schedule.models.schedule_entry
+
+
+TIME_FIELDS = ('start', 'stop', 'interval', 'next_task_time')
+
+
+def seconds_to_milliseconds(apps, schema_editor):
+    ScheduleEntry = apps.get_model('schedule', 'ScheduleEntry')
+    # F() expressions leave NULL stop and interval values NULL
+    ScheduleEntry.objects.update(**{f: F(f) * 1000 for f in TIME_FIELDS})
+
+
+def milliseconds_to_seconds(apps, schema_editor):
+    ScheduleEntry = apps.get_model('schedule', 'ScheduleEntry')
+    ScheduleEntry.objects.update(**{f: F(f) / 1000 for f in TIME_FIELDS})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='scheduleentry',
+            name='start',
+            field=models.BigIntegerField(blank=True, default=schedule.models.schedule_entry.next_schedulable_timefn, help_text=b"Absolute time (epoch milliseconds) to start, or leave blank for 'now'"),
+        ),
+        migrations.AlterField(
+            model_name='scheduleentry',
+            name='stop',
+            field=models.BigIntegerField(blank=True, help_text=b"Absolute time (epoch milliseconds) to stop, or leave blank for 'never'", null=True),
+        ),
+        migrations.AlterField(
+            model_name='scheduleentry',
+            name='interval',
+            field=models.BigIntegerField(blank=True, help_text=b'Milliseconds between tasks, or leave blank to run once', null=True, validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+        migrations.AlterField(
+            model_name='scheduleentry',
+            name='next_task_time',
+            field=models.BigIntegerField(editable=False, help_text=b'The time (epoch milliseconds) the next task is scheduled to be executed', null=True),
+        ),
+        migrations.RunPython(seconds_to_milliseconds, milliseconds_to_seconds),
+    ]
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule', '0002_millisecond_task_times'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scheduleentry',
+            name='missed_task_count',
+            field=models.IntegerField(default=0, editable=False, help_text=b"The number of tasks skipped because they couldn't run at their scheduled time"),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule', '0003_scheduleentry_missed_task_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scheduleentry',
+            name='max_results',
+            field=models.PositiveIntegerField(blank=True, help_text=b"The number of task results to keep, or leave blank for the sensor's default", null=True, validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+        migrations.AddField(
+            model_name='scheduleentry',
+            name='max_result_age',
+            field=models.BigIntegerField(blank=True, help_text=b'Milliseconds to keep task results, or leave blank to keep them until there are more than `max_results`', null=True, validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+    ]
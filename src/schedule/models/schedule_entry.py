@@ -34,6 +34,9 @@ class ScheduleEntry(models.Model):
     order of `priority`. If two tasks are scheduled to run at the same time and
     have the same `priority`, execution order is undefined.
 
+    Task times, `start`, `stop` and `interval` are integer milliseconds (see
+    :func:`scheduler.utils.timefn`).
+
     """
 
     # Implementation notes:
@@ -85,18 +88,20 @@ class ScheduleEntry(models.Model):
     start = models.BigIntegerField(
         blank=True,
         default=next_schedulable_timefn,
-        help_text="Absolute time (epoch) to start, or leave blank for 'now'"
+        help_text=("Absolute time (epoch milliseconds) to start, or leave "
+                   "blank for 'now'")
     )
     stop = models.BigIntegerField(
         null=True,
         blank=True,
-        help_text="Absolute time (epoch) to stop, or leave blank for 'never'"
+        help_text=("Absolute time (epoch milliseconds) to stop, or leave "
+                   "blank for 'never'")
     )
-    interval = models.PositiveIntegerField(
+    interval = models.BigIntegerField(
         null=True,
         blank=True,
         validators=(MinValueValidator(1),),
-        help_text="Seconds between tasks, or leave blank to run once"
+        help_text="Milliseconds between tasks, or leave blank to run once"
     )
     is_active = models.BooleanField(
         default=True,
@@ -116,18 +121,39 @@ class ScheduleEntry(models.Model):
         help_text=("If given, the scheduler will POST a `TaskResult` JSON "
                    "object to this URL after each task completes")
     )
+    max_results = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        validators=(MinValueValidator(1),),
+        help_text=("The number of task results to keep, or leave blank for "
+                   "the sensor's default")
+    )
+    max_result_age = models.BigIntegerField(
+        null=True,
+        blank=True,
+        validators=(MinValueValidator(1),),
+        help_text=("Milliseconds to keep task results, or leave blank to "
+                   "keep them until there are more than `max_results`")
+    )
 
     # read-only fields
     next_task_time = models.BigIntegerField(
         null=True,
         editable=False,
-        help_text="The time the next task is scheduled to be executed"
+        help_text=("The time (epoch milliseconds) the next task is scheduled "
+                   "to be executed")
     )
     next_task_id = models.IntegerField(
         default=1,
         editable=False,
         help_text="The id of the next task to be executed"
     )
+    missed_task_count = models.IntegerField(
+        default=0,
+        editable=False,
+        help_text=("The number of tasks skipped because they couldn't run at "
+                   "their scheduled time")
+    )
     created = models.DateTimeField(
         auto_now_add=True,
         help_text="The date the entry was created"
@@ -1,6 +1,8 @@
 from datetime import datetime
+from decimal import Decimal
 
 from rest_framework import serializers
+from rest_framework.fields import empty
 from rest_framework.reverse import reverse
 
 import actions
@@ -42,6 +44,30 @@ class DateTimeFromTimestampField(serializers.DateTimeField):
         return get_timestamp_from_datetime(dt)
 
 
+class SecondsFromMillisecondsField(serializers.DecimalField):
+    """DecimalField of seconds with integer milliseconds as internal value."""
+    def __init__(self, **kwargs):
+        kwargs.setdefault('max_digits', None)
+        kwargs.setdefault('decimal_places', 3)  # millisecond resolution
+        kwargs.setdefault('coerce_to_string', False)
+        super(SecondsFromMillisecondsField, self).__init__(**kwargs)
+
+    def to_representation(self, ms):
+        """Convert integer milliseconds to decimal seconds."""
+        seconds = Decimal(ms) / 1000
+        s = super(SecondsFromMillisecondsField, self)
+        return s.to_representation(seconds)
+
+    def run_validation(self, data=empty):
+        """Validate decimal seconds and return integer milliseconds."""
+        s = super(SecondsFromMillisecondsField, self)
+        seconds = s.run_validation(data)
+        if seconds is None:
+            return None
+
+        return int(seconds * 1000)
+
+
 class ScheduleEntrySerializer(serializers.HyperlinkedModelSerializer):
     """Covert ScheduleEntry to and from JSON."""
     acquisitions = serializers.SerializerMethodField(
@@ -64,15 +90,29 @@ class ScheduleEntrySerializer(serializers.HyperlinkedModelSerializer):
         help_text=("UTC time (ISO 8601) to stop, "
                    "or leave blank for 'never' (not valid with relative stop)")
     )
-    relative_stop = serializers.IntegerField(
+    relative_stop = SecondsFromMillisecondsField(
         required=False,
         write_only=True,
         allow_null=True,
         default=None,
-        min_value=1,
-        help_text=("Integer seconds after start to stop, "
+        min_value=Decimal('0.001'),
+        help_text=("Seconds after start to stop, "
                    "or leave blank for 'never' (not valid with absolute stop)")
     )
+    interval = SecondsFromMillisecondsField(
+        required=False,
+        allow_null=True,
+        min_value=Decimal('0.001'),
+        help_text=("Seconds between tasks, with millisecond resolution, "
+                   "or leave blank to run once")
+    )
+    max_result_age = SecondsFromMillisecondsField(
+        required=False,
+        allow_null=True,
+        min_value=Decimal('0.001'),
+        help_text=("Seconds to keep task results, or leave blank to keep "
+                   "them until there are more than max results")
+    )
     next_task_time = DateTimeFromTimestampField(
         read_only=True,
         help_text="UTC time (ISO 8601) the next task is scheduled for"
@@ -113,8 +153,11 @@ class ScheduleEntrySerializer(serializers.HyperlinkedModelSerializer):
             'is_active',
             'is_private',
             'callback_url',
+            'max_results',
+            'max_result_age',
             'next_task_time',
             'next_task_id',
+            'missed_task_count',
             'created',
             'modified',
             'owner',
@@ -132,7 +175,11 @@ class ScheduleEntrySerializer(serializers.HyperlinkedModelSerializer):
                 'help_text': "The name of the user who owns the entry"
             }
         }
-        read_only_fields = ('is_active', 'next_task_time')
+        read_only_fields = (
+            'is_active',
+            'next_task_time',
+            'missed_task_count'
+        )
         write_only_fields = ('relative_stop', 'validate_only')
 
     def save(self, *args, **kwargs):
@@ -29,7 +29,7 @@ def test_take_until(test_input, future_t, expected):
     assert initial_times == list(flatten(r))
 
 
-def test_undefined_start_is_now():
+def test_undefined_start_is_now(testclock):
     entry = ScheduleEntry(name='t', action='logger')
     now = utils.timefn()
     assert entry.start in (now-1, now, now+1)
@@ -1,5 +1,6 @@
 import pytest
 
+from schedule.models import ScheduleEntry
 from schedule.serializers import ScheduleEntrySerializer
 from sensor.utils import parse_datetime_str
 
@@ -20,6 +21,15 @@ from .utils import post_schedule
     {'name': 'test', 'action': 'logger', 'relative_stop': 10},
     # Min integer interval ok
     {'name': 'test', 'action': 'logger', 'interval': 10},
+    # Decimal seconds interval ok
+    {'name': 'test', 'action': 'logger', 'interval': 0.25},
+    # Millisecond interval ok
+    {'name': 'test', 'action': 'logger', 'interval': 0.001},
+    # Decimal seconds relative_stop ok
+    {'name': 'test', 'action': 'logger', 'relative_stop': 3.14},
+    # Result retention ok
+    {'name': 'test', 'action': 'logger', 'max_results': 10},
+    {'name': 'test', 'action': 'logger', 'max_result_age': 3600},
     # Max priority ok
     {'name': 'test', 'action': 'logger', 'priority': 19},
     # Min user priority ok
@@ -56,6 +66,8 @@ from .utils import post_schedule
         'start': None,
         'interval': None,
         'callback_url': None,
+        'max_results': None,
+        'max_result_age': None,
     },
     # Explicit validate_only is valid
     {'name': 'test', 'action': 'logger', 'validate_only': False},
@@ -79,8 +91,8 @@ def test_valid_entries(entry_json, user):
     {'name': 'test', 'action': 'logger', 'priority': -1},
     # priority greater than max (19)
     {'name': 'test', 'action': 'logger', 'priority': 20},
-    # non-integer interval
-    {'name': 'test', 'action': 'logger', 'interval': 3.14},
+    # sub-millisecond interval
+    {'name': 'test', 'action': 'logger', 'interval': 0.0005},
     # zero interval
     {'name': 'test', 'action': 'logger', 'interval': 0},
     # negative interval
@@ -93,12 +105,16 @@ def test_valid_entries(entry_json, user):
         'absolute_stop': '2018-03-16T17:12:35.0Z',
         'relative_stop': 10,
     },
+    # must keep at least one result
+    {'name': 'test', 'action': 'logger', 'max_results': 0},
+    # zero max_result_age
+    {'name': 'test', 'action': 'logger', 'max_result_age': 0},
     # 0 relative_stop
     {'name': 'test', 'action': 'logger', 'relative_stop': 0},
     # negative relative_stop
     {'name': 'test', 'action': 'logger', 'relative_stop': -10},
-    # non-integer relative_stop
-    {'name': 'test', 'action': 'logger', 'relative_stop': 3.14},
+    # sub-millisecond relative_stop
+    {'name': 'test', 'action': 'logger', 'relative_stop': 0.0005},
     # stop is before start
     {
         'name': 'test',
@@ -131,6 +147,8 @@ def test_serialized_fields(user_client):
     # nullable fields
     assert 'interval' in rjson
     assert 'callback_url' in rjson
+    assert 'max_results' in rjson
+    assert 'max_result_age' in rjson
     # non-nullable fields
     assert rjson['name']
     assert rjson['action']
@@ -153,6 +171,14 @@ def test_serialized_fields(user_client):
     assert rjson['acquisitions']
 
 
+def test_interval_is_decimal_seconds(user_client):
+    """Intervals are given in seconds and stored in milliseconds."""
+    entry = {'name': 'test', 'action': 'logger', 'interval': 0.25}
+    rjson = post_schedule(user_client, entry)
+    assert rjson['interval'] == 0.25
+    assert ScheduleEntry.objects.get(name='test').interval == 250
+
+
 def test_non_serialized_fields(user_client):
     """Certain fields on the schedule entry model should not be serialized."""
     rjson = post_schedule(user_client, {'name': 'test', 'action': 'logger'})
@@ -162,7 +162,7 @@ def test_validate_only_does_not_modify_schedule_with_bad_entry(user_client):
     """A bad entry with validate_only should return 400 only."""
     # Ensure that a 400 "BAD REQUEST" is returned from the validator
     entry = TEST_SCHEDULE_ENTRY.copy()
-    entry['interval'] = 1.5  # non-integer interval is invalid
+    entry['interval'] = 1.0005  # sub-millisecond interval is invalid
     entry['validate_only'] = True
     expected_status = status.HTTP_400_BAD_REQUEST
     post_schedule(user_client, entry, expected_status=expected_status)
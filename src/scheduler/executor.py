@@ -0,0 +1,115 @@
+"""Run tasks concurrently while serializing access to shared resources."""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.db import close_old_connections
+
+
+logger = logging.getLogger(__name__)
+
+
+class TaskExecutor(object):
+    """Run tasks on worker threads, one at a time per shared resource.
+
+    Tasks that need no resources run on a shared thread pool. Tasks that
+    need resources run in submission order on a single-threaded lane per
+    set of resources, and hold a lock on each resource while they run, so
+    tasks with overlapping resources never run at once.
+
+    The executor also tracks which schedule entries have a task queued or
+    running, so the scheduler can skip a task rather than queue a second
+    one behind it.
+
+    :param max_workers: number of threads for tasks without resources, or 0
+                        to run every task inline in the submitting thread
+
+    """
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self._pool = None
+        self._lanes = {}
+        self._resource_locks = {}
+        self._futures = set()
+        self._busy_entries = set()
+        self._lock = threading.Lock()
+
+    @property
+    def is_inline(self):
+        return not self.max_workers
+
+    def is_busy(self, schedule_entry_name):
+        """Return True if the entry has a task queued or running."""
+        with self._lock:
+            return schedule_entry_name in self._busy_entries
+
+    def submit(self, schedule_entry_name, resources, fn, *args):
+        """Run `fn(*args)` for a task of the named entry."""
+        with self._lock:
+            self._busy_entries.add(schedule_entry_name)
+
+        if self.is_inline:
+            self._run(schedule_entry_name, resources, fn, args)
+            return
+
+        executor = self._get_executor(resources)
+        future = executor.submit(
+            self._run, schedule_entry_name, resources, fn, args)
+        with self._lock:
+            self._futures.add(future)
+
+        future.add_done_callback(self._discard_future)
+
+    def wait(self):
+        """Block until every submitted task has finished."""
+        with self._lock:
+            futures = list(self._futures)
+
+        wait(futures)
+
+    def _get_executor(self, resources):
+        key = tuple(sorted(set(resources)))
+        with self._lock:
+            if not key:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(self.max_workers)
+
+                return self._pool
+
+            if key not in self._lanes:
+                self._lanes[key] = ThreadPoolExecutor(max_workers=1)
+
+            return self._lanes[key]
+
+    def _get_resource_locks(self, resources):
+        with self._lock:
+            # Always acquired in sorted order, so lanes can't deadlock
+            return [self._resource_locks.setdefault(r, threading.Lock())
+                    for r in sorted(set(resources))]
+
+    def _run(self, schedule_entry_name, resources, fn, args):
+        locks = self._get_resource_locks(resources)
+        for lock in locks:
+            lock.acquire()
+
+        try:
+            if not self.is_inline:
+                close_old_connections()
+
+            fn(*args)
+        except Exception:
+            logger.exception("task for {} failed".format(schedule_entry_name))
+        finally:
+            if not self.is_inline:
+                close_old_connections()
+
+            for lock in reversed(locks):
+                lock.release()
+
+            with self._lock:
+                self._busy_entries.discard(schedule_entry_name)
+
+    def _discard_future(self, future):
+        with self._lock:
+            self._futures.discard(future)
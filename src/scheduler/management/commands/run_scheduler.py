@@ -0,0 +1,25 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from scheduler.scheduler import Scheduler
+
+
+class Command(BaseCommand):
+    help = "Run the scheduler in this process until interrupted"
+
+    def handle(self, *args, **options):
+        scheduler = Scheduler(standalone=True)
+
+        def stop(signum, frame):
+            self.stdout.write("Stopping scheduler")
+            scheduler.stop()
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+
+        self.stdout.write("Starting scheduler")
+        scheduler.start()
+        # Join with a timeout so signal handlers can run
+        while scheduler.is_alive():
+            scheduler.join(1)
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import jsonfield.fields
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SchedulerStatus',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(default=b'dead', help_text=b'"running", "idle" or "dead"', max_length=7)),
+                ('task_queue', jsonfield.fields.JSONField(default=list, help_text=b'The first upcoming tasks as lists of task fields')),
+                ('updated', models.DateTimeField(help_text=b'The time the scheduler last published its status', null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'scheduler status',
+            },
+        ),
+    ]
@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+from django.db import models
+from django.utils import timezone
+from jsonfield import JSONField
+
+
+# A standalone scheduler publishes its status at least once a second, so an
+# older status means it has stopped (see `Scheduler.standalone`)
+STATUS_TIMEOUT = timedelta(seconds=10)
+
+
+class SchedulerStatus(models.Model):
+    """The last status published by a standalone scheduler process.
+
+    There is at most one row, which the scheduler updates after each pass
+    over the schedule so API processes can report it.
+
+    """
+    status = models.CharField(
+        max_length=7,
+        default='dead',
+        help_text='"running", "idle" or "dead"'
+    )
+    task_queue = JSONField(
+        default=list,
+        help_text="The first upcoming tasks as lists of task fields"
+    )
+    updated = models.DateTimeField(
+        null=True,
+        help_text="The time the scheduler last published its status"
+    )
+
+    class Meta:
+        verbose_name_plural = 'scheduler status'
+
+    @classmethod
+    def publish(cls, status, tasks):
+        """Replace the published status and upcoming tasks."""
+        fields = {
+            'status': status,
+            'task_queue': [list(task) for task in tasks],
+            'updated': timezone.now()
+        }
+        if not cls.objects.filter(pk=1).update(**fields):
+            cls.objects.create(pk=1, **fields)
+
+    @classmethod
+    def load(cls):
+        """Return the published status, or a dead status if none."""
+        return cls.objects.filter(pk=1).first() or cls()
+
+    @property
+    def current_status(self):
+        """The published status, or "dead" if it is out of date."""
+        if self.updated is None:
+            return 'dead'
+
+        if timezone.now() - self.updated > STATUS_TIMEOUT:
+            return 'dead'
+
+        return self.status
+
+    @property
+    def tasks(self):
+        from .tasks import Task
+
+        return [Task(*fields) for fields in self.task_queue]
+
+    def __str__(self):
+        return self.current_status
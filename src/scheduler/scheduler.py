@@ -2,32 +2,78 @@
 
 import logging
 import threading
-from contextlib import contextmanager
+from datetime import timedelta
 
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Value, When
+from django.db.models.signals import post_delete, post_save
 from django.utils import timezone
 from requests_futures.sessions import FuturesSession
 
+from capabilities.calibration import scale_factors
+from capabilities.definition import sensor_definition
 from results.consts import MAX_DETAIL_LEN
 from results.models import TaskResult
 from results.serializers import TaskResultSerializer
 from schedule.models import ScheduleEntry
 from . import utils
-from .tasks import TaskQueue
+from .executor import TaskExecutor
+from .models import SchedulerStatus
+from .tasks import TaskQueue, UpcomingTasks
 
 
 logger = logging.getLogger(__name__)
 requests_futures_session = FuturesSession()
 
+# Fields the scheduler itself updates, which shouldn't wake it up
+SCHEDULER_UPDATE_FIELDS = frozenset(('next_task_id', 'next_task_time',
+                                     'is_active', 'missed_task_count'))
+
+# Entries per UPDATE statement, which keeps SQLite under its 999 parameter
+# limit (each entry takes 9 parameters)
+UPDATE_BATCH_SIZE = 100
+
+# How often (ms) a standalone scheduler checks for schedule changes made by
+# other processes, and the number of upcoming tasks it publishes
+STANDALONE_POLL_INTERVAL = 1000
+PUBLISHED_TASK_QUEUE_SIZE = 100
+
 
 class Scheduler(threading.Thread):
-    """A memory-friendly task scheduler."""
-    def __init__(self):
+    """A memory-friendly task scheduler.
+
+    Between passes over the schedule, the scheduler sleeps until the next
+    task time or until a schedule entry is created, updated or deleted.
+
+    Tasks run on a :class:`TaskExecutor`, so a task only waits for earlier
+    tasks that need the same resources (see `Action.resources`). If an
+    entry's previous task is still queued or running when its next task is
+    due, the new task is skipped and counted in `missed_task_count`.
+
+    :param standalone: True if the scheduler runs in its own process (see the
+                       `run_scheduler` command). A standalone scheduler
+                       checks for schedule changes every
+                       `STANDALONE_POLL_INTERVAL` milliseconds, since changes
+                       made by API processes can't wake it, and publishes its
+                       status and upcoming tasks to `SchedulerStatus` after
+                       each pass. For the same reason, it reloads the cached
+                       sensor definition and scale factors before it runs
+                       tasks.
+
+    """
+    def __init__(self, standalone=False):
         threading.Thread.__init__(self)
 
+        self.standalone = standalone
+
         self.timefn = utils.timefn
+        self.monotonicfn = utils.monotonicfn
         self.delayfn = utils.delayfn
+        self.waitfn = utils.waitfn
 
-        self.task_queue = TaskQueue()
+        self.task_queue = UpcomingTasks()
+        self.executor = TaskExecutor(settings.SCHEDULER_MAX_WORKERS)
 
         # scheduler looks ahead `interval_multiplier` times the shortest
         # interval in the schedule in order to keep memory-usage low
@@ -35,6 +81,11 @@ class Scheduler(threading.Thread):
         self.name = 'Scheduler'
         self.running = False
         self.interrupt_flag = threading.Event()
+        self.schedule_changed = threading.Event()
+
+        post_save.connect(self._schedule_changed_handler, sender=ScheduleEntry)
+        post_delete.connect(
+            self._schedule_changed_handler, sender=ScheduleEntry)
 
     @property
     def schedule(self):
@@ -55,6 +106,7 @@ class Scheduler(threading.Thread):
     def stop(self):
         """Complete the current task, then return control."""
         self.interrupt_flag.set()
+        self.schedule_changed.set()
 
     def start(self):
         """Run the scheduler in its own thread and return control."""
@@ -67,48 +119,105 @@ class Scheduler(threading.Thread):
 
         """
         while True:
-            with minimum_duration(blocking):
-                self._consume_schedule(blocking)
+            next_task_time = self._consume_schedule()
+            if self.standalone:
+                self._publish_status()
+                next_task_time = self._get_wake_time(next_task_time)
 
             if not blocking or self.interrupt_flag.is_set():
                 logger.info("scheduler interrupted")
                 break
 
-    def _consume_schedule(self, blocking):
-        while self.schedule_has_entries:
-            with minimum_duration(blocking):
-                self.running = True
-                schedule_snapshot = self.schedule
-                pending_task_queue = self._queue_tasks(schedule_snapshot)
-                self._consume_task_queue(pending_task_queue)
+            self.waitfn(self.schedule_changed, next_task_time)
 
-            if not blocking or self.interrupt_flag.is_set():
-                break
-        else:
+        self.executor.wait()
+        self.running = False
+        if self.standalone and self.interrupt_flag.is_set():
+            SchedulerStatus.publish('dead', [])
+
+    def _consume_schedule(self):
+        """Run pending tasks and return the next task time, or None."""
+        # Clear before querying so a change made during the pass isn't lost
+        self.schedule_changed.clear()
+        schedule_snapshot = list(self.schedule)
+
+        if not schedule_snapshot:
             self.task_queue.clear()
             if self.running:
                 logger.info("all scheduled tasks completed")
 
-        self.running = False
+            self.running = False
+            return None
+
+        self.running = True
+        pending_task_queue = self._queue_tasks(schedule_snapshot)
+        if self.standalone and pending_task_queue:
+            self._invalidate_caches()
+
+        entries = {entry.name: entry for entry in schedule_snapshot}
+        self._consume_task_queue(pending_task_queue, entries)
+
+        return self._get_next_task_time(schedule_snapshot)
+
+    @staticmethod
+    def _invalidate_caches():
+        # The caches are only invalidated by changes made in this process
+        scale_factors.invalidate()
+        sensor_definition.invalidate()
+
+    def _publish_status(self):
+        status = 'running' if self.running else 'idle'
+        tasks = self.task_queue[:PUBLISHED_TASK_QUEUE_SIZE]
+        SchedulerStatus.publish(status, tasks)
+
+    def _get_wake_time(self, next_task_time):
+        poll_time = self.timefn() + STANDALONE_POLL_INTERVAL
+        if next_task_time is None:
+            return poll_time
+
+        return min(next_task_time, poll_time)
+
+    def _schedule_changed_handler(self, sender, instance, update_fields=None,
+                                  **kwargs):
+        if update_fields and SCHEDULER_UPDATE_FIELDS.issuperset(update_fields):
+            return
+
+        # Wake up once the change is visible to the scheduler's queries
+        transaction.on_commit(self.schedule_changed.set)
 
     def _queue_tasks(self, schedule_snapshot):
         pending_task_queue = self._queue_pending_tasks(schedule_snapshot)
-        self.task_queue = self._queue_upcoming_tasks(schedule_snapshot)
+        self.task_queue = self._get_upcoming_tasks(schedule_snapshot)
 
         return pending_task_queue
 
-    def _consume_task_queue(self, pending_task_queue):
+    def _consume_task_queue(self, pending_task_queue, entries):
+        # Task times are on the system clock. Convert them to the monotonic
+        # clock once, so stepping the system clock while a task waits for
+        # its resources doesn't skew its lateness.
+        clock_offset = self.monotonicfn() - self.timefn()
         for task in pending_task_queue.to_list():
-            result, started, finished, detail = self._call_task_action(task)
-            self._save_task_result(task, started, finished, result, detail)
+            entry = entries[task.schedule_entry_name]
+            resources = getattr(task.action_fn, 'resources', ())
+            due = task.time + clock_offset
+            self.executor.submit(entry.name, resources, self._run_task, entry,
+                                 task, due)
+
+    def _run_task(self, entry, task, due):
+        task_result = self._call_task_action(task, due)
+        self._save_task_result(entry, task, *task_result)
 
-    def _call_task_action(self, task):
+    def _call_task_action(self, task, due):
         entry_name = task.schedule_entry_name
         task_id = task.task_id
         started = timezone.now()
+        # Rounding both clocks to milliseconds can put a due task 1 ms early
+        lateness = timedelta(milliseconds=max(0, self.monotonicfn() - due))
 
         try:
-            logger.debug("running task {}/{}".format(entry_name, task_id))
+            msg = "running task {}/{} {:.3f} s late"
+            logger.debug(msg.format(entry_name, task_id,
+                                    lateness.total_seconds()))
             detail = task.action_fn(entry_name, task_id)
             self.delayfn(0)  # let other threads run
             result = 'success'
@@ -122,11 +231,10 @@ class Scheduler(threading.Thread):
 
         finished = timezone.now()
 
-        return result, started, finished, detail[:MAX_DETAIL_LEN]
+        return result, started, finished, lateness, detail[:MAX_DETAIL_LEN]
 
-    def _save_task_result(self, task, started, finished, result, detail):
-        entry_name = task.schedule_entry_name
-        entry = ScheduleEntry.objects.get(name=entry_name)
+    def _save_task_result(self, entry, task, result, started, finished,
+                          lateness, detail):
         task_id = task.task_id
 
         tr = TaskResult(
@@ -135,6 +243,7 @@ class Scheduler(threading.Thread):
             started=started,
             finished=finished,
             duration=(finished - started),
+            lateness=lateness,
             result=result,
             detail=detail
         )
@@ -159,71 +268,96 @@ class Scheduler(threading.Thread):
 
     def _queue_pending_tasks(self, schedule_snapshot):
         pending_queue = TaskQueue()
+        changed_entries = []
         for entry in schedule_snapshot:
+            old_state = self._get_entry_state(entry)
             task_time = self._take_pending_task_time(entry)
             self._cancel_if_completed(entry)
-            if task_time is None:
-                continue
-
-            task_id = entry.get_next_task_id()
-            entry.save(update_fields=('next_task_id',))
-            pri = entry.priority
-            action = entry.action
-            pending_queue.enter(task_time, pri, action, entry.name, task_id)
+            if task_time is not None and self.executor.is_busy(entry.name):
+                msg = "skipping {} task, the previous task hasn't finished"
+                logger.warning(msg.format(entry.name))
+                entry.missed_task_count += 1
+            elif task_time is not None:
+                task_id = entry.get_next_task_id()
+                pri = entry.priority
+                action = entry.action
+                pending_queue.enter(task_time, pri, action, entry.name,
+                                    task_id)
+
+            if self._get_entry_state(entry) != old_state:
+                changed_entries.append(entry)
+
+        self._save_entry_states(changed_entries)
 
         return pending_queue
 
+    @staticmethod
+    def _get_entry_state(entry):
+        return tuple(getattr(entry, f) for f in SCHEDULER_UPDATE_FIELDS)
+
+    @staticmethod
+    def _save_entry_states(entries):
+        """Save the scheduler's changes to entries in one transaction.
+
+        Rows are updated with one `UPDATE ... CASE` statement per batch of
+        entries instead of one `save` per entry and field.
+
+        """
+        if not entries:
+            return
+
+        with transaction.atomic():
+            for i in range(0, len(entries), UPDATE_BATCH_SIZE):
+                batch = entries[i:i + UPDATE_BATCH_SIZE]
+                updates = {
+                    f: case_by_name(batch, f) for f in SCHEDULER_UPDATE_FIELDS
+                }
+                names = [entry.name for entry in batch]
+                ScheduleEntry.objects.filter(name__in=names).update(**updates)
+
     def _take_pending_task_time(self, entry):
         task_times = entry.take_pending()
-        entry.save(update_fields=('next_task_time', 'is_active'))
         if not task_times:
             return None
 
-        most_recent = self._compress_past_task_times(task_times, entry.name)
+        most_recent = self._compress_past_task_times(task_times, entry)
         return most_recent
 
     @staticmethod
-    def _compress_past_task_times(past, schedule_entry_name):
+    def _compress_past_task_times(past, entry):
         npast = len(past)
         if npast > 1:
             msg = "skipping {} {} tasks with times in the past"
-            logger.warning(msg.format(npast - 1, schedule_entry_name))
+            logger.warning(msg.format(npast - 1, entry.name))
+            entry.missed_task_count += npast - 1
 
         most_recent = past[-1]
         return most_recent
 
-    def _queue_upcoming_tasks(self, schedule_snapshot):
-        upcoming_queue = TaskQueue()
-        upcoming_task_times = self._get_upcoming_task_times(schedule_snapshot)
-        for entry, task_times in upcoming_task_times.items():
-            task_id = None
-            pri = entry.priority
-            action = entry.action
-            for t in task_times:
-                upcoming_queue.enter(t, pri, action, entry.name, task_id)
-
-        return upcoming_queue
-
-    def _get_upcoming_task_times(self, schedule_snapshot):
-        upcoming_task_times = {}
+    def _get_upcoming_tasks(self, schedule_snapshot):
+        """Return a lazy view of the tasks in the lookahead window."""
         now = self.timefn()
         min_interval = self._get_min_interval(schedule_snapshot)
         lookahead = now + min_interval * self.interval_multiplier
-        for entry in schedule_snapshot:
-            task_times = entry.get_remaining_times(until=lookahead)
-            upcoming_task_times[entry] = task_times
+        return UpcomingTasks(schedule_snapshot, until=lookahead)
 
-        return upcoming_task_times
+    @staticmethod
+    def _get_next_task_time(schedule_snapshot):
+        task_times = [e.next_task_time for e in schedule_snapshot
+                      if e.is_active]
+        return min(task_times) if task_times else None
 
     def _get_min_interval(self, schedule_snapshot):
         intervals = [e.interval for e in schedule_snapshot if e.interval]
-        return min(intervals or (1,))  # py2.7 compat -> min(ivals, default=1)
+        # py2.7 compat -> min(intervals, default=1000)
+        return min(intervals or (1000,))
 
     def _cancel_if_completed(self, entry):
         if not entry.has_remaining_times():
             msg = "no times remaining in {}, removing".format(entry.name)
             logger.debug(msg)
-            self.cancel(entry)
+            # saved with the entry's other changes by _save_entry_states
+            entry.is_active = False
 
     @property
     def status(self):
@@ -236,20 +370,16 @@ class Scheduler(threading.Thread):
         return '<{} status={}>'.format(self.__class__.__name__, s)
 
 
-@contextmanager
-def minimum_duration(blocking):
-    """Ensure a code block is entered at most once per timefn rollover.
-
-    :param blocking: if False, minimum duration is 0
-
-    """
-    start_time = utils.timefn()
-    yield
-    while blocking and utils.timefn() == start_time:
-        utils.delayfn(0.01)
+def case_by_name(entries, field_name):
+    """Return a CASE expression selecting each entry's value by name."""
+    output_field = ScheduleEntry._meta.get_field(field_name).clone()
+    whens = [When(name=entry.name, then=Value(getattr(entry, field_name)))
+             for entry in entries]
+    return Case(*whens, output_field=output_field)
 
 
-# The (small) price we pay for putting the scheduler thread right here instead
-# of running it in its own microservice is that we _must not_ run the
-# application server in multiple processes (multiple threads are fine).
+# Unless `settings.SCHEDULER_STANDALONE` is set and the scheduler runs in its
+# own process (see the `run_scheduler` command), this thread is started in the
+# application server, which then _must not_ run in multiple processes
+# (multiple threads are fine).
 thread = Scheduler()
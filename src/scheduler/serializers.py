@@ -2,6 +2,7 @@ from rest_framework import serializers
 from rest_framework.reverse import reverse
 
 import actions
+from schedule.serializers import SecondsFromMillisecondsField
 from sensor import V1
 
 
@@ -9,7 +10,8 @@ class TaskSerializer(serializers.Serializer):
     schedule_entry = serializers.SerializerMethodField()
     action = serializers.CharField(max_length=actions.MAX_LENGTH)
     priority = serializers.IntegerField()
-    time = serializers.IntegerField()
+    time = SecondsFromMillisecondsField(
+        help_text="The time (epoch seconds) the task is scheduled for")
 
     def get_schedule_entry(self, obj):
         request = self.context['request']
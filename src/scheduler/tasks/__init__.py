@@ -2,3 +2,4 @@
 
 from .task import Task
 from .task_queue import TaskQueue
+from .upcoming_tasks import UpcomingTasks
@@ -0,0 +1,119 @@
+"""Defines a lazy view of the upcoming tasks of a set of schedule entries."""
+
+import heapq
+from itertools import islice
+
+from . import Task
+
+
+class UpcomingTasks(object):
+    """A time-ordered view of the remaining tasks of schedule entries.
+
+    Instead of materializing every task, the view keeps a heap holding the
+    next task of each entry and merges the entries' series of task times on
+    demand. With k entries, building the view is O(k), `peek` is O(1) and
+    `pop` is O(log k). Iterating over or indexing into the view pages
+    through a copy of the heap, so it doesn't consume any tasks.
+
+    Task ids are assigned when a task is taken, so upcoming tasks have a
+    `task_id` of None.
+
+    :param entries: iterable of schedule entries
+    :param until: only include tasks before this :func:`timefn` timestamp
+
+    """
+    def __init__(self, entries=(), until=None):
+        self._heap = []
+        self._series = []
+        for entry in entries:
+            first_time = next(iter(entry.get_remaining_times(until)), None)
+            if first_time is None:
+                continue
+
+            stops = [t for t in (entry.stop, until) if t is not None]
+            stop = min(stops) if stops else None
+            series_index = len(self._series)
+            self._series.append(
+                (entry.interval, stop, entry.action, entry.name))
+            self._heap.append((first_time, entry.priority, series_index))
+
+        heapq.heapify(self._heap)
+
+    def peek(self):
+        """Return the next task without removing it."""
+        return self._task(*self._heap[0])
+
+    def pop(self):
+        """Remove and return the next task."""
+        time, priority, series_index = self._heap[0]
+        interval, stop = self._series[series_index][:2]
+        next_time = time + interval if interval else None
+        if next_time is None or (stop is not None and next_time >= stop):
+            heapq.heappop(self._heap)
+        else:
+            heapq.heapreplace(self._heap, (next_time, priority, series_index))
+
+        return self._task(time, priority, series_index)
+
+    def to_list(self):
+        """Return a list of the upcoming tasks in order.
+
+        Only use this on a view bounded by `until` or by the entries' stop
+        times.
+
+        """
+        return list(self)
+
+    def copy(self):
+        view = UpcomingTasks()
+        view._heap = self._heap[:]
+        view._series = self._series  # only appended to in __init__
+        return view
+
+    def clear(self):
+        del self._heap[:]
+
+    def _task(self, time, priority, series_index):
+        action, schedule_entry_name = self._series[series_index][2:]
+        return Task(time, priority, action, schedule_entry_name, None)
+
+    def __iter__(self):
+        view = self.copy()
+        while view:
+            yield view.pop()
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.start, item.stop, item.step
+            if all(i is None or i >= 0 for i in (start, stop)):
+                return list(islice(self, start, stop, step))
+        elif item >= 0:
+            try:
+                return next(islice(self, item, None))
+            except StopIteration:
+                raise IndexError("task index out of range")
+
+        return self.to_list()[item]
+
+    def __len__(self):
+        """Count the tasks in O(k) without iterating over them."""
+        n = 0
+        for time, _, series_index in self._heap:
+            interval, stop = self._series[series_index][:2]
+            if not interval:
+                n += 1
+            elif stop is None:
+                raise TypeError("an unbounded series of tasks has no length")
+            else:
+                n += (stop - time - 1) // interval + 1
+
+        return n
+
+    def __bool__(self):
+        return bool(self._heap)
+
+    __nonzero__ = __bool__  # py2.7 compat
+
+    def __repr__(self):
+        return "<{} next={!r}>".format(
+            self.__class__.__name__, self.peek() if self else None)
@@ -0,0 +1,64 @@
+import pytest
+
+from schedule.models import ScheduleEntry
+from scheduler.tasks import UpcomingTasks
+
+
+def make_entry(name, start, stop, interval, priority=10):
+    return ScheduleEntry(name=name, start=start, stop=stop, interval=interval,
+                         priority=priority, action='logger')
+
+
+def test_merges_entries_in_time_and_priority_order():
+    entries = [
+        make_entry('a', 0, 10, 4, priority=20),
+        make_entry('b', 0, None, 3),
+        make_entry('c', 5, None, None),
+    ]
+    tasks = UpcomingTasks(entries, until=10)
+
+    times = [(t.time, t.schedule_entry_name) for t in tasks]
+    assert times == [(0, 'b'), (0, 'a'), (3, 'b'), (4, 'a'), (5, 'c'),
+                     (6, 'b'), (8, 'a'), (9, 'b')]
+    assert len(tasks) == len(times)
+    assert all(t.task_id is None for t in tasks)
+
+
+def test_iteration_and_indexing_dont_consume_tasks():
+    tasks = UpcomingTasks([make_entry('a', 0, 100, 10)])
+    assert [t.time for t in tasks[:3]] == [0, 10, 20]
+    assert tasks[9].time == 90
+    assert tasks[-1].time == 90
+    assert len(tasks) == 10
+
+    with pytest.raises(IndexError):
+        tasks[10]
+
+
+def test_peek_and_pop():
+    tasks = UpcomingTasks([make_entry('a', 0, 2, 1), make_entry('b', 1, 2, 1)])
+    assert tasks.peek().time == 0
+    assert len(tasks) == 3
+
+    assert [tasks.pop().time for _ in range(3)] == [0, 1, 1]
+    assert not tasks
+    with pytest.raises(IndexError):
+        tasks.peek()
+
+
+def test_unbounded_entries_are_paged_lazily():
+    tasks = UpcomingTasks([make_entry('a', 0, None, 1000)])
+    assert [t.time for t in tasks[:3]] == [0, 1000, 2000]
+    assert tasks[10**4].time == 10**7
+
+    with pytest.raises(TypeError):
+        len(tasks)
+
+
+def test_inactive_and_finished_entries_are_skipped():
+    inactive = make_entry('a', 0, None, 1)
+    inactive.is_active = False
+    finished = make_entry('b', 0, 5, 1)
+    finished.next_task_time = 5
+
+    assert not UpcomingTasks([inactive, finished])
@@ -0,0 +1,89 @@
+"""Scheduler load tests, run with `pytest --benchmark -s`."""
+
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from authentication.models import User
+from schedule.models import ScheduleEntry
+from scheduler.tasks import TaskQueue, UpcomingTasks
+from sensor.tests.utils import print_benchmark, time_best_of
+from .utils import advance_testclock
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+@pytest.mark.parametrize('nentries', (100, 1000))
+def test_scheduler_load(test_scheduler, nentries):
+    owner = User.objects.get_or_create(username='test')[0]
+    ScheduleEntry.objects.bulk_create(
+        ScheduleEntry(name='load' + str(i), start=1, interval=1000,
+                      action='logger', owner=owner)
+        for i in range(nentries)
+    )
+
+    s = test_scheduler
+    nticks = 3
+    nqueries = []
+    nentry_queries = []
+    elapsed = 0
+    for _ in range(nticks):
+        advance_testclock(s.timefn, 1000)
+        with CaptureQueriesContext(connection) as queries:
+            t0 = time.time()
+            s.run(blocking=False)
+            elapsed += time.time() - t0
+
+        nqueries.append(len(queries))
+        nentry_queries.append(
+            sum('"schedule"' in q['sql'] for q in queries))
+
+    print_benchmark(
+        'scheduler_load',
+        nentries=nentries,
+        queries_per_tick=max(nqueries),
+        entry_queries_per_tick=max(nentry_queries),
+        task_results_per_tick=nentries,
+        tick_s='{:.3f}'.format(elapsed / nticks)
+    )
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('nentries', (10, 1000))
+def test_upcoming_tasks(nentries):
+    """Compare the lazy upcoming task view to materializing a TaskQueue.
+
+    One entry runs every second and the rest once a day, so the lookahead
+    window is set by the fastest entry.
+
+    """
+    entries = [ScheduleEntry(name='fast', start=0, interval=1000,
+                             action='logger')]
+    entries.extend(
+        ScheduleEntry(name='slow' + str(i), start=1 + i, interval=86400000,
+                      action='logger')
+        for i in range(nentries - 1)
+    )
+    lookahead = 10 * 1000
+
+    def materialize():
+        queue = TaskQueue()
+        for entry in entries:
+            for t in entry.get_remaining_times(until=lookahead):
+                queue.enter(t, entry.priority, entry.action, entry.name, None)
+
+        return queue.to_list()[:10]
+
+    def lazy():
+        return UpcomingTasks(entries, until=lookahead)[:10]
+
+    assert [tuple(t) for t in materialize()] == [tuple(t) for t in lazy()]
+
+    print_benchmark(
+        'upcoming_tasks',
+        nentries=nentries,
+        task_queue_ms='{:.3f}'.format(1e3 * time_best_of(materialize)),
+        upcoming_tasks_ms='{:.3f}'.format(1e3 * time_best_of(lazy))
+    )
@@ -0,0 +1,63 @@
+import threading
+
+from scheduler.executor import TaskExecutor
+
+
+def test_inline_runs_in_calling_thread():
+    executor = TaskExecutor(max_workers=0)
+    threads = []
+    executor.submit(
+        't', (), lambda: threads.append(threading.current_thread()))
+    assert threads == [threading.current_thread()]
+    assert not executor.is_busy('t')
+
+
+def test_tasks_without_resources_run_concurrently():
+    executor = TaskExecutor(max_workers=2)
+    barrier = threading.Event()
+    started = threading.Event()
+
+    def blocked():
+        started.set()
+        assert barrier.wait(5)
+
+    executor.submit('t1', (), blocked)
+    assert started.wait(5)
+    # would deadlock if run after the blocked task
+    executor.submit('t2', (), barrier.set)
+    executor.wait()
+    assert barrier.is_set()
+
+
+def test_tasks_sharing_a_resource_are_serialized():
+    executor = TaskExecutor(max_workers=4)
+    active = []
+    overlaps = []
+    lock = threading.Lock()
+
+    def task(name):
+        with lock:
+            active.append(name)
+            overlaps.append(len(active) > 1)
+
+        threading.Event().wait(0.01)
+        with lock:
+            active.remove(name)
+
+    executor.submit('t1', ('usrp',), task, 't1')
+    executor.submit('t2', ('usrp', 'gps'), task, 't2')
+    executor.submit('t3', ('usrp',), task, 't3')
+    executor.wait()
+    assert len(overlaps) == 3
+    assert not any(overlaps)
+
+
+def test_busy_until_task_finishes():
+    executor = TaskExecutor(max_workers=1)
+    release = threading.Event()
+    executor.submit('t', ('usrp',), release.wait, 5)
+    assert executor.is_busy('t')
+    assert not executor.is_busy('other')
+    release.set()
+    executor.wait()
+    assert not executor.is_busy('t')
@@ -1,10 +1,18 @@
 import time
 import threading
+from datetime import timedelta
 
 import pytest
 import requests_mock
-
-from scheduler.scheduler import Scheduler, minimum_duration
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from capabilities.calibration import scale_factors
+from capabilities.definition import sensor_definition
+from results.models import TaskResult
+from schedule.models import ScheduleEntry
+from scheduler.models import SchedulerStatus
+from scheduler.scheduler import STANDALONE_POLL_INTERVAL, Scheduler
 from .utils import (
     BAD_ACTION_STR,
     advance_testclock,
@@ -115,7 +123,7 @@ def test_start_stop(test_scheduler):
     create_entry('t', 1, 1, 100, 5, 'logger')
     s = test_scheduler
     s.start()
-    time.sleep(0.02)  # hit minimum_duration
+    time.sleep(0.02)
     advance_testclock(s.timefn, 1)
     s.stop()
     advance_testclock(s.timefn, 1)
@@ -129,7 +137,7 @@ def test_run_completes(test_scheduler):
     create_entry('t', 1, None, None, None, 'logger')
     s = test_scheduler
     s.start()
-    time.sleep(0.1)  # hit minimum_duration
+    time.sleep(0.1)
     advance_testclock(s.timefn, 1)
     time.sleep(0.1)
     assert not s.running
@@ -288,29 +296,6 @@ def test_clearing_schedule_clears_task_queue(test_scheduler):
     assert len(s.task_queue) == 0
 
 
-def test_minimum_duration_blocking():
-    """minimum_duration should block until start of next second."""
-    start = int(time.time())
-    blocking = True
-    with minimum_duration(blocking):
-        pass
-
-    stop = int(time.time())
-    assert start != stop
-
-
-def test_minimum_duration_non_blocking():
-    """blocking=False should make minimum_duration return immediately."""
-    start = time.time()
-    blocking = False
-    with minimum_duration(blocking):
-        pass
-
-    stop = time.time()
-    one_ms = 0.001
-    assert (stop - start) <= one_ms
-
-
 @pytest.mark.django_db
 def test_failure_posted_to_callback_url(test_scheduler):
     """If an entry has callback_url defined, scheduler should POST to it."""
@@ -417,5 +402,199 @@ def test_task_pushed_past_stop_still_runs(test_scheduler):
     assert flag0.is_set()
 
 
+@pytest.mark.django_db
+def test_waits_until_next_task_time(test_scheduler):
+    """Between passes, the scheduler should wait for the next task time."""
+    create_entry('t', 1, 5, 100, 5, 'logger')
+    s = test_scheduler
+    waits = []
+
+    def waitfn(event, until=None):
+        waits.append(until)
+        s.stop()
+
+    s.waitfn = waitfn
+    s.run(blocking=True)
+    assert waits == [5]
+
+
+@pytest.mark.django_db
+def test_waits_for_change_when_schedule_empty(test_scheduler):
+    """With an empty schedule, the scheduler should wait without timeout."""
+    s = test_scheduler
+    waits = []
+
+    def waitfn(event, until=None):
+        waits.append(until)
+        s.stop()
+
+    s.waitfn = waitfn
+    s.run(blocking=True)
+    assert waits == [None]
+
+
+@pytest.mark.django_db
+def test_idle_pass_makes_one_query(test_scheduler, django_assert_num_queries):
+    """A pass over an empty schedule should make a single query."""
+    s = test_scheduler
+    with django_assert_num_queries(1):
+        s.run(blocking=False)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_schedule_change_wakes_scheduler(test_scheduler):
+    """Creating, updating or deleting an entry should wake the scheduler."""
+    s = test_scheduler
+    assert not s.schedule_changed.is_set()
+
+    entry = create_entry('t', 1, 5, 100, 5, 'logger')
+    assert s.schedule_changed.is_set()
+    s.schedule_changed.clear()
+
+    entry.interval = 10
+    entry.save()
+    assert s.schedule_changed.is_set()
+    s.schedule_changed.clear()
+
+    entry.delete()
+    assert s.schedule_changed.is_set()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_scheduler_updates_dont_wake_scheduler(test_scheduler):
+    """The scheduler's own entry updates shouldn't wake it up again."""
+    create_entry('t', 1, 0, 100, 5, 'logger')
+    s = test_scheduler
+    s.run(blocking=False)
+    assert not s.schedule_changed.is_set()
+
+
+@pytest.mark.django_db
+def test_entry_changes_saved_in_one_update(test_scheduler):
+    """A pass should update all changed entries with a single query."""
+    for i in range(20):
+        create_entry('t' + str(i), 1, 0, 5, 1, 'logger')
+
+    s = test_scheduler
+    with CaptureQueriesContext(connection) as queries:
+        s.run(blocking=False)
+
+    updates = [q['sql'] for q in queries
+               if q['sql'].startswith('UPDATE "schedule"')]
+    assert len(updates) == 1
+    assert all(e.next_task_time == 1 for e in s.schedule)
+    assert all(e.next_task_id == 2 for e in s.schedule)
+
+
+@pytest.mark.django_db
+def test_compressed_past_times_are_missed(test_scheduler):
+    """Skipped task times in the past should be counted as missed."""
+    create_entry('t', 1, -10, 5, 1, 'logger')
+    s = test_scheduler
+    s.run(blocking=False)
+    assert ScheduleEntry.objects.get(name='t').missed_task_count == 10
+
+
+@pytest.mark.django_db
+def test_task_skipped_while_previous_task_busy(test_scheduler):
+    """A task due while its entry's last task is unfinished is missed."""
+    create_entry('t', 1, 0, 5, 1, 'logger')
+    s = test_scheduler
+    s.executor.is_busy = lambda schedule_entry_name: True
+    s.run(blocking=False)
+    entry = ScheduleEntry.objects.get(name='t')
+    assert entry.missed_task_count == 1
+    assert entry.next_task_time == 1
+    assert not TaskResult.objects.exists()
+
+
+@pytest.mark.django_db
+def test_task_lateness_is_recorded(test_scheduler):
+    """The scheduler should record how late each task started."""
+    create_entry('t', 1, 1, None, None, 'logger')
+    s = test_scheduler
+    advance_testclock(s.timefn, 4)
+    s.run(blocking=False)
+    assert TaskResult.objects.get().lateness == timedelta(milliseconds=3)
+
+
+@pytest.mark.django_db
+def test_task_lateness_is_monotonic(test_scheduler):
+    """Lateness should be measured on the monotonic clock once dispatched."""
+    create_entry('t', 1, 1, None, None, 'logger')
+    s = test_scheduler
+    advance_testclock(s.timefn, 4)
+    # The system clock stays at 4 while the monotonic clock advances 10 ms
+    readings = iter([100, 110])
+    s.monotonicfn = lambda: next(readings)
+    s.run(blocking=False)
+    # Due at 97 on the monotonic clock and started at 110
+    assert TaskResult.objects.get().lateness == timedelta(milliseconds=13)
+
+
+@pytest.mark.django_db
+def test_standalone_scheduler_publishes_status(test_scheduler):
+    """A standalone scheduler should publish its status after each pass."""
+    create_entry('t', 1, 0, 100, 5, 'logger')
+    s = test_scheduler
+    s.standalone = True
+    s.run(blocking=False)
+
+    published = SchedulerStatus.load()
+    assert published.current_status == 'running'
+    assert [tuple(t) for t in published.tasks] == [
+        tuple(t) for t in s.task_queue.to_list()]
+
+
+@pytest.mark.django_db
+def test_stopped_standalone_scheduler_is_dead(test_scheduler):
+    s = test_scheduler
+    s.standalone = True
+    s.stop()
+    s.run(blocking=True)
+    assert SchedulerStatus.load().current_status == 'dead'
+
+
+@pytest.mark.django_db
+def test_standalone_scheduler_polls_for_changes(test_scheduler):
+    """Changes made in other processes can't wake a standalone scheduler."""
+    create_entry('t', 1, 5000, None, None, 'logger')
+    s = test_scheduler
+    s.standalone = True
+    waits = []
+
+    def waitfn(event, until=None):
+        waits.append(until)
+        if len(waits) == 2:
+            s.stop()
+
+    s.waitfn = waitfn
+    s.run(blocking=True)
+
+    assert waits == [STANDALONE_POLL_INTERVAL, STANDALONE_POLL_INTERVAL]
+    assert SchedulerStatus.load().current_status == 'dead'
+
+
+@pytest.mark.django_db
+def test_standalone_scheduler_reloads_caches(test_scheduler, monkeypatch):
+    """Caches can't see changes made in other processes, so reload them."""
+    invalidated = []
+    monkeypatch.setattr(scale_factors, 'invalidate',
+                        lambda: invalidated.append('scale_factors'))
+    monkeypatch.setattr(sensor_definition, 'invalidate',
+                        lambda: invalidated.append('sensor_definition'))
+    create_entry('t', 1, 0, 5, 2, 'logger')
+    s = test_scheduler
+    s.standalone = True
+    s.run(blocking=False)
+    assert sorted(invalidated) == ['scale_factors', 'sensor_definition']
+
+    # Don't reload them if there's no task to run
+    del invalidated[:]
+    advance_testclock(s.timefn, 1)
+    s.run(blocking=False)
+    assert invalidated == []
+
+
 def test_str():
     str(Scheduler())
@@ -37,6 +37,12 @@ def delayfn(t):
     time.sleep(0)
 
 
+def waitfn(event, until=None):
+    """Wait fn that doesn't wait"""
+    time.sleep(0)
+    return event.is_set()
+
+
 # https://docs.python.org/3/library/itertools.html#itertools-recipes
 def advance_testclock(iterator, n):
     "Advance the iterator n-steps ahead. If n is None, consume entirely."
@@ -56,7 +62,7 @@ def advance_testclock(iterator, n):
 def simulate_scheduler_run(n=1):
     s = Scheduler()
     for _ in range(n):
-        advance_testclock(s.timefn, 1)
+        advance_testclock(s.timefn, 1000)  # one second in milliseconds
         s.run(blocking=False)
 
 
@@ -1,9 +1,45 @@
 import time
 
+from monotonic import monotonic
+
 
 def timefn():
-    """Return a Unix timestamp with 1-second resolution."""
-    return int(time.time())
+    """Return a Unix timestamp in integer milliseconds."""
+    return int(time.time() * 1000)
+
+
+def monotonicfn():
+    """Return a monotonic clock reading in integer milliseconds.
+
+    Only the difference between two readings is meaningful.
+
+    """
+    return int(monotonic() * 1000)
 
 
 delayfn = time.sleep
+
+
+def waitfn(event, until=None):
+    """Block until `event` is set or the time reaches `until`.
+
+    The wait is measured with a monotonic clock, so stepping the system
+    clock while waiting doesn't shorten or stretch it.
+
+    :param event: a :class:`threading.Event`
+    :param until: a :func:`timefn` timestamp, or None to wait for `event`
+    :returns: True if `event` was set, otherwise False
+
+    """
+    if until is None:
+        return event.wait()
+
+    deadline = monotonic() + (until - timefn()) / 1000.0
+    while not event.is_set():
+        remaining = deadline - monotonic()
+        if remaining <= 0:
+            return False
+
+        event.wait(remaining)
+
+    return True
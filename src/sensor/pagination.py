@@ -0,0 +1,54 @@
+"""Paginate and incrementally poll lists of a schedule entry's tasks."""
+
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+
+
+class TaskCursorPagination(CursorPagination):
+    """Page through acquisitions or results oldest first with stable cursors.
+
+    Clients that poll for new rows can pass `since` (an ISO 8601 datetime)
+    or `after_task_id` instead of following cursors from the beginning.
+    `ordering` is a time field followed by `task_id`, and `since` filters on
+    that time field.
+
+    """
+    ordering = ('created', 'task_id')
+    page_size = 100
+    page_size_query_param = 'limit'
+    max_page_size = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.filter_new_tasks(queryset, request.query_params)
+        s = super(TaskCursorPagination, self)
+        return s.paginate_queryset(queryset, request, view)
+
+    def filter_new_tasks(self, queryset, query_params):
+        """Filter by the `since` and `after_task_id` query parameters."""
+        errors = {}
+        filters = {}
+
+        after_task_id = query_params.get('after_task_id')
+        if after_task_id is not None:
+            try:
+                filters['task_id__gt'] = int(after_task_id)
+            except ValueError:
+                errors['after_task_id'] = ["A valid integer is required."]
+
+        since = query_params.get('since')
+        if since is not None:
+            try:
+                since = parse_datetime(since)
+            except ValueError:
+                since = None
+
+            if since is None:
+                errors['since'] = ["A valid ISO 8601 datetime is required."]
+            else:
+                filters[self.ordering[0] + '__gte'] = since
+
+        if errors:
+            raise ValidationError(errors)
+
+        return queryset.filter(**filters)
@@ -40,6 +40,16 @@ RUNNING_DEMO = bool(os.environ.get('DEMO'))
 # Healthchecks - the existance of any of these indicates an unhealth state
 SDR_HEALTHCHECK_FILE = os.path.join(REPO_ROOT, 'sdr_unhealthy')
 
+# Linearly interpolate IQ scale factors across frequency instead of using the
+# scale factor nearest to the center frequency
+INTERPOLATE_SCALE_FACTORS = False
+
+# Stream samples from the USRP continuously into a ring buffer of this many
+# samples instead of starting a finite acquisition for each task
+USRP_STREAMING = bool(os.environ.get('USRP_STREAMING'))
+USRP_STREAMING_BUFFER_SIZE = int(
+    os.environ.get('USRP_STREAMING_BUFFER_SIZE', 2**23))
+
 OPENAPI_FILE = os.path.join(REPO_ROOT, 'docs', 'openapi.json')
 
 # Cleanup any existing healtcheck files
@@ -251,8 +261,43 @@ if not IN_DOCKER:
     DATABASES['default']['HOST'] = 'localhost'
 
 
-# Ensure only the last MAX_TASK_RESULTS results are kept per schedule entry
+# Acquisition sample data is stored outside of the database by this backend
+# (see acquisitions/storage.py). The directory must outlive the container,
+# so docker-compose.yml mounts a volume there.
+ACQUISITION_STORAGE_BACKEND = 'acquisitions.storage.FileSystemStorage'
+ACQUISITION_DATA_DIR = (
+    os.environ.get('ACQUISITION_DATA_DIR') or
+    os.path.join(REPO_ROOT, 'acquisition_data'))
+
+# Compress stored sample data with "zlib", or "zstd" or "lz4" if the
+# zstandard or lz4 package is installed (see acquisitions/encoding.py)
+ACQUISITION_DATA_CODEC = os.environ.get('ACQUISITION_DATA_CODEC') or None
+
+# Store I/Q captures as "cf32_le", or as "ci16_le" at half the size with
+# the samples scaled to the capture's peak
+ACQUISITION_IQ_DATATYPE = (
+    os.environ.get('ACQUISITION_IQ_DATATYPE') or 'cf32_le')
+
+# Ensure only the last MAX_TASK_RESULTS results are kept per schedule entry,
+# unless the entry sets its own `max_results`. Old results are deleted in a
+# batch after every TASK_RESULT_PRUNE_INTERVAL tasks.
 MAX_TASK_RESULTS = 100
+TASK_RESULT_PRUNE_INTERVAL = 10
+
+# Threads for running tasks that don't need the radio (see
+# scheduler/executor.py), or 0 to run every task in the scheduler thread
+SCHEDULER_MAX_WORKERS = int(os.environ.get('SCHEDULER_MAX_WORKERS', 4))
+
+# Set to run the scheduler in its own process with `manage.py run_scheduler`
+# instead of a thread in the application server, so that the application
+# server can run multiple worker processes
+SCHEDULER_STANDALONE = bool(os.environ.get('SCHEDULER_STANDALONE'))
+
+# Processes for FFT and detector work, so it doesn't hold the GIL in the
+# API's process, or 0 to run it in the task's thread (see actions/offload.py)
+DSP_PROCESS_POOL_WORKERS = int(
+    os.environ.get('DSP_PROCESS_POOL_WORKERS') or 0)
+DSP_SHARED_MEMORY_DIR = '/dev/shm'
 
 
 # Password validation
@@ -1,3 +1,7 @@
+import timeit
+
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 
 
@@ -15,3 +19,40 @@ def validate_response(response, expected_code=None):
     if actual_code not in (status.HTTP_204_NO_CONTENT,):
         rjson = response.json()
         return rjson
+
+
+def count_queries(fn, *args, **kwargs):
+    """Return the number of database queries made by `fn(*args, **kwargs)`.
+
+    Use this to check that an endpoint makes the same number of queries no
+    matter how many rows it returns.
+
+    """
+    with CaptureQueriesContext(connection) as queries:
+        fn(*args, **kwargs)
+
+    return len(queries)
+
+
+def run_commit_callbacks(using='default'):
+    """Run the `transaction.on_commit` callbacks queued so far.
+
+    Tests run in a transaction that is never committed, so the callbacks
+    would otherwise never run.
+
+    """
+    conn = connections[using]
+    callbacks, conn.run_on_commit = conn.run_on_commit, []
+    for _, callback in callbacks:
+        callback()
+
+
+def time_best_of(fn, repeat=3, number=1):
+    """Return the best wall time in seconds for one call of `fn`."""
+    return min(timeit.repeat(fn, repeat=repeat, number=number)) / number
+
+
+def print_benchmark(name, **results):
+    """Print a single line benchmark report, visible with `pytest -s`."""
+    fields = ' '.join('{}={}'.format(k, v) for k, v in sorted(results.items()))
+    print("\n[benchmark] {} {}".format(name, fields))
@@ -4,12 +4,15 @@ from .settings import DATETIME_FORMAT
 
 
 def get_datetime_from_timestamp(ts):
-    return datetime.fromtimestamp(ts)
+    """Convert a timestamp in milliseconds to a datetime."""
+    # Avoid float rounding of the milliseconds
+    dt = datetime.fromtimestamp(ts // 1000)
+    return dt.replace(microsecond=ts % 1000 * 1000)
 
 
 def get_timestamp_from_datetime(dt):
-    """Assumes UTC datetime."""
-    return int(dt.strftime("%s"))
+    """Assumes UTC datetime. Returns a timestamp in integer milliseconds."""
+    return int(dt.strftime("%s")) * 1000 + dt.microsecond // 1000
 
 
 def get_datetime_str_now():
@@ -22,6 +22,6 @@ from scheduler import scheduler  # noqa
 application = get_wsgi_application()
 
 
-if not settings.IN_DOCKER:
+if not settings.IN_DOCKER and not settings.SCHEDULER_STANDALONE:
     # Normally scheduler is started by gunicorn worker process
     scheduler.thread.start()
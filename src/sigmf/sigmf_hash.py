@@ -26,13 +26,19 @@ Hashing functions
 
 import hashlib
 
-def calculate_sha512(filename):
+# Read files in large chunks to keep per-read overhead negligible
+CHUNK_SIZE = 2**20
+
+def calculate_sha512(filename, chunk_size=CHUNK_SIZE):
     """
     Returns sha512 of filename
     """
     the_hash = hashlib.sha512()
-    with open(filename, "rb") as f:
-        for buff in iter(lambda: f.read(4096), b""):
-            the_hash.update(buff)
+    # Reuse one buffer instead of allocating a new string per read
+    buff = bytearray(chunk_size)
+    view = memoryview(buff)
+    with open(filename, "rb", buffering=0) as f:
+        for nread in iter(lambda: f.readinto(buff), 0):
+            the_hash.update(view[:nread])
     return the_hash.hexdigest()
 
@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework.reverse import reverse
+
+from scheduler.models import SchedulerStatus
+from scheduler.tasks import Task
+from sensor import V1
+from sensor.tests.utils import validate_response, HTTPS_KWARG
+
+
+def get_status(client):
+    url = reverse('status', kwargs=V1)
+    return validate_response(client.get(url, **HTTPS_KWARG))
+
+
+def test_status_of_standalone_scheduler(user_client, settings):
+    settings.SCHEDULER_STANDALONE = True
+    task = Task(1500, 10, 'logger', 'test', 1)
+    SchedulerStatus.publish('running', [task])
+
+    rjson = get_status(user_client)
+
+    assert rjson['scheduler'] == 'running'
+    assert len(rjson['task_queue']) == 1
+    assert rjson['task_queue'][0]['action'] == 'logger'
+    assert rjson['task_queue'][0]['time'] == 1.5
+    assert rjson['task_queue'][0]['schedule_entry'].endswith('/test/')
+
+
+def test_standalone_scheduler_without_status_is_dead(user_client, settings):
+    settings.SCHEDULER_STANDALONE = True
+    rjson = get_status(user_client)
+    assert rjson['scheduler'] == 'dead'
+    assert rjson['task_queue'] == []
+
+
+def test_out_of_date_status_is_dead(user_client, settings):
+    settings.SCHEDULER_STANDALONE = True
+    SchedulerStatus.publish('idle', [])
+    stale = timezone.now() - timedelta(minutes=1)
+    SchedulerStatus.objects.update(updated=stale)
+
+    rjson = get_status(user_client)
+
+    assert rjson['scheduler'] == 'dead'
@@ -1,9 +1,11 @@
 import logging
 
+from django.conf import settings
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
 from scheduler import scheduler
+from scheduler.models import SchedulerStatus
 from scheduler.serializers import TaskSerializer
 from .models import Location
 from .serializers import LocationSerializer
@@ -22,15 +24,25 @@ def get_location():
         return None
 
 
+def get_scheduler_status():
+    """Return the scheduler's status and a list of its upcoming tasks."""
+    if settings.SCHEDULER_STANDALONE:
+        # The scheduler runs in another process and publishes its status
+        published = SchedulerStatus.load()
+        return published.current_status, published.tasks
+
+    return scheduler.thread.status, scheduler.thread.task_queue.to_list()
+
+
 @api_view()
 def status(request, version, format=None):
     """The status overview of the sensor."""
     context = {'request': request}
-    taskq = scheduler.thread.task_queue.to_list()
+    scheduler_status, taskq = get_scheduler_status()
     task_serializer = TaskSerializer(taskq, many=True, context=context)
 
     return Response({
-        'scheduler': scheduler.thread.status,
+        'scheduler': scheduler_status,
         'location': get_location(),
         'task_queue': task_serializer.data
     })